@@ -0,0 +1,134 @@
+# alert_rollups.py
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from escalation import enum_value, epoch_seconds, utc_now_seconds
+
+RAISED = "raised"
+RESOLVED = "resolved"
+
+IMPORTANCE = "importance"
+ASSET_CLASS = "asset_class"
+PROCESS = "process"
+DIMENSIONS = (IMPORTANCE, ASSET_CLASS, PROCESS)
+
+# Bucket width (seconds) and number of buckets retained per resolution
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "1m": (60, 24 * 60),        # 1 day
+    "5m": (300, 7 * 24 * 12),   # 7 days
+    "1h": (3600, 90 * 24),      # 90 days
+}
+
+
+def _dimension_values(row: Dict[str, Any]) -> Dict[str, Tuple[str, ...]]:
+    return {
+        IMPORTANCE: (enum_value(row["importance"]),),
+        ASSET_CLASS: tuple(enum_value(ac) for ac in row.get("asset_classes") or []),
+        PROCESS: tuple(p["name"] if isinstance(p, dict) else p.name for p in row.get("processes") or []),
+    }
+
+
+class AlertRollups:
+    """Alert counts in fixed time buckets, maintained incrementally.
+
+    Ingest and status changes adjust only the buckets an alert touches, so
+    building a timeline costs O(buckets x series) no matter how many alerts
+    have been seen. Long ranges are served from the coarser resolutions.
+    """
+
+    def __init__(self, resolutions: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.resolutions = resolutions or RESOLUTIONS
+        self._lock = threading.Lock()
+        # resolution -> bucket index -> (metric, dimension, value) -> count
+        self._buckets: Dict[str, Dict[int, Dict[Tuple[str, str, str], int]]] = {
+            name: defaultdict(lambda: defaultdict(int)) for name in self.resolutions
+        }
+        self._latest: Dict[str, int] = {name: 0 for name in self.resolutions}
+        # alert_id -> (raised_at, dimension values, resolved)
+        self._seen: Dict[str, Tuple[float, Dict[str, Tuple[str, ...]], bool]] = {}
+
+    def observe(self, rows: List[Dict[str, Any]], now: Optional[float] = None):
+        """Apply new alerts and status/importance changes to the rollups"""
+        now = utc_now_seconds() if now is None else now
+        with self._lock:
+            for row in rows:
+                self._observe(row, now)
+
+    def _observe(self, row: Dict[str, Any], now: float):
+        alert_id = row["id"]
+        dims = _dimension_values(row)
+        resolved = enum_value(row.get("status")) == "Resolved"
+        previous = self._seen.get(alert_id)
+
+        if previous is None:
+            raised_at = epoch_seconds(row["timestamp"])
+            self._add(RAISED, raised_at, dims, 1)
+        else:
+            raised_at, old_dims, was_resolved = previous
+            if old_dims != dims:
+                self._add(RAISED, raised_at, old_dims, -1)
+                self._add(RAISED, raised_at, dims, 1)
+            if resolved and not was_resolved:
+                self._add(RESOLVED, now, dims, 1)
+        self._seen[alert_id] = (raised_at, dims, resolved)
+
+    def _add(self, metric: str, at: float, dims: Dict[str, Tuple[str, ...]], delta: int):
+        for name, (width, retention) in self.resolutions.items():
+            index = int(at // width)
+            buckets = self._buckets[name]
+            if index <= self._latest[name] - retention:
+                continue
+            bucket = buckets[index]
+            for dimension, values in dims.items():
+                for value in values:
+                    bucket[(metric, dimension, value)] += delta
+            if index > self._latest[name]:
+                self._latest[name] = index
+                if len(buckets) > retention * 1.1:
+                    cutoff = index - retention
+                    for stale in [i for i in buckets if i <= cutoff]:
+                        del buckets[stale]
+
+    def pick_resolution(self, span_seconds: float, max_points: int) -> str:
+        """Finest resolution that covers the span in at most max_points buckets"""
+        ordered = sorted(self.resolutions.items(), key=lambda item: item[1][0])
+        for name, (width, retention) in ordered:
+            buckets = span_seconds / width
+            if buckets <= max_points and buckets <= retention:
+                return name
+        return ordered[-1][0]
+
+    def timeline(self, dimension: str, span_seconds: float, metric: str = RAISED,
+                 max_points: int = 360, end: Optional[float] = None) -> Dict[str, Any]:
+        """Per-value counts over the last span_seconds, downsampled to max_points"""
+        end = utc_now_seconds() if end is None else end
+        resolution = self.pick_resolution(span_seconds, max_points)
+        width = self.resolutions[resolution][0]
+        last = int(end // width)
+        first = last - max(1, int(span_seconds // width)) + 1
+
+        series: Dict[str, List[int]] = {}
+        with self._lock:
+            buckets = self._buckets[resolution]
+            for position, index in enumerate(range(first, last + 1)):
+                bucket = buckets.get(index)
+                if not bucket:
+                    continue
+                for (bucket_metric, bucket_dimension, value), count in bucket.items():
+                    if bucket_metric != metric or bucket_dimension != dimension or not count:
+                        continue
+                    if value not in series:
+                        series[value] = [0] * (last - first + 1)
+                    series[value][position] = count
+
+        # Ranges longer than the coarsest resolution can show are merged further
+        factor = -(-(last - first + 1) // max_points)
+        if factor > 1:
+            first = last - ((last - first + 1) // factor) * factor + 1
+            series = {value: [sum(counts[i:i + factor]) for i in range(len(counts) % factor, len(counts), factor)]
+                      for value, counts in series.items()}
+        times = [datetime.utcfromtimestamp(index * width) for index in range(first, last + 1, factor)]
+        return {"resolution": resolution if factor == 1 else f"{factor}x{resolution}",
+                "times": times, "series": series}
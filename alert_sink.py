@@ -0,0 +1,69 @@
+# alert_sink.py
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import List, Optional
+
+import requests
+
+from models import Alert
+
+logger = logging.getLogger(__name__)
+
+
+class AlertPoster:
+    """Forwards alerts to the alert monitor's POST /api/alerts ingest route.
+
+    send() only queues; a background thread (one per process, started on
+    first use) posts queued alerts in batches and retries a failed post with
+    backoff, so callers on refresh paths never wait on the network.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0, max_batch: int = 500, max_backoff: float = 30.0):
+        self.url = url
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.max_backoff = max_backoff
+        self._queue: "queue.Queue[Alert]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._session = requests.Session()
+        self.sent = 0
+
+    def send(self, alerts: List[Alert]):
+        self._ensure_thread()
+        for alert in alerts:
+            self._queue.put(alert)
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name='alert-poster', daemon=True).start()
+
+    def _run(self):
+        backoff = 1.0
+        batch: List[Alert] = []
+        while True:
+            if not batch:
+                batch.append(self._queue.get())
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                response = self._session.post(self.url, json=[json.loads(alert.json()) for alert in batch],
+                                              timeout=self.timeout)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                logger.warning(f"Posting {len(batch)} alerts to {self.url} failed, retrying in {backoff:.0f}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            self.sent += len(batch)
+            batch = []
+            backoff = 1.0
@@ -0,0 +1,213 @@
+# alert_store.py
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    importance TEXT NOT NULL,
+    status TEXT NOT NULL,
+    title TEXT,
+    assigned_to TEXT,
+    acknowledged_by TEXT,
+    acknowledged_at TEXT,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alert_underliers (
+    alert_id TEXT NOT NULL,
+    underlier_id TEXT NOT NULL,
+    PRIMARY KEY (alert_id, underlier_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS alert_processes (
+    alert_id TEXT NOT NULL,
+    process_id TEXT NOT NULL,
+    PRIMARY KEY (alert_id, process_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts (timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_status ON alerts (status);
+CREATE INDEX IF NOT EXISTS idx_alerts_importance ON alerts (importance);
+CREATE INDEX IF NOT EXISTS idx_alert_underliers_underlier ON alert_underliers (underlier_id);
+CREATE INDEX IF NOT EXISTS idx_alert_processes_process ON alert_processes (process_id);
+"""
+
+UPSERT_ALERT = """
+INSERT INTO alerts (id, timestamp, importance, status, title, assigned_to,
+                    acknowledged_by, acknowledged_at, payload)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    timestamp = excluded.timestamp,
+    importance = excluded.importance,
+    status = excluded.status,
+    title = excluded.title,
+    assigned_to = excluded.assigned_to,
+    acknowledged_by = excluded.acknowledged_by,
+    acknowledged_at = excluded.acknowledged_at,
+    payload = excluded.payload
+"""
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+class AlertStore:
+    """Durable local alert store on embedded SQLite in WAL mode.
+
+    Callers enqueue alert rows without blocking; a single writer thread drains
+    the queue and commits them in batches (group commit), keeping only the
+    latest version of each alert id within a batch.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._closed = False
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="alert-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def enqueue(self, rows: Iterable[Dict[str, Any]]):
+        """Queue alert rows (as produced by Alert.dict()) for the next group commit"""
+        if self._closed:
+            raise RuntimeError("AlertStore is closed")
+        for row in rows:
+            self._queue.put_nowait(row)
+
+    def load_alerts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Warm-start read of stored alerts, newest first"""
+        started = time.perf_counter()
+        conn = self._connect()
+        try:
+            sql = "SELECT payload FROM alerts ORDER BY timestamp DESC"
+            params: tuple = ()
+            if limit is not None:
+                sql += " LIMIT ?"
+                params = (limit,)
+            rows = [json.loads(payload) for (payload,) in conn.execute(sql, params)]
+        finally:
+            conn.close()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Loaded {len(rows)} alerts from {self.path} in {elapsed_ms:.1f} ms")
+        return rows
+
+    def alert_ids_for_underlier(self, underlier_id: str) -> List[str]:
+        conn = self._connect()
+        try:
+            return [alert_id for (alert_id,) in conn.execute(
+                "SELECT alert_id FROM alert_underliers WHERE underlier_id = ?", (underlier_id,))]
+        finally:
+            conn.close()
+
+    def alert_ids_for_process(self, process_id: str) -> List[str]:
+        conn = self._connect()
+        try:
+            return [alert_id for (alert_id,) in conn.execute(
+                "SELECT alert_id FROM alert_processes WHERE process_id = ?", (process_id,))]
+        finally:
+            conn.close()
+
+    def flush(self):
+        """Block until every queued row has been committed"""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+
+    def _write_loop(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            rows = [row for row in batch if row is not None]
+            stopping = len(rows) != len(batch)
+            try:
+                if rows:
+                    self._commit(conn, rows)
+            except Exception as e:
+                logger.error(f"Alert store commit of {len(rows)} rows failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, rows: List[Dict[str, Any]]):
+        latest = {row["id"]: row for row in rows}
+        alert_params, underlier_params, process_params = [], [], []
+        for alert_id, row in latest.items():
+            alert_params.append((
+                alert_id,
+                _text(row["timestamp"]),
+                _text(row["importance"]),
+                _text(row.get("status", "New")),
+                row.get("title"),
+                row.get("assigned_to"),
+                row.get("acknowledged_by"),
+                _text(row.get("acknowledged_at")),
+                json.dumps(row, default=_json_default),
+            ))
+            underlier_params.extend((alert_id, u["id"]) for u in row.get("underliers") or [])
+            process_params.extend((alert_id, p["id"]) for p in row.get("processes") or [])
+
+        ids = [(alert_id,) for alert_id in latest]
+        with conn:
+            conn.executemany(UPSERT_ALERT, alert_params)
+            conn.executemany("DELETE FROM alert_underliers WHERE alert_id = ?", ids)
+            conn.executemany("DELETE FROM alert_processes WHERE alert_id = ?", ids)
+            conn.executemany("INSERT OR IGNORE INTO alert_underliers VALUES (?, ?)", underlier_params)
+            conn.executemany("INSERT OR IGNORE INTO alert_processes VALUES (?, ?)", process_params)
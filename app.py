@@ -3,13 +3,26 @@ import dash
 from dash import Dash, html, dcc, Input, Output, State, callback, no_update
 import dash_bootstrap_components as dbc
 from dash_ag_grid import AgGrid
+import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
 import json
+import logging
+import os
+import threading
+import uuid
 from typing import List, Dict, Any
 import asyncio
+from flask import request, jsonify
+from pydantic import ValidationError
 from models import Alert, AlertImportance, AlertStatus, AssetClass
 from mock_data import generate_mock_alerts, generate_alert
+from render_coalescer import AlertRenderCoalescer
+from alert_store import AlertStore
+from escalation import EscalationScheduler, ESCALATE
+from alert_rollups import AlertRollups, ASSET_CLASS, IMPORTANCE, PROCESS
+
+logger = logging.getLogger(__name__)
 
 # Initialize the Dash app
 # Dark mode => external_stylesheets = [dbc.themes.DARKLY]
@@ -51,8 +64,66 @@ AVAILABLE_USERS = [
 #     }
 # ]
 
-initial_alerts = [alert.dict() for alert in generate_mock_alerts(20)]
-initial_df = pd.DataFrame(initial_alerts)
+# Alerts and acknowledgements survive restarts through the local SQLite store
+ALERT_DB_PATH = os.getenv("ALERT_DB_PATH", "alerts.db")
+alert_store = AlertStore(ALERT_DB_PATH)
+
+initial_alerts = alert_store.load_alerts()
+if not initial_alerts:
+    initial_alerts = [alert.dict() for alert in generate_mock_alerts(20)]
+    alert_store.enqueue(initial_alerts)
+
+# Grid updates are pushed to each browser session as one merged AG Grid
+# transaction per frame instead of one round trip per alert change
+ALERT_FRAME_MS = int(os.getenv("ALERT_FRAME_MS", "250"))
+render_coalescer = AlertRenderCoalescer(frame_ms=ALERT_FRAME_MS)
+
+# Latest known row per alert id, used to tell new alerts from updates. It is
+# written from the upstream feed, escalation and request threads; alert_lock
+# covers each index update together with its publication to the coalescer.
+alert_index: Dict[str, Dict[str, Any]] = {alert["id"]: alert for alert in initial_alerts}
+alert_lock = threading.Lock()
+
+def ingest_alerts(rows: List[Dict[str, Any]]):
+    """Single entry point for new and changed alerts (upstream feed and user actions)"""
+    new_rows, changed_rows = [], []
+    with alert_lock:
+        for row in rows:
+            (changed_rows if row["id"] in alert_index else new_rows).append(row)
+            alert_index[row["id"]] = row
+        render_coalescer.publish_new(new_rows)
+        render_coalescer.publish(changed_rows)
+    alert_store.enqueue(rows)
+    escalation_scheduler.observe(rows)
+    alert_rollups.observe(rows)
+
+# Time-bucketed alert counts for the timeline panel, updated on every ingest
+alert_rollups = AlertRollups()
+alert_rollups.observe(initial_alerts)
+
+TIMELINE_RANGES = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600, "30d": 30 * 24 * 3600}
+IMPORTANCE_COLORS = {"Critical": "#dc3545", "Warning": "#ffc107", "Information": "#17a2b8"}
+
+# SLA timers for unacknowledged alerts; escalations re-enter through ingest_alerts
+escalation_scheduler = EscalationScheduler()
+escalation_scheduler.observe(initial_alerts)
+
+def handle_escalation(event: Dict[str, Any]):
+    """Apply an SLA breach raised by the escalation scheduler"""
+    alert = alert_index.get(event["alert_id"])
+    if alert is None:
+        return
+    age_minutes = event["age_s"] / 60
+    if event["action"] == ESCALATE:
+        logger.warning(f"SLA breach: {alert['title']} ({alert['id']}) unacknowledged for {age_minutes:.0f} min, "
+                       f"raising to {event['new_importance']}")
+        ingest_alerts([dict(alert, importance=event["new_importance"])])
+    else:
+        logger.warning(f"SLA breach: {event['importance']} alert {alert['title']} ({alert['id']}) "
+                       f"unacknowledged for {age_minutes:.0f} min")
+
+escalation_scheduler.register_callback(handle_escalation)
+escalation_scheduler.start()
 
 # Convert to DataFrame for AG-Grid#
 df = pd.DataFrame(initial_alerts)
@@ -118,149 +189,204 @@ columnDefs = [
     }
 ]
 
-# Define AG-Grid custom components
-alertGrid = AgGrid(
-    id="alert-grid",
-    columnDefs=columnDefs,
-    rowData=initial_df.to_dict("records"),
-    dashGridOptions={
-        "rowHeight": 40,
-        "animateRows": True,
-        "pagination": True,
-        "paginationPageSize": 20,
-        "suppressCellFocus": True,
-        "enableCellTextSelection": True,
-        "defaultColDef": {
-            "filter": True,
-            "sortable": True,
-            "resizable": True,
-            "floatingFilter": True
-        }
-    },
-    columnSize="sizeToFit",
-    style={"height": "75vh", "width": "100%"},
-    getRowId="params.data.id",
-    className="ag-theme-alpine-dark",
-    persistence=True,
-    persistence_type="memory",
-    #update_mode="model_changed",
-)
+# Define AG-Grid custom components; built per page load so the rows are current
+def alert_grid(rows: List[Dict[str, Any]]) -> AgGrid:
+    """The alert grid, filled with rows"""
+    return AgGrid(
+        id="alert-grid",
+        columnDefs=columnDefs,
+        rowData=rows,
+        dashGridOptions={
+            "rowHeight": 40,
+            "animateRows": True,
+            "pagination": True,
+            "paginationPageSize": 20,
+            "suppressCellFocus": True,
+            "enableCellTextSelection": True,
+            "defaultColDef": {
+                "filter": True,
+                "sortable": True,
+                "resizable": True,
+                "floatingFilter": True
+            }
+        },
+        columnSize="sizeToFit",
+        style={"height": "75vh", "width": "100%"},
+        getRowId="params.data.id",
+        className="ag-theme-alpine-dark",
+        persistence=True,
+        persistence_type="memory",
+        #update_mode="model_changed",
+    )
 
-# Define the app layout
-app.layout = dbc.Container(
-    fluid=True,
-    children=[
-        dcc.Store(id="alert-store", data= initial_df.to_dict("records"), storage_type="memory"),
-        dcc.Interval(id="update-interval", interval=5000, n_intervals=0),
-        dcc.ConfirmDialog(
-            id="confirm-action",
-            message="Are you sure you want to perform this action?",
-        ),
-        dbc.Row(
-            dbc.Col(
-                html.H1("Real-Time Alert Monitor", className="text-center my-4"),
-                width=12
-            )
-        ),
-        dbc.Row(
-            [
+# Define the app layout. It is built per page load from a snapshot of
+# alert_index, and the page's session is registered with the coalescer in
+# the same step, so every later delta reaches it.
+def serve_layout():
+    with alert_lock:
+        rows = list(alert_index.values())
+        session_id = uuid.uuid4().hex
+        render_coalescer.register_session(session_id)
+    return dbc.Container(
+        fluid=True,
+        children=[
+            dcc.Store(id="alert-store", data=rows, storage_type="memory"),
+            dcc.Store(id="session-id", data=session_id, storage_type="memory"),
+            dcc.Interval(id="update-interval", interval=5000, n_intervals=0),
+            dcc.Interval(id="frame-interval", interval=ALERT_FRAME_MS, n_intervals=0),
+            dcc.ConfirmDialog(
+                id="confirm-action",
+                message="Are you sure you want to perform this action?",
+            ),
+            dbc.Row(
                 dbc.Col(
-                    dbc.Card(
-                        [
-                            dbc.CardHeader("Alert Summary"),
-                            dbc.CardBody(
-                                [
-                                    dbc.Row(
-                                        [
-                                            dbc.Col(
-                                                html.Div(
-                                                    [
-                                                        html.Span("0", id="critical-count", className="count-display critical"),
-                                                        html.P("Critical Alerts", className="count-label")
-                                                    ],
-                                                    className="count-container"
-                                                ),
-                                                width=4
-                                            ),
-                                            dbc.Col(
-                                                html.Div(
-                                                    [
-                                                        html.Span("0", id="warning-count", className="count-display warning"),
-                                                        html.P("Warning Alerts", className="count-label")
-                                                    ],
-                                                    className="count-container"
+                    html.H1("Real-Time Alert Monitor", className="text-center my-4"),
+                    width=12
+                )
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dbc.Card(
+                            [
+                                dbc.CardHeader("Alert Summary"),
+                                dbc.CardBody(
+                                    [
+                                        dbc.Row(
+                                            [
+                                                dbc.Col(
+                                                    html.Div(
+                                                        [
+                                                            html.Span("0", id="critical-count", className="count-display critical"),
+                                                            html.P("Critical Alerts", className="count-label")
+                                                        ],
+                                                        className="count-container"
+                                                    ),
+                                                    width=4
                                                 ),
-                                                width=4
-                                            ),
-                                            dbc.Col(
-                                                html.Div(
-                                                    [
-                                                        html.Span("0", id="info-count", className="count-display info"),
-                                                        html.P("Info Alerts", className="count-label")
-                                                    ],
-                                                    className="count-container"
+                                                dbc.Col(
+                                                    html.Div(
+                                                        [
+                                                            html.Span("0", id="warning-count", className="count-display warning"),
+                                                            html.P("Warning Alerts", className="count-label")
+                                                        ],
+                                                        className="count-container"
+                                                    ),
+                                                    width=4
                                                 ),
-                                                width=4
-                                            )
-                                        ]
-                                    )
-                                ]
-                            )
-                        ],
-                        className="mb-4"
+                                                dbc.Col(
+                                                    html.Div(
+                                                        [
+                                                            html.Span("0", id="info-count", className="count-display info"),
+                                                            html.P("Info Alerts", className="count-label")
+                                                        ],
+                                                        className="count-container"
+                                                    ),
+                                                    width=4
+                                                )
+                                            ]
+                                        ),
+                                        html.Div(id="sla-stats", className="text-muted small text-center")
+                                    ]
+                                )
+                            ],
+                            className="mb-4"
+                        ),
+                        width=6
                     ),
-                    width=12
-                )
-            ]
-        ),
-        dbc.Row(
-            [
-                dbc.Col(
-                    dbc.Card(
+                    dbc.Col(
+                        dbc.Card(
+                            [
+                                dbc.CardHeader("Alert Rate"),
+                                dbc.CardBody(
+                                    [
+                                        dbc.Row(
+                                            [
+                                                dbc.Col(
+                                                    dcc.Dropdown(
+                                                        id="timeline-dimension",
+                                                        options=[
+                                                            {"label": "Importance", "value": IMPORTANCE},
+                                                            {"label": "Asset Class", "value": ASSET_CLASS},
+                                                            {"label": "Process", "value": PROCESS}
+                                                        ],
+                                                        value=IMPORTANCE,
+                                                        clearable=False
+                                                    ),
+                                                    width=6
+                                                ),
+                                                dbc.Col(
+                                                    dbc.RadioItems(
+                                                        id="timeline-range",
+                                                        options=[{"label": r, "value": r} for r in TIMELINE_RANGES],
+                                                        value="24h",
+                                                        inline=True
+                                                    ),
+                                                    width=6
+                                                )
+                                            ]
+                                        ),
+                                        dcc.Graph(id="alert-timeline", config={"displayModeBar": False},
+                                                  style={"height": "180px"})
+                                    ]
+                                )
+                            ],
+                            className="mb-4"
+                        ),
+                        width=6
+                    )
+                ]
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dbc.Card(
+                            [
+                                dbc.CardHeader(
+                                    [
+                                        "Alerts",
+                                        dbc.Button(
+                                            "Refresh",
+                                            id="refresh-button",
+                                            color="primary",
+                                            size="sm",
+                                            className="float-end"
+                                        )
+                                    ]
+                                ),
+                                dbc.CardBody([alert_grid(rows)])
+                            ]
+                        ),
+                        width=12
+                    )
+                ]
+            ),
+            dbc.Modal(
+                [
+                    dbc.ModalHeader("Alert Details"),
+                    dbc.ModalBody(id="alert-details-content"),
+                    dbc.ModalFooter(
                         [
-                            dbc.CardHeader(
-                                [
-                                    "Alerts",
-                                    dbc.Button(
-                                        "Refresh",
-                                        id="refresh-button",
-                                        color="primary",
-                                        size="sm",
-                                        className="float-end"
-                                    )
-                                ]
-                            ),
-                            dbc.CardBody([alertGrid])
+                            dbc.Button(
+                                "Close",
+                                id="close-alert-details",
+                                className="ms-auto",
+                                n_clicks=0
+                            )
                         ]
-                    ),
-                    width=12
-                )
-            ]
-        ),
-        dbc.Modal(
-            [
-                dbc.ModalHeader("Alert Details"),
-                dbc.ModalBody(id="alert-details-content"),
-                dbc.ModalFooter(
-                    [
-                        dbc.Button(
-                            "Close",
-                            id="close-alert-details",
-                            className="ms-auto",
-                            n_clicks=0
-                        )
-                    ]
-                )
-            ],
-            id="alert-details-modal",
-            size="lg",
-            is_open=False,
-        ),
-        dcc.Store(            id="alert-storeX",
-            data=initial_df.to_dict("records"),
-            storage_type="memory"),
-    ]
-)
+                    )
+                ],
+                id="alert-details-modal",
+                size="lg",
+                is_open=False,
+            ),
+            dcc.Store(            id="alert-storeX",
+                data=rows,
+                storage_type="memory"),
+        ]
+    )
+
+app.layout = serve_layout
 
 # Define JavaScript functions for AG-Grid
 app.clientside_callback(
@@ -369,10 +495,9 @@ app.clientside_callback(
     Output("confirm-action", "displayed"),
     Output("action-store", "data"),
     Input("alert-grid", "cellRendererData"),
-    State("alert-store", "data"),
     prevent_initial_call=True
 )
-def handle_alert_actions(data: Dict[str, Any], alert_data: List[Dict[str, Any]]) -> tuple:
+def handle_alert_actions(data: Dict[str, Any]) -> tuple:
     """Handle alert actions from the AG-Grid cell renderer"""
     if not data or "triggered" not in data:
         return no_update, no_update
@@ -396,7 +521,7 @@ def handle_alert_actions(data: Dict[str, Any], alert_data: List[Dict[str, Any]])
     action_data = {"alert_id": alert_id, "action": action, "user": user}
     
     # Show confirmation for critical alerts
-    alert = next((a for a in alert_data if a["id"] == alert_id), None)
+    alert = alert_index.get(alert_id)
     if alert and alert["importance"] == "Critical":
         return True, action_data
         
@@ -408,41 +533,49 @@ def handle_alert_actions(data: Dict[str, Any], alert_data: List[Dict[str, Any]])
     Output("alert-store", "data"),
     Input("confirm-action", "submit_n_clicks"),
     State("action-store", "data"),
-    State("alert-store", "data"),
     prevent_initial_call=True
 )
-def update_alert_status(submit_clicks: int, action_data: Dict[str, Any], alert_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def update_alert_status(submit_clicks: int, action_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Update alert status based on user action"""
     if not submit_clicks or not action_data:
         return no_update
         
-    alert_id = action_data["alert_id"]
+    # Act on the server's current row: it may have been escalated or ingested since page load
+    alert = alert_index.get(action_data["alert_id"])
+    if alert is None:
+        return no_update
     action = action_data["action"]
     user = action_data.get("user", CURRENT_USER)
     
-    updated_alerts = []
-    for alert in alert_data:
-        if alert["id"] == alert_id:
-            updated_alert = alert.copy()
-            
-            if action == "acknowledge":
-                updated_alert["status"] = "Acknowledged"
-                updated_alert["acknowledged_by"] = user
-                updated_alert["acknowledged_at"] = datetime.utcnow().isoformat()
-            elif action == "take-action":
-                updated_alert["status"] = "In Progress"
-                updated_alert["assigned_to"] = user
-            elif action == "assign":
-                updated_alert["status"] = "Assigned"
-                updated_alert["assigned_to"] = user
-            elif action == "resolve":
-                updated_alert["status"] = "Resolved"
-                
-            updated_alerts.append(updated_alert)
-        else:
-            updated_alerts.append(alert)
-            
-    return updated_alerts
+    changes: Dict[str, Any] = {}
+    if action == "acknowledge":
+        changes = {"status": "Acknowledged", "acknowledged_by": user,
+                   "acknowledged_at": datetime.utcnow().isoformat()}
+    elif action == "take-action":
+        changes = {"status": "In Progress", "assigned_to": user}
+    elif action == "assign":
+        changes = {"status": "Assigned", "assigned_to": user}
+    elif action == "resolve":
+        changes = {"status": "Resolved"}
+    if not changes:
+        return no_update
+    ingest_alerts([dict(alert, **changes)])
+    with alert_lock:
+        return list(alert_index.values())
+
+# Callback to push at most one merged grid transaction per frame
+@app.callback(
+    Output("alert-grid", "rowTransaction"),
+    Input("frame-interval", "n_intervals"),
+    State("session-id", "data"),
+    prevent_initial_call=True
+)
+def push_alert_transaction(n_intervals: int, session_id: str) -> Dict[str, Any]:
+    """Drain the session's coalesced alert deltas into an AG Grid transaction"""
+    if not session_id:
+        return no_update
+    transaction = render_coalescer.drain(session_id)
+    return transaction if transaction else no_update
 
 # Callback to update summary counts
 @app.callback(
@@ -461,6 +594,46 @@ def update_summary_counts(alert_data: List[Dict[str, Any]]) -> tuple:
     
     return critical, warning, info
 
+# Callback to show incremental SLA statistics from the escalation scheduler
+@app.callback(
+    Output("sla-stats", "children"),
+    Input("update-interval", "n_intervals")
+)
+def update_sla_stats(n_intervals: int) -> str:
+    """Summarise time-to-acknowledge/resolve for critical alerts"""
+    stats = escalation_scheduler.stats()
+    tta = stats["time_to_acknowledge"].get("Critical", {})
+    ttr = stats["time_to_resolve"].get("Critical", {})
+    parts = [f"Open: {stats['open']}", f"SLA breaches: {stats['breaches']}"]
+    if tta.get("count"):
+        parts.append(f"Critical mean time to acknowledge: {tta['mean'] / 60:.1f} min")
+    if ttr.get("count"):
+        parts.append(f"Critical mean time to resolve: {ttr['mean'] / 60:.1f} min")
+    return " | ".join(parts)
+
+# Callback to draw the alert-rate timeline from the incremental rollups
+@app.callback(
+    Output("alert-timeline", "figure"),
+    Input("update-interval", "n_intervals"),
+    Input("timeline-dimension", "value"),
+    Input("timeline-range", "value")
+)
+def update_alert_timeline(n_intervals: int, dimension: str, range_key: str) -> go.Figure:
+    """Stacked alert counts per bucket; cost depends on bucket count, not alert count"""
+    timeline = alert_rollups.timeline(dimension, TIMELINE_RANGES[range_key], max_points=300)
+    fig = go.Figure()
+    for value, counts in sorted(timeline["series"].items()):
+        fig.add_trace(go.Bar(x=timeline["times"], y=counts, name=value,
+                             marker_color=IMPORTANCE_COLORS.get(value)))
+    fig.update_layout(
+        barmode="stack",
+        margin={"l": 30, "r": 10, "t": 10, "b": 30},
+        legend={"orientation": "h", "y": -0.25},
+        xaxis_title=None,
+        yaxis_title=f"Alerts / {timeline['resolution']}"
+    )
+    return fig
+
 # Callback to refresh data
 # @app.callback(
 #     Output("alert-store", "data", allow_duplicate=True),
@@ -508,6 +681,20 @@ app.clientside_callback(
     Input("alert-grid", "virtualRowData")
 )
 
+# Alerts raised by other services (e.g. the IV manager's arbitrage checks)
+@app.server.route("/api/alerts", methods=["POST"])
+def post_alerts():
+    """Ingest a JSON list of alerts (models.Alert fields); re-posting an id updates it"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list):
+        return jsonify({"error": "expected a JSON list of alerts"}), 400
+    try:
+        rows = [Alert(**row).dict() for row in payload]
+    except (ValidationError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    ingest_alerts(rows)
+    return jsonify({"ingested": len(rows)}), 202
+
 # Run the app
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
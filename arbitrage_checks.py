@@ -0,0 +1,197 @@
+# arbitrage_checks.py
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import Alert, AlertImportance, AlertStatus, AssetClass, Process, Underlier
+from option_pricing import norm_cdf
+from vol_surface import DEFAULT_FORWARD, PILLARS, STRATEGIES, delta_to_strike, interp_rows, pillar_vols, tenor_to_years
+
+logger = logging.getLogger(__name__)
+
+BUTTERFLY = 'butterfly'
+CALENDAR = 'calendar'
+NEGATIVE_STR = 'negative_str'
+TOTAL_VARIANCE = 'total_variance'
+
+CHECKS: Dict[str, Tuple[str, AlertImportance]] = {
+    BUTTERFLY: ("Butterfly Arbitrage", AlertImportance.CRITICAL),
+    CALENDAR: ("Calendar Arbitrage", AlertImportance.CRITICAL),
+    NEGATIVE_STR: ("Negative Strangle Quote", AlertImportance.WARNING),
+    TOTAL_VARIANCE: ("Non-Monotone ATM Total Variance", AlertImportance.WARNING),
+}
+
+PRICING_PROCESS = Process(id="pricing", name="Pricing Engine", description="Main pricing process")
+
+# Price tolerance as a fraction of the forward, total variance tolerance absolute
+PRICE_TOL = 1e-7
+VARIANCE_TOL = 1e-8
+
+
+def forward_call(forward: np.ndarray, strikes: np.ndarray, vols: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Undiscounted Black call prices; vols in percent, broadcast over (..., pillars)"""
+    sd = np.maximum(vols / 100.0 * np.sqrt(years), 1e-12)
+    d1 = (np.log(forward / strikes) + 0.5 * sd * sd) / sd
+    return forward * norm_cdf(d1) - strikes * norm_cdf(d1 - sd)
+
+
+def stack_quotes(pairs: Dict[str, Dict[str, Any]]):
+    """All pairs' tenors as (pairs, max tenors, ...) arrays, tenors sorted by expiry"""
+    names = [pair for pair, data in pairs.items() if isinstance(data, dict) and data.get('skew_matrix')]
+    depth = max((len(pairs[pair]['skew_matrix']) for pair in names), default=0)
+    quotes = np.full((len(names), depth, len(STRATEGIES)), np.nan)
+    years = np.full((len(names), depth), np.inf)
+    forwards = np.empty(len(names))
+    tenors: List[List[str]] = []
+    for p, pair in enumerate(names):
+        rows = sorted(pairs[pair]['skew_matrix'], key=lambda row: tenor_to_years(row['TENOR']))
+        tenors.append([row['TENOR'] for row in rows])
+        years[p, :len(rows)] = [tenor_to_years(row['TENOR']) for row in rows]
+        quotes[p, :len(rows)] = [[np.nan if row.get(s) is None else row[s] for s in STRATEGIES] for row in rows]
+        forwards[p] = float(pairs[pair].get('forward', DEFAULT_FORWARD))
+    return names, tenors, quotes, years, forwards
+
+
+def find_violations(pairs: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run every check over every pair and tenor at once; one dict per violation"""
+    names, tenors, quotes, years, forwards = stack_quotes(pairs)
+    if not names:
+        return []
+    n_pairs, depth, _ = quotes.shape
+    present = np.isfinite(years)
+    flat_years = np.where(present, years, 1.0).ravel()
+    flat_forwards = np.repeat(forwards, depth)
+
+    vols = pillar_vols(quotes.reshape(-1, len(STRATEGIES)))
+    strikes = delta_to_strike(vols, flat_years, flat_forwards)
+    prices = forward_call(flat_forwards[:, None], strikes, vols, flat_years[:, None])
+    valid = present.ravel() & np.isfinite(vols).all(axis=1)
+
+    # Butterfly: call prices convex and decreasing in strike, strikes ordered
+    dk = np.diff(strikes, axis=1)
+    slopes = np.diff(prices, axis=1) / np.where(dk > 0, dk, 1.0)
+    tol = PRICE_TOL * flat_forwards[:, None]
+    butterfly = (dk <= 0).any(axis=1) \
+        | (np.diff(slopes, axis=1) < -tol / np.maximum(dk[:, 1:], 1e-12)).any(axis=1) \
+        | (slopes > tol).any(axis=1) | (slopes < -1 - tol).any(axis=1)
+    butterfly_detail = np.where((dk <= 0).any(axis=1), "pillar strikes out of order",
+                                "call prices not convex in strike")
+
+    # Negative strangles
+    str_quotes = quotes[..., [STRATEGIES.index('10STR'), STRATEGIES.index('25STR')]].reshape(-1, 2)
+    negative_str = (str_quotes < 0).any(axis=1)
+
+    # Per-pair term structure: ATM total variance and total variance at fixed strike
+    w = (vols.reshape(n_pairs, depth, -1) / 100.0) ** 2 * np.where(present, years, np.nan)[..., None]
+    k = np.log(strikes / flat_forwards[:, None]).reshape(n_pairs, depth, -1)
+    atm = PILLARS.index('ATM')
+    both = present[:, 1:] & present[:, :-1]
+    total_variance = np.zeros((n_pairs, depth), dtype=bool)
+    total_variance[:, 1:] = both & (np.diff(w[..., atm], axis=1) < -VARIANCE_TOL)
+
+    calendar = np.zeros((n_pairs, depth), dtype=bool)
+    if depth > 1:
+        short_k, short_w = k[:, :-1].reshape(-1, k.shape[-1]), w[:, :-1].reshape(-1, w.shape[-1])
+        long_k, long_w = k[:, 1:].reshape(-1, k.shape[-1]), w[:, 1:].reshape(-1, w.shape[-1])
+        order = np.argsort(long_k, axis=1)
+        long_at_short = interp_rows(short_k, np.take_along_axis(long_k, order, 1),
+                                    np.take_along_axis(long_w, order, 1))
+        with np.errstate(invalid='ignore'):
+            decreasing = (long_at_short < short_w - VARIANCE_TOL).any(axis=1)
+        calendar[:, 1:] = both & decreasing.reshape(n_pairs, depth - 1)
+
+    flags = {
+        BUTTERFLY: (butterfly & valid).reshape(n_pairs, depth),
+        NEGATIVE_STR: (negative_str & present.ravel()).reshape(n_pairs, depth),
+        CALENDAR: calendar,
+        TOTAL_VARIANCE: total_variance,
+    }
+    details = {
+        BUTTERFLY: butterfly_detail.reshape(n_pairs, depth),
+    }
+
+    violations = []
+    for check, mask in flags.items():
+        for p, t in zip(*np.nonzero(mask)):
+            tenor = tenors[p][t]
+            if check == NEGATIVE_STR:
+                detail = ', '.join(f"{s}={quotes[p, t, STRATEGIES.index(s)]:.2f}"
+                                   for s in ('10STR', '25STR') if quotes[p, t, STRATEGIES.index(s)] < 0)
+            elif check in (CALENDAR, TOTAL_VARIANCE):
+                detail = f"total variance falls from {tenors[p][t - 1]} to {tenor}"
+            else:
+                detail = str(details[check][p, t])
+            violations.append({'pair': names[p], 'tenor': tenor, 'check': check, 'detail': detail})
+    return violations
+
+
+def violation_alert(violation: Dict[str, Any], status: AlertStatus = AlertStatus.NEW,
+                    now: Optional[datetime] = None) -> Alert:
+    """Alert with a deterministic id per (pair, check, tenor), so re-raises upsert"""
+    pair, tenor, check = violation['pair'], violation['tenor'], violation['check']
+    title, importance = CHECKS[check]
+    return Alert(
+        id=f"ARB-{pair}-{check.upper()}-{tenor}",
+        timestamp=now or datetime.utcnow(),
+        importance=importance,
+        title=f"{title}: {pair} {tenor}",
+        description=f"{pair} {tenor} skew quotes fail the {check.replace('_', ' ')} check ({violation['detail']})",
+        asset_classes=[AssetClass.FX],
+        underliers=[Underlier(id=pair, name=f"{pair[:3]}/{pair[3:]}", asset_class=AssetClass.FX)],
+        processes=[PRICING_PROCESS],
+        status=status,
+    )
+
+
+class ArbitrageChecker:
+    """Tracks violations across refreshes and reports state changes as alerts.
+
+    check() returns a NEW alert the first time a violation appears and a
+    RESOLVED alert when a previously flagged (pair, check, tenor) clears.
+    Only the pairs passed in are re-evaluated; others keep their state.
+    Changes are also handed to sink (e.g. AlertPoster.send) when one is set.
+    """
+
+    def __init__(self, sink: Optional[Callable[[List[Alert]], None]] = None):
+        self.sink = sink
+        self._lock = threading.Lock()
+        self._active: Dict[str, Alert] = {}
+        self.last_elapsed_ms: Optional[float] = None
+
+    def check(self, pairs: Dict[str, Dict[str, Any]]) -> List[Alert]:
+        started = time.perf_counter()
+        violations = find_violations(pairs)
+        now = datetime.utcnow()
+        found = {violation_alert(v, now=now).id: v for v in violations}
+
+        changes = []
+        with self._lock:
+            for alert_id, violation in found.items():
+                if alert_id not in self._active:
+                    alert = violation_alert(violation, now=now)
+                    self._active[alert_id] = alert
+                    changes.append(alert)
+            checked = set(pairs)
+            for alert_id, alert in list(self._active.items()):
+                if alert.underliers[0].id in checked and alert_id not in found:
+                    del self._active[alert_id]
+                    changes.append(alert.copy(update={'status': AlertStatus.RESOLVED}))
+        self.last_elapsed_ms = (time.perf_counter() - started) * 1000
+        if changes:
+            logger.info(f"Arbitrage checks over {len(pairs)} pairs: {len(changes)} alert changes "
+                        f"in {self.last_elapsed_ms:.1f} ms")
+            if self.sink is not None:
+                try:
+                    self.sink(changes)
+                except Exception as e:
+                    logger.error(f"Forwarding {len(changes)} arbitrage alerts failed: {e}")
+        return changes
+
+    def active_alerts(self, pair: Optional[str] = None) -> List[Alert]:
+        with self._lock:
+            return [alert for alert in self._active.values()
+                    if pair is None or alert.underliers[0].id == pair]
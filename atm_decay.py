@@ -0,0 +1,127 @@
+# atm_decay.py
+import threading
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+EXPONENTIAL = 'Exponential'
+LINEAR = 'Linear'
+EVENT_WEIGHTED = 'Event-Weighted'
+
+DEFAULT_METHODS: Dict[str, Dict[str, Any]] = {
+    EXPONENTIAL: {'lambda_per_min': 0.05},
+    LINEAR: {},
+    # Scheduled releases get extra weight in the variance clock
+    EVENT_WEIGHTED: {'events': [('08:30', 4.0), ('10:00', 2.0), ('14:00', 3.0)]},
+}
+
+SESSION_START = dt_time(7, 0)
+SESSION_END = dt_time(17, 0)
+STEP_MINUTES = 5
+
+
+def describe_parameters(method: str, params: Dict[str, Any]) -> str:
+    if method == EXPONENTIAL:
+        return f"λ={params['lambda_per_min']}/min"
+    if method == EVENT_WEIGHTED:
+        return ', '.join(f"{at} x{weight:g}" for at, weight in params['events'])
+    return 'to session end'
+
+
+class DecayCurve:
+    """Per-pair intraday grid and decay paths; past points are kept frozen"""
+
+    def __init__(self, day: datetime, methods: List[str]):
+        start = datetime.combine(day.date(), SESSION_START)
+        end = datetime.combine(day.date(), SESSION_END)
+        count = int((end - start).total_seconds() // (STEP_MINUTES * 60)) + 1
+        self.day = day.date()
+        self.times = [start + timedelta(minutes=STEP_MINUTES * i) for i in range(count)]
+        self.minutes = np.arange(count, dtype=float) * STEP_MINUTES
+        self.methods = methods
+        self.values = np.full((len(methods), count), np.nan)
+        self.key: Optional[Tuple] = None
+        self.recomputed_points = 0
+
+    def index_of(self, when: datetime) -> int:
+        """Grid point covering `when` (the last one at or before it)"""
+        offset = (when - self.times[0]).total_seconds() / 60
+        return int(np.clip(offset // STEP_MINUTES, 0, len(self.times) - 1))
+
+
+class AtmDecayEngine:
+    """Evaluates the configured 0D ATM vol decay methods over an intraday grid.
+
+    Each method pulls the applied 0D vol towards a target (the shortest tenor's
+    ATM) by session end. All methods are evaluated together as one array
+    operation, and only the grid points from the change onward are recomputed.
+    A new override restarts the path at its apply time, and a target move
+    restarts it at the current time. Points already in the past stay as they were.
+    """
+
+    def __init__(self, methods: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.methods = methods or DEFAULT_METHODS
+        self._lock = threading.Lock()
+        self._curves: Dict[str, DecayCurve] = {}
+
+    def evaluate(self, pair: str, applied_vol: float, applied_at: datetime, target_vol: float,
+                 now: Optional[datetime] = None) -> DecayCurve:
+        now = now or datetime.now()
+        with self._lock:
+            curve = self._curves.get(pair)
+            if curve is None or curve.day != now.date():
+                curve = DecayCurve(now, list(self.methods))
+                self._curves[pair] = curve
+
+            key = (applied_vol, applied_at, target_vol)
+            if curve.key != key:
+                if curve.key is None or curve.key[:2] != key[:2]:
+                    # New override: the path restarts at the apply time
+                    start = curve.index_of(applied_at)
+                    level = np.full((len(curve.methods), 1), float(applied_vol))
+                else:
+                    # Target moved: keep the past, continue from each method's current level
+                    start = curve.index_of(now)
+                    level = (curve.values[:, start - 1:start] if start > 0
+                             else np.full((len(curve.methods), 1), float(applied_vol)))
+                self._recompute(curve, start, level, target_vol)
+                curve.key = key
+            return curve
+
+    def _recompute(self, curve: DecayCurve, start: int, level: np.ndarray, target_vol: float):
+        elapsed = curve.minutes[start:] - curve.minutes[start]
+        remaining_total = max(curve.minutes[-1] - curve.minutes[start], STEP_MINUTES)
+
+        fractions = []
+        for method in curve.methods:
+            params = self.methods[method]
+            if method == EXPONENTIAL:
+                fractions.append(1.0 - np.exp(-params['lambda_per_min'] * elapsed))
+            elif method == LINEAR:
+                fractions.append(np.minimum(elapsed / remaining_total, 1.0))
+            else:
+                fractions.append(self._event_clock(curve, start, params['events']))
+
+        curve.values[:, start:] = level + (target_vol - level) * np.vstack(fractions)
+        curve.recomputed_points += curve.values.shape[0] * len(elapsed)
+
+    @staticmethod
+    def _event_clock(curve: DecayCurve, start: int, events: List[Tuple[str, float]]) -> np.ndarray:
+        """Cumulative share of weighted time from grid point `start` to session end"""
+        weights = np.ones(len(curve.minutes))
+        session_start = datetime.combine(curve.day, SESSION_START)
+        for at, weight in events:
+            event_time = datetime.combine(curve.day, datetime.strptime(at, '%H:%M').time())
+            index = int(round((event_time - session_start).total_seconds() / 60 / STEP_MINUTES))
+            if 0 <= index < len(weights):
+                weights[index] += weight
+        weights = weights[start:]
+        weights[0] = 0.0
+        clock = np.cumsum(weights)
+        return clock / clock[-1] if clock[-1] > 0 else clock
+
+    def current_values(self, curve: DecayCurve, now: Optional[datetime] = None) -> Dict[str, float]:
+        """Each method's vol at the grid point covering `now`"""
+        index = curve.index_of(now or datetime.now())
+        return {method: float(curve.values[i, index]) for i, method in enumerate(curve.methods)}
@@ -0,0 +1,100 @@
+# bulk_shift.py
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from skew_diff import skew_array
+from vol_surface import STRATEGIES, SmileSurface, build_surfaces, quote_fingerprint
+
+# Shiftable components and the skew columns each one moves; '0D' is the 0D ATM vol
+COMPONENTS = {'ATM': ['ATM'], 'RR': ['10RR', '25RR'], 'STR': ['10STR', '25STR'], '0D': []}
+ABSOLUTE = 'absolute'
+RELATIVE = 'relative'
+# Shifted ATM vols are floored here rather than going through zero
+MIN_VOL = 0.01
+
+
+def _shift(values: np.ndarray, mask: np.ndarray, mode: str, amount: float) -> np.ndarray:
+    if mode == ABSOLUTE:
+        return values + np.where(mask, amount, 0.0)
+    if mode == RELATIVE:
+        return values * np.where(mask, 1.0 + amount / 100.0, 1.0)
+    raise ValueError(f"unknown shift mode {mode!r}")
+
+
+def shift_pairs(data: Dict[str, Dict[str, Any]], tenors: Optional[Iterable[str]],
+                components: Sequence[str], mode: str, amount: float,
+                decimals: int = 4) -> Dict[str, Dict[str, Any]]:
+    """Shifted copies of each pair's skew_matrix and atm_vol; data is not modified.
+
+    Every selected pair's rows are stacked into one array and shifted in a
+    single pass. amount is in vol points (absolute) or percent (relative);
+    tenors=None shifts every tenor. Only the changed keys are returned per pair.
+    """
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"unknown components {sorted(unknown)}")
+    columns = [strategy for component in components for strategy in COMPONENTS[component]]
+    names = [pair for pair, pair_data in data.items() if isinstance(pair_data, dict)]
+    result: Dict[str, Dict[str, Any]] = {pair: {} for pair in names}
+
+    if columns:
+        rows = [row for pair in names for row in data[pair].get('skew_matrix', [])]
+        offsets = np.cumsum([0] + [len(data[pair].get('skew_matrix', [])) for pair in names])
+        row_tenors, values = skew_array(rows, STRATEGIES)
+        row_mask = np.ones(len(rows), dtype=bool) if tenors is None else np.isin(row_tenors, list(tenors))
+        mask = row_mask[:, None] & np.isin(STRATEGIES, columns)[None, :]
+        shifted = _shift(values, mask, mode, amount)
+        atm = STRATEGIES.index('ATM')
+        shifted[:, atm] = np.where(mask[:, atm], np.maximum(shifted[:, atm], MIN_VOL), shifted[:, atm])
+        # Round only the shifted cells; untouched quotes keep their full precision
+        shifted = np.where(mask, np.round(shifted, decimals), values)
+        for index, pair in enumerate(names):
+            block = slice(offsets[index], offsets[index + 1])
+            result[pair]['skew_matrix'] = [
+                {**row, **{s: v for s, v in zip(STRATEGIES, quotes) if not np.isnan(v)}}
+                for row, quotes in zip(rows[block], shifted[block].tolist())
+            ]
+
+    if '0D' in components:
+        levels = np.array([float(data[pair].get('atm_vol', {}).get('applied_vol',
+                           data[pair].get('atm_vol', {}).get('current_value', np.nan))) for pair in names])
+        levels = np.round(np.maximum(_shift(levels, np.ones(len(names), dtype=bool), mode, amount), MIN_VOL),
+                          decimals)
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for pair, level in zip(names, levels.tolist()):
+            if np.isnan(level):
+                continue
+            result[pair]['atm_vol'] = {**data[pair].get('atm_vol', {}), 'current_value': level,
+                                       'applied_vol': level, 'last_updated': now, 'applied_at': now}
+    return result
+
+
+def shift_summary(data: Dict[str, Dict[str, Any]], shifted: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One row per changed quote: pair, tenor, strategy, before, after"""
+    summary = []
+    for pair, changes in shifted.items():
+        before = {row['TENOR']: row for row in data[pair].get('skew_matrix', [])}
+        for row in changes.get('skew_matrix', []):
+            old = before.get(row['TENOR'], {})
+            for strategy in STRATEGIES:
+                if strategy in row and old.get(strategy) != row[strategy]:
+                    summary.append({'pair': pair, 'tenor': row['TENOR'], 'strategy': strategy,
+                                    'before': old.get(strategy), 'after': row[strategy]})
+        if 'atm_vol' in changes:
+            atm_vol = data[pair].get('atm_vol', {})
+            summary.append({'pair': pair, 'tenor': '0D', 'strategy': 'ATM',
+                            'before': atm_vol.get('applied_vol', atm_vol.get('current_value')),
+                            'after': changes['atm_vol']['applied_vol']})
+    return summary
+
+
+def preview_surfaces(data: Dict[str, Dict[str, Any]], shifted: Dict[str, Dict[str, Any]]) -> Dict[str, SmileSurface]:
+    """Smiles of the shifted quotes, built outside any engine cache"""
+    stale = []
+    for pair, changes in shifted.items():
+        if 'skew_matrix' in changes:
+            pair_data = {**data[pair], **changes}
+            stale.append((pair, pair_data, quote_fingerprint(pair_data)))
+    return build_surfaces(stale) if stale else {}
@@ -0,0 +1,244 @@
+# compute_pool.py
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (name, shape, byte offset) of each float64 array in a shared block
+Layout = List[Tuple[str, Tuple[int, ...], int]]
+
+
+class SharedArrays:
+    """Named float64 arrays packed into one shared memory block.
+
+    The creating process owns the block and unlinks it; workers attach by
+    name with the layout and read inputs / write outputs in place, so no
+    array data is pickled in either direction.
+    """
+
+    def __init__(self, block: shared_memory.SharedMemory, layout: Layout):
+        self.block = block
+        self.layout = layout
+        self.arrays = {name: np.ndarray(shape, dtype=np.float64, buffer=block.buf, offset=offset)
+                       for name, shape, offset in layout}
+
+    @classmethod
+    def create(cls, shapes: Dict[str, Tuple[int, ...]]) -> "SharedArrays":
+        layout, offset = [], 0
+        for name, shape in shapes.items():
+            layout.append((name, tuple(shape), offset))
+            offset += int(np.prod(shape)) * 8
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        return cls(block, layout)
+
+    @classmethod
+    def attach(cls, name: str, layout: Layout) -> "SharedArrays":
+        return cls(shared_memory.SharedMemory(name=name), layout)
+
+    def close(self):
+        self.arrays = {}
+        self.block.close()
+
+    def unlink(self):
+        self.close()
+        self.block.unlink()
+
+
+def _run_batch(job_fn: Callable[[List[Dict[str, np.ndarray]]], None], blocks: List[Tuple[str, Layout]]) -> float:
+    """Worker side: run job_fn on a batch of jobs' shared arrays; returns compute time in ms"""
+    started = time.perf_counter()
+    shared = [SharedArrays.attach(name, layout) for name, layout in blocks]
+    try:
+        job_fn([block.arrays for block in shared])
+    finally:
+        for block in shared:
+            block.close()
+    return (time.perf_counter() - started) * 1000
+
+
+class _Job:
+    __slots__ = ('pair', 'key', 'job_fn', 'shared', 'outputs', 'on_done')
+
+    def __init__(self, pair: str, key: Any, job_fn: Callable, shared: SharedArrays, outputs: List[str],
+                 on_done: Callable[[str, Dict[str, np.ndarray], float], None]):
+        self.pair = pair
+        self.key = key
+        self.job_fn = job_fn
+        self.shared = shared
+        self.outputs = outputs
+        self.on_done = on_done
+
+
+class ComputeScheduler:
+    """Spreads per-pair jobs across a process pool, one live job per pair.
+
+    submit() copies a job's inputs into shared memory next to space for its
+    outputs and queues it. A submission with the same key as the pair's
+    queued, running or last finished job is dropped as a duplicate; one with
+    a new key replaces the queued job, or marks the running one superseded
+    so its result is discarded.
+
+    Queued jobs are handed to idle workers in batches (the queue split evenly
+    over the workers, at most max_batch jobs each), and job_fn gets the whole
+    batch as a list of array dicts so it can vectorise across pairs. Results
+    are copied out, blocks released, and on_done(pair, outputs, compute_ms)
+    runs on a delivery thread.
+
+    Spawned workers re-import the parent's main module (as __mp_main__), so
+    job functions belong in modules without import-time side effects and a
+    script's own side effects must sit behind its __main__ guard.
+    """
+
+    def __init__(self, workers: Optional[int] = None, start_method: str = 'spawn', max_batch: int = 32):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                         mp_context=multiprocessing.get_context(start_method))
+        self._cond = threading.Condition()
+        self._queued: "OrderedDict[str, _Job]" = OrderedDict()
+        self._running: Dict[str, _Job] = {}
+        self._in_flight = 0
+        self._done_keys: Dict[str, Any] = {}
+        self._stats = {'submitted': 0, 'duplicates': 0, 'replaced': 0, 'superseded': 0,
+                       'completed': 0, 'failed': 0, 'batches': 0, 'compute_ms': 0.0}
+        self._deliveries: "queue.Queue[Tuple[_Job, Dict[str, np.ndarray], float]]" = queue.Queue()
+        threading.Thread(target=self._dispatch_loop, name='compute-dispatch', daemon=True).start()
+        threading.Thread(target=self._deliver_loop, name='compute-delivery', daemon=True).start()
+
+    def submit(self, pair: str, job_fn: Callable[[List[Dict[str, np.ndarray]]], None],
+               inputs: Dict[str, np.ndarray], outputs: Dict[str, Tuple[int, ...]],
+               on_done: Callable[[str, Dict[str, np.ndarray], float], None], key: Any = None) -> bool:
+        """Queue job_fn for a pair; returns False if it duplicated a live or finished job.
+
+        job_fn must be a module-level function (it is pickled by reference).
+        """
+        with self._cond:
+            live = self._queued.get(pair) or self._running.get(pair)
+            if key is not None and ((live is not None and live.key == key)
+                                    or (live is None and self._done_keys.get(pair) == key)):
+                self._stats['duplicates'] += 1
+                return False
+
+            shapes = {name: np.shape(value) for name, value in inputs.items()}
+            shapes.update(outputs)
+            shared = SharedArrays.create(shapes)
+            for name, value in inputs.items():
+                shared.arrays[name][...] = value
+            job = _Job(pair, key, job_fn, shared, list(outputs), on_done)
+
+            replaced = self._queued.get(pair)
+            if replaced is not None:
+                replaced.shared.unlink()
+                self._stats['replaced'] += 1
+            elif pair in self._running:
+                self._stats['superseded'] += 1
+            # A replaced job keeps its place in the queue
+            self._queued[pair] = job
+            self._stats['submitted'] += 1
+            self._cond.notify_all()
+        return True
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._queued or self._in_flight >= self.workers:
+                    self._cond.wait()
+                size = min(self.max_batch, -(-len(self._queued) // self.workers))
+                job_fn = next(iter(self._queued.values())).job_fn
+                batch = [job for job in self._queued.values() if job.job_fn is job_fn][:size]
+                for job in batch:
+                    del self._queued[job.pair]
+                    self._running[job.pair] = job
+                self._in_flight += 1
+                self._stats['batches'] += 1
+            future = self._pool.submit(_run_batch, job_fn,
+                                       [(job.shared.block.name, job.shared.layout) for job in batch])
+            future.add_done_callback(lambda future, batch=batch: self._finished(batch, future))
+
+    def _finished(self, batch: List[_Job], future: Future):
+        try:
+            compute_ms = future.result()
+            results = [{name: np.array(job.shared.arrays[name]) for name in job.outputs} for job in batch]
+        except Exception as e:
+            logger.error(f"Compute batch for {[job.pair for job in batch]} failed: {e}")
+            results, compute_ms = None, 0.0
+        for job in batch:
+            job.shared.unlink()
+
+        with self._cond:
+            self._in_flight -= 1
+            self._stats['compute_ms'] += compute_ms
+            for index, job in enumerate(batch):
+                if self._running.get(job.pair) is job:
+                    del self._running[job.pair]
+                if results is None:
+                    self._stats['failed'] += 1
+                # Superseded while running: a newer job for this pair is queued
+                elif job.pair not in self._queued:
+                    self._stats['completed'] += 1
+                    self._done_keys[job.pair] = job.key
+                    # Queued before waiters are woken, so wait() sees it as undelivered
+                    self._deliveries.put((job, results[index], compute_ms / len(batch)))
+            self._cond.notify_all()
+
+    def _deliver_loop(self):
+        while True:
+            job, outputs, compute_ms = self._deliveries.get()
+            try:
+                job.on_done(job.pair, outputs, compute_ms)
+            except Exception as e:
+                logger.error(f"Delivering compute result for {job.pair} failed: {e}")
+            finally:
+                self._deliveries.task_done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued and running job has finished and been delivered"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        self._deliveries.join()
+        return True
+
+    def forget(self, pair: str):
+        """Drop a pair's finished key so its next identical submission runs again"""
+        with self._cond:
+            self._done_keys.pop(pair, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self._stats, 'workers': self.workers, 'queued': len(self._queued),
+                    'running': len(self._running)}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_scheduler: Optional[ComputeScheduler] = None
+_scheduler_pid: Optional[int] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_compute_scheduler(workers: int, **kwargs) -> Optional[ComputeScheduler]:
+    """Per-process scheduler, created on first use; None when workers < 2 (compute inline)"""
+    global _scheduler, _scheduler_pid
+    if workers < 2:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler_pid != os.getpid():
+            _scheduler = ComputeScheduler(workers, **kwargs)
+            _scheduler_pid = os.getpid()
+        return _scheduler
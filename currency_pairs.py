@@ -0,0 +1,41 @@
+# currency_pairs.py
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class CurrencyPair:
+    code: str
+    label: str
+
+
+DEFAULT_PAIRS = ['EURUSD', 'USDJPY', 'GBPUSD']
+
+_registry: Dict[str, CurrencyPair] = {}
+
+
+def register_pair(code: str, label: Optional[str] = None) -> CurrencyPair:
+    """Add a pair to the registry; the label defaults to 'EUR/USD' style"""
+    code = code.strip().upper()
+    pair = CurrencyPair(code=code, label=label or f"{code[:3]}/{code[3:]}")
+    _registry[code] = pair
+    return pair
+
+
+def pair_codes() -> List[str]:
+    return list(_registry)
+
+
+def pairs() -> List[CurrencyPair]:
+    return list(_registry.values())
+
+
+def is_registered(code: str) -> bool:
+    return code in _registry
+
+
+# IV_CURRENCY_PAIRS="EURUSD,USDJPY,..." replaces the default set
+for _code in (os.getenv('IV_CURRENCY_PAIRS') or ','.join(DEFAULT_PAIRS)).split(','):
+    if _code.strip():
+        register_pair(_code)
@@ -0,0 +1,178 @@
+# data_fetcher.py
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from file_source import VolatilityFileSource
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundDataFetcher:
+    """One fetcher thread per process that keeps a versioned volatility snapshot.
+
+    The API is polled over a pooled keep-alive session with conditional
+    requests (ETag / If-Modified-Since), so an unchanged payload costs a 304.
+    The data file is only re-read when it changes, and only the pairs that
+    changed are merged. Concurrent refresh() calls are collapsed into a single
+    in-flight fetch. Dash callbacks only ever read snapshot(); they never do
+    I/O themselves. With a sink, updates are handed off as they arrive and no
+    snapshot is kept.
+    """
+
+    def __init__(self, api_endpoint: str = '', file_path: str = '', interval: float = 30.0,
+                 transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 sink: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 timeout: Tuple[float, float] = (3.05, 10.0)):
+        self.api_endpoint = api_endpoint
+        self.file_path = file_path
+        self.interval = interval
+        self.transform = transform
+        self.sink = sink
+        self.timeout = timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self.file_source = VolatilityFileSource(file_path) if file_path else None
+
+        self._lock = threading.Lock()
+        self._version = 0
+        self._data: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+
+        self._flight_lock = threading.Lock()
+        self._in_flight: Optional[threading.Event] = None
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='volatility-fetcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # Keep the thread alive: the next interval fetches (and delivers) again
+                logger.exception("Volatility refresh failed")
+            self._stop.wait(self.interval)
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Latest (version, data); data must be treated as read-only"""
+        with self._lock:
+            return self._version, self._data
+
+    def refresh(self) -> int:
+        """Fetch now, or wait for the fetch already in flight; returns the snapshot version"""
+        with self._flight_lock:
+            in_flight = self._in_flight
+            if in_flight is None:
+                self._in_flight = threading.Event()
+        if in_flight is not None:
+            in_flight.wait()
+            return self._version
+
+        try:
+            self._fetch()
+        finally:
+            with self._flight_lock:
+                done, self._in_flight = self._in_flight, None
+            done.set()
+        return self._version
+
+    def _fetch(self):
+        updates: Dict[str, Any] = {}
+        for name, source in (('API update', self._fetch_api), ('File update', self._fetch_file)):
+            try:
+                data = source()
+            except Exception as e:
+                logger.warning(f"{name} failed: {e}")
+                continue
+            if data:
+                updates.update(data)
+        if not updates:
+            return
+
+        if self.sink is not None:
+            try:
+                self.sink(updates)
+            except Exception:
+                # Forget the validators so the next poll fetches the same payload again
+                logger.exception(f"Delivering volatility update ({len(updates)} keys) failed")
+                self._etag = self._last_modified = None
+                return
+            self._delivered()
+            with self._lock:
+                self._version += 1
+                self._fetched_at = time.time()
+            logger.info(f"Volatility update v{self._version} delivered ({len(updates)} keys)")
+            return
+
+        with self._lock:
+            merged = dict(self._data)
+        merged.update(updates)
+        if self.transform is not None:
+            merged = self.transform(merged)
+        self._delivered()
+        with self._lock:
+            self._data = merged
+            self._version += 1
+            self._fetched_at = time.time()
+        logger.info(f"Volatility snapshot v{self._version} updated ({len(updates)} keys)")
+
+    def _delivered(self):
+        if self.file_source is not None:
+            self.file_source.acknowledge()
+
+    def _fetch_api(self) -> Optional[Dict[str, Any]]:
+        if not self.api_endpoint:
+            return None
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+        response = self._session.get(self.api_endpoint, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._etag = response.headers.get('ETag')
+        self._last_modified = response.headers.get('Last-Modified')
+        return response.json()
+
+    def _fetch_file(self) -> Optional[Dict[str, Any]]:
+        if self.file_source is None:
+            return None
+        return self.file_source.poll()
+
+
+_fetcher: Optional[BackgroundDataFetcher] = None
+_fetcher_pid: Optional[int] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_data_fetcher(**kwargs) -> BackgroundDataFetcher:
+    """Per-process fetcher, started lazily so forked gunicorn workers each own one"""
+    global _fetcher, _fetcher_pid
+    with _fetcher_lock:
+        if _fetcher is None or _fetcher_pid != os.getpid():
+            _fetcher = BackgroundDataFetcher(**kwargs)
+            _fetcher_pid = os.getpid()
+            _fetcher.start()
+        return _fetcher
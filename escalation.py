@@ -0,0 +1,224 @@
+# escalation.py
+import heapq
+import itertools
+import math
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import AlertImportance, AlertStatus
+
+EPOCH = datetime(1970, 1, 1)
+
+ESCALATE = "escalate"
+NOTIFY = "notify"
+
+# Time-to-acknowledge thresholds (seconds) per importance. Each breach either
+# raises the alert one importance level or only notifies. Thresholds of the
+# new level are measured from the moment of escalation.
+DEFAULT_POLICY: Dict[str, List[Tuple[float, str]]] = {
+    AlertImportance.INFORMATION.value: [(3600, ESCALATE)],
+    AlertImportance.WARNING.value: [(1800, ESCALATE)],
+    AlertImportance.CRITICAL.value: [(300, NOTIFY), (900, NOTIFY), (3600, NOTIFY)],
+}
+
+NEXT_IMPORTANCE = {
+    AlertImportance.INFORMATION.value: AlertImportance.WARNING.value,
+    AlertImportance.WARNING.value: AlertImportance.CRITICAL.value,
+}
+
+
+def enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def epoch_seconds(value: Any) -> Optional[float]:
+    """Seconds since epoch for naive-UTC datetimes or ISO strings (as in mock_data)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", ""))
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return (value - EPOCH).total_seconds()
+
+
+def utc_now_seconds() -> float:
+    return (datetime.utcnow() - EPOCH).total_seconds()
+
+
+class RunningStats:
+    """Incremental count/mean/variance/min/max (Welford)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.mean, "stdev": self.stdev,
+                "min": self.min, "max": self.max}
+
+
+class EscalationScheduler:
+    """SLA timers for unacknowledged alerts.
+
+    One pending timer per open NEW alert lives in a min-heap keyed on its next
+    deadline, so a poll only touches timers that are due (O(k log n)) instead
+    of scanning every open alert. Acknowledged or resolved alerts cancel their
+    timer lazily through a generation counter.
+    """
+
+    def __init__(self, policy: Optional[Dict[str, List[Tuple[float, str]]]] = None):
+        self.policy = policy or DEFAULT_POLICY
+        self.callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        # alert_id -> {generation, importance, step, since, timestamp, status}
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._generation = itertools.count(1)
+        self.time_to_acknowledge: Dict[str, RunningStats] = {}
+        self.time_to_resolve: Dict[str, RunningStats] = {}
+        self.breaches = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register a callback for escalation/notification events"""
+        self.callbacks.append(callback)
+
+    def observe(self, rows: List[Dict[str, Any]], now: Optional[float] = None):
+        """Feed new or changed alert rows; starts, cancels or finalises timers"""
+        now = utc_now_seconds() if now is None else now
+        with self._lock:
+            for row in rows:
+                self._observe(row, now)
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._open):
+                self._compact()
+
+    def _observe(self, row: Dict[str, Any], now: float):
+        alert_id = row["id"]
+        status = enum_value(row.get("status", AlertStatus.NEW.value))
+        importance = enum_value(row["importance"])
+        state = self._open.get(alert_id)
+        created = epoch_seconds(row["timestamp"])
+
+        if state is None:
+            if status == AlertStatus.RESOLVED.value:
+                return
+            state = {"timestamp": created, "status": status, "importance": importance,
+                     "generation": 0, "step": 0, "since": created}
+            self._open[alert_id] = state
+            if status == AlertStatus.NEW.value:
+                self._schedule(alert_id, state)
+            else:
+                acked_at = epoch_seconds(row.get("acknowledged_at"))
+                if acked_at is not None:
+                    self._stats(self.time_to_acknowledge, importance).add(acked_at - created)
+            return
+
+        previous = state["status"]
+        state["status"] = status
+        if previous == AlertStatus.NEW.value and status != AlertStatus.NEW.value:
+            state["generation"] = 0  # cancels the pending timer
+            acked_at = epoch_seconds(row.get("acknowledged_at")) or now
+            self._stats(self.time_to_acknowledge, state["importance"]).add(acked_at - state["timestamp"])
+        if status == AlertStatus.RESOLVED.value:
+            state["generation"] = 0
+            self._stats(self.time_to_resolve, state["importance"]).add(now - state["timestamp"])
+            del self._open[alert_id]
+
+    def _schedule(self, alert_id: str, state: Dict[str, Any]):
+        thresholds = self.policy.get(state["importance"], [])
+        if state["step"] >= len(thresholds):
+            state["generation"] = 0
+            return
+        state["generation"] = next(self._generation)
+        deadline = state["since"] + thresholds[state["step"]][0]
+        heapq.heappush(self._heap, (deadline, next(self._seq), alert_id, state["generation"]))
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap
+                      if entry[2] in self._open and self._open[entry[2]]["generation"] == entry[3]]
+        heapq.heapify(self._heap)
+
+    @staticmethod
+    def _stats(table: Dict[str, RunningStats], importance: str) -> RunningStats:
+        if importance not in table:
+            table[importance] = RunningStats()
+        return table[importance]
+
+    def poll(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Fire every timer whose deadline has passed and notify callbacks"""
+        now = utc_now_seconds() if now is None else now
+        events = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, alert_id, generation = heapq.heappop(self._heap)
+                state = self._open.get(alert_id)
+                if state is None or state["generation"] != generation:
+                    continue
+
+                threshold, action = self.policy[state["importance"]][state["step"]]
+                event = {"alert_id": alert_id, "action": action, "importance": state["importance"],
+                         "threshold_s": threshold, "age_s": now - state["timestamp"]}
+                if action == ESCALATE and state["importance"] in NEXT_IMPORTANCE:
+                    state["importance"] = NEXT_IMPORTANCE[state["importance"]]
+                    state["step"] = 0
+                    state["since"] = deadline
+                    event["new_importance"] = state["importance"]
+                else:
+                    state["step"] += 1
+                self.breaches += 1
+                events.append(event)
+                self._schedule(alert_id, state)
+
+        for event in events:
+            for callback in self.callbacks:
+                callback(event)
+        return events
+
+    def start(self, interval: float = 1.0):
+        """Poll timers from a background thread"""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.poll()
+
+        self._thread = threading.Thread(target=run, name="alert-escalation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._open)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open": len(self._open),
+                "breaches": self.breaches,
+                "time_to_acknowledge": {k: v.to_dict() for k, v in self.time_to_acknowledge.items()},
+                "time_to_resolve": {k: v.to_dict() for k, v in self.time_to_resolve.items()},
+            }
@@ -0,0 +1,104 @@
+# figure_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+import plotly.graph_objects as go
+
+from figure_patch import digest, figure_meta
+
+
+class FigureCache:
+    """Process-wide LRU of built figures and derived tables, keyed by content.
+
+    A key is a digest of everything the value is built from (the pair's
+    input data plus view options), so every session looking at the same
+    data shares one entry and a changed input simply misses. Entries expire
+    ttl seconds after they were built and the least recently used are
+    evicted beyond max_entries. Concurrent misses on one key build it once;
+    the other callers wait for that result.
+
+    Cached values are shared between sessions and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._building: Dict[str, threading.Event] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'build_ms': 0.0}
+        self._kinds: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def key(kind: str, parts: Any) -> str:
+        return f"{kind}:{digest(parts)}"
+
+    def _lookup(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= now:
+            del self._entries[key]
+            self._stats['expired'] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _count(self, kind: str, outcome: str):
+        self._stats[outcome] += 1
+        counts = self._kinds.setdefault(kind, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+    def get_or_build(self, kind: str, parts: Any, build: Callable[[], Any]) -> Any:
+        """Cached value for (kind, parts), calling build() on a miss"""
+        key = self.key(kind, parts)
+        while True:
+            with self._lock:
+                found, value = self._lookup(key, time.monotonic())
+                if found:
+                    self._count(kind, 'hits')
+                    return value
+                pending = self._building.get(key)
+                if pending is None:
+                    self._count(kind, 'misses')
+                    pending = self._building[key] = threading.Event()
+                    break
+            # Someone else is building this key; use their result (or retry if they failed)
+            pending.wait()
+
+        started = time.perf_counter()
+        try:
+            value = build()
+            with self._lock:
+                self._stats['build_ms'] += (time.perf_counter() - started) * 1000
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+            return value
+        finally:
+            with self._lock:
+                del self._building[key]
+            pending.set()
+
+    def figure(self, kind: str, parts: Any,
+               build: Callable[[], go.Figure]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(Plotly JSON, figure_meta) of build(), so hits skip both building and hashing"""
+        def build_spec():
+            spec = build().to_plotly_json()
+            return spec, figure_meta(spec)
+        return self.get_or_build(kind, parts, build_spec)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {**self._stats, 'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'ttl': self.ttl, 'hit_rate': self._stats['hits'] / lookups if lookups else None,
+                    'kinds': {kind: dict(counts) for kind, counts in self._kinds.items()}}
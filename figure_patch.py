@@ -0,0 +1,106 @@
+# figure_patch.py
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple, Union
+
+import plotly.graph_objects as go
+from dash import Patch, no_update
+from plotly.utils import PlotlyJSONEncoder
+
+
+# Trace properties tracked separately so a data change resends only that array
+ARRAY_KEYS = ('x', 'y', 'z', 'customdata', 'text')
+
+
+def digest(value: Any) -> str:
+    """Short content hash of any Plotly/JSON-serialisable value"""
+    encoded = json.dumps(value, cls=PlotlyJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def _trace_meta(trace: Dict[str, Any]) -> Dict[str, str]:
+    meta = {key: digest(trace[key]) for key in ARRAY_KEYS if key in trace}
+    meta['_'] = digest({key: value for key, value in trace.items() if key not in ARRAY_KEYS})
+    return meta
+
+
+def _spec(figure: Union[go.Figure, Dict[str, Any]]) -> Dict[str, Any]:
+    return figure if isinstance(figure, dict) else figure.to_plotly_json()
+
+
+def figure_meta(figure: Union[go.Figure, Dict[str, Any]]) -> Dict[str, Any]:
+    """Hashes of each trace's arrays and other properties, and of each layout key"""
+    spec = _spec(figure)
+    return {
+        'structure': digest([(trace.get('type'), trace.get('name')) for trace in spec['data']]),
+        'traces': [_trace_meta(trace) for trace in spec['data']],
+        'layout': {key: digest(value) for key, value in spec['layout'].items()},
+    }
+
+
+def patch_figure(figure: Union[go.Figure, Dict[str, Any]], previous: Optional[Dict[str, Any]],
+                 meta: Optional[Dict[str, Any]] = None) -> Tuple[Union[go.Figure, Dict[str, Any], Patch], Dict[str, Any]]:
+    """Smallest update that turns the client's figure into `figure`.
+
+    Returns the full figure when the client has none or the set of traces
+    changed, no_update when nothing changed, otherwise a Patch that replaces
+    only the trace arrays, traces and top-level layout keys that differ.
+    figure may be a Plotly JSON dict, and meta its figure_meta if already known.
+    """
+    meta = meta or figure_meta(figure)
+    if not previous or previous.get('structure') != meta['structure']:
+        return figure, meta
+
+    spec = _spec(figure)
+    patch = Patch()
+    changed = False
+    for index, (old, new) in enumerate(zip(previous['traces'], meta['traces'])):
+        if old == new:
+            continue
+        changed = True
+        trace = spec['data'][index]
+        if old.get('_') != new['_'] or set(old) != set(new):
+            patch['data'][index] = trace
+            continue
+        for key in ARRAY_KEYS:
+            if key in new and old[key] != new[key]:
+                patch['data'][index][key] = trace[key]
+    old_layout = previous.get('layout', {})
+    for key, new in meta['layout'].items():
+        if old_layout.get(key) != new:
+            patch['layout'][key] = spec['layout'][key]
+            changed = True
+    for key in set(old_layout) - set(meta['layout']):
+        del patch['layout'][key]
+        changed = True
+    return (patch if changed else no_update), meta
+
+
+def patch_value(value: Any, previous_digest: Optional[str]) -> Tuple[Any, str]:
+    """value, or no_update if the client already holds identical content"""
+    current = digest(value)
+    return (no_update if current == previous_digest else value), current
+
+
+def patch_dict(new: Dict[str, Any], old: Optional[Dict[str, Any]]) -> Union[Dict[str, Any], Patch]:
+    """new as a Patch of the entries that differ from old (nested dicts diffed too)"""
+    if not old:
+        return new
+    patch = Patch()
+    changed = _diff_into(patch, new, old)
+    return patch if changed else no_update
+
+
+def _diff_into(patch: Patch, new: Dict[str, Any], old: Dict[str, Any]) -> bool:
+    changed = False
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changed = _diff_into(patch[key], value, previous) or changed
+        elif value != previous:
+            patch[key] = value
+            changed = True
+    for key in set(old) - set(new):
+        del patch[key]
+        changed = True
+    return changed
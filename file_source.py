@@ -0,0 +1,162 @@
+# file_source.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from vol_surface import STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMERIC = (int, float)
+
+
+def _skip(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def iter_pairs(text: str) -> Iterator[Tuple[str, str, Any]]:
+    """Yield (pair, raw value text, parsed value) for each top-level key of a JSON object"""
+    pos = _skip(text, 0)
+    if text[pos:pos + 1] != '{':
+        raise ValueError('volatility file must contain a JSON object')
+    pos = _skip(text, pos + 1)
+    if text[pos:pos + 1] == '}':
+        return
+    while True:
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] != ':':
+            raise ValueError(f'expected ":" after {key!r} at offset {pos}')
+        start = _skip(text, pos + 1)
+        value, pos = _decoder.raw_decode(text, start)
+        yield key, text[start:pos], value
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] == '}':
+            return
+        if text[pos:pos + 1] != ',':
+            raise ValueError(f'expected "," or "}}" at offset {pos}')
+        pos = _skip(text, pos + 1)
+
+
+def validate_pair(pair_data: Any) -> Optional[str]:
+    """Reason a pair's payload is unusable, or None if it is valid"""
+    if not isinstance(pair_data, dict):
+        return 'not an object'
+    rows = pair_data.get('skew_matrix')
+    if rows is not None:
+        if not isinstance(rows, list):
+            return 'skew_matrix is not a list'
+        for row in rows:
+            if not isinstance(row, dict) or not isinstance(row.get('TENOR'), str):
+                return 'skew_matrix row without a TENOR'
+            for strategy in STRATEGIES:
+                value = row.get(strategy)
+                if value is not None and type(value) not in _NUMERIC:
+                    return f"{row['TENOR']} {strategy} is not numeric"
+    atm_vol = pair_data.get('atm_vol')
+    if atm_vol is not None:
+        if not isinstance(atm_vol, dict):
+            return 'atm_vol is not an object'
+        for field in ('current_value', 'applied_vol'):
+            value = atm_vol.get(field)
+            if value is not None and type(value) not in _NUMERIC:
+                return f'atm_vol.{field} is not numeric'
+    return None
+
+
+class VolatilityFileSource:
+    """Change-driven reader for the shared volatility data file.
+
+    The file is only reopened when its mtime or size changes. Each top-level
+    pair is decoded on its own and hashed, so poll() returns just the pairs
+    whose content changed. A pair that fails validation is skipped and its
+    last good value is kept.
+
+    A poll's changes only count as seen once acknowledge() is called after
+    they were delivered; until then every poll returns them again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._hashes: Dict[str, bytes] = {}
+        self._pending: Optional[Tuple[Tuple[int, int], Dict[str, bytes]]] = None
+        self._stats: Dict[str, Any] = {
+            'parses': 0, 'parse_ms': None, 'pairs_changed': 0, 'invalid_pairs': {},
+            'modified_at': None, 'checked_at': None, 'error': None,
+        }
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Pairs that changed since the last poll, or None if nothing did"""
+        with self._lock:
+            self._stats['checked_at'] = time.time()
+            if not self.path or not os.path.exists(self.path):
+                return None
+            stat = os.stat(self.path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            if key == self._stat:
+                return None
+
+            started = time.perf_counter()
+            try:
+                with open(self.path, 'rb') as f:
+                    text = f.read().decode('utf-8')
+                pairs = list(iter_pairs(text))
+            except (ValueError, UnicodeDecodeError) as e:
+                # Usually a writer mid-way through the file; retry on the next change
+                self._stats['error'] = str(e)
+                logger.warning(f"Unreadable volatility file {self.path}: {e}")
+                return None
+
+            changed, invalid, digests = {}, {}, {}
+            for pair, raw, value in pairs:
+                digest = hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
+                if self._hashes.get(pair) == digest:
+                    continue
+                reason = validate_pair(value)
+                if reason is not None:
+                    invalid[pair] = reason
+                    continue
+                digests[pair] = digest
+                changed[pair] = value
+
+            if changed:
+                self._pending = (key, digests)
+            else:
+                self._stat = key
+            self._stats.update({
+                'parses': self._stats['parses'] + 1,
+                'parse_ms': round((time.perf_counter() - started) * 1000, 3),
+                'pairs_changed': len(changed),
+                'invalid_pairs': invalid,
+                'modified_at': stat.st_mtime,
+                'error': None,
+            })
+        for pair, reason in invalid.items():
+            logger.warning(f"Skipping invalid {pair} in {self.path}: {reason}")
+        return changed or None
+
+    def acknowledge(self):
+        """Mark the last poll's changes as delivered"""
+        with self._lock:
+            if self._pending is not None:
+                self._stat, digests = self._pending
+                self._hashes.update(digests)
+                self._pending = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Parse timing and staleness (seconds since the file last changed)"""
+        with self._lock:
+            stats = dict(self._stats)
+        modified_at = stats['modified_at']
+        stats['staleness_s'] = round(time.time() - modified_at, 3) if modified_at else None
+        return stats
@@ -1,19 +1,36 @@
 #1
 import dash
-from dash import Dash, html, dcc, Input, Output, State, callback, dash_table
+from dash import Dash, html, dcc, Input, Output, State, callback, dash_table, MATCH, ALL
 import dash_ag_grid as dag
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional
+from flask import request, jsonify
 import dash_bootstrap_components as dbc
 from dash_bootstrap_templates import load_figure_template
+from vol_surface import VolSurfaceEngine, tenor_to_years, quote_fingerprint, STRATEGIES
+from smile_calibration import SmileCalibrator, svi_fit_job
+from atm_decay import AtmDecayEngine, describe_parameters
+from data_fetcher import get_data_fetcher
+from currency_pairs import pair_codes, pairs, is_registered
+from pair_shards import PairShardStore, remember_pair
+from figure_patch import patch_figure, patch_value, patch_dict, digest, figure_meta
+from skew_history import SkewHistoryStore
+from skew_diff import SkewDiffer, MOVES_FIELD
+from arbitrage_checks import ArbitrageChecker, find_violations
+from alert_sink import AlertPoster
+from quote_connector import get_quote_stream
+from bulk_shift import COMPONENTS, ABSOLUTE, RELATIVE, shift_pairs, shift_summary, preview_surfaces
+from option_pricing import PricingGrid, GREEKS, pair_rates
+from compute_pool import get_compute_scheduler
+from figure_cache import FigureCache
+from surface_mesh import mesh_points, surface_mesh
 
 # Load a dark-themed template for Plotly figures
 load_figure_template("darkly")
@@ -26,57 +43,154 @@ logger = logging.getLogger(__name__)
 app = Dash(__name__, title="Implied Volatility Management System", external_stylesheets=[dbc.themes.DARKLY], suppress_callback_exceptions=True)
 server = app.server
 
-# Sample initial data structure
-def initialize_sample_data():
-    """Initialize sample data for all currency pairs"""
+# Sample data for a pair that has no shard yet
+def sample_pair_data(currency):
+    """Initialize sample data for one currency pair"""
     base_tenors = ['1M', '2M', '3M', '6M', '1Y']
     strategies = ['ATM', '10RR', '10STR', '25RR', '25STR']
     
-    data = {}
-    for currency in ['EURUSD', 'USDJPY', 'GBPUSD']:
-        # Skew matrix data
-        skew_data = []
-        for tenor in base_tenors:
-            row = {'TENOR': tenor}
-            for strategy in strategies:
-                # Generate realistic sample data
-                if strategy == 'ATM':
-                    value = 8.0 + np.random.uniform(-0.5, 0.5)
-                elif 'RR' in strategy:
-                    value = -0.3 + np.random.uniform(-0.2, 0.2)
-                else:
-                    value = 7.5 + np.random.uniform(-0.5, 0.5)
-                row[strategy] = round(value, 2)
-            skew_data.append(row)
-        
-        # 0D ATM VOL data
-        atm_vol_data = {
-            'current_value': 8.2,
-            'decay_method': 'Exponential',
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'applied_vol': 8.2
-        }
-        
-        # Generate smile data and convert to dictionary for JSON serialization
-        smile_df = generate_smile_data()
-        smile_data = smile_df.to_dict('records')
-        
-        data[currency] = {
-            'skew_matrix': skew_data,
-            'atm_vol': atm_vol_data,
-            'smile_data': smile_data  # Store as list of dicts instead of DataFrame
-        }
+    # Skew matrix data
+    skew_data = []
+    for tenor in base_tenors:
+        row = {'TENOR': tenor}
+        for strategy in strategies:
+            # Generate realistic sample data
+            if strategy == 'ATM':
+                value = 8.0 + np.random.uniform(-0.5, 0.5)
+            elif 'RR' in strategy:
+                value = -0.3 + np.random.uniform(-0.2, 0.2)
+            elif strategy == '10STR':
+                value = 0.9 + np.random.uniform(-0.2, 0.2)
+            else:
+                value = 0.3 + np.random.uniform(-0.1, 0.1)
+            row[strategy] = round(value, 2)
+        skew_data.append(row)
+    
+    # 0D ATM VOL data
+    atm_vol_data = {
+        'current_value': 8.2,
+        'decay_method': 'Exponential',
+        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'applied_vol': 8.2
+    }
     
-    return data
+    return {
+        'skew_matrix': skew_data,
+        'atm_vol': atm_vol_data
+    }
+
+# Smile surfaces built from each pair's skew matrix, cached until its quotes change
+surface_engine = VolSurfaceEngine()
+smile_calibrator = SmileCalibrator()
+# OTM option prices and Greeks on a strikes x tenors grid, repriced per changed tenor
+pricing_grid = PricingGrid(n_strikes=int(os.getenv('IV_PRICING_STRIKES', 41)))
+
+# Intraday decay paths of the applied 0D ATM vol, recomputed incrementally
+decay_engine = AtmDecayEngine()
+
+# Built figures and decay tables shared by every session in this process, keyed
+# by a hash of the pair's inputs and view options. Decay output moves with the
+# clock, so its key also carries the time floored to DECAY_REFRESH_SECONDS.
+figure_cache = FigureCache(max_entries=int(os.getenv('IV_FIGURE_CACHE_ENTRIES', 512)),
+                           ttl=float(os.getenv('IV_FIGURE_CACHE_TTL', 300)))
+DECAY_REFRESH_SECONDS = 60
+
+def calibrate_smiles(volatility_data):
+    """Fit SVI to every changed tenor and store the parameters next to skew_matrix"""
+    surface_engine.update(volatility_data)
+    surfaces = [surface_engine.get(pair) for pair in volatility_data
+                if surface_engine.get(pair) is not None]
+    for pair, result in smile_calibrator.calibrate(surfaces).items():
+        volatility_data[pair]['svi_params'] = result['params']
+        volatility_data[pair]['svi_fit'] = result['fit']
+    return volatility_data
 
-def generate_smile_data():
-    """Generate sample volatility smile data"""
-    strikes = [90, 95, 97.5, 100, 102.5, 105, 110]
-    implied_vols = [8.5, 8.2, 8.0, 7.8, 8.1, 8.4, 8.7]
-    return pd.DataFrame({'Strike': strikes, 'Implied_Vol': implied_vols})
+# Refreshes touching many pairs fit their smiles on a process pool
+# (IV_COMPUTE_WORKERS, default one per core; below 2 everything stays inline).
+# Pool dispatch costs tens of ms, while an inline fit of 60 pairs takes ~12 ms,
+# so only refreshes of at least IV_POOL_MIN_PAIRS pairs go to the pool. Surface
+# builds and arbitrage checks are single vectorised passes and stay inline.
+COMPUTE_WORKERS = int(os.getenv('IV_COMPUTE_WORKERS', os.cpu_count() or 1))
+POOL_MIN_PAIRS = int(os.getenv('IV_POOL_MIN_PAIRS', 100))
+
+def compute_scheduler():
+    return get_compute_scheduler(COMPUTE_WORKERS)
+
+def calibrate_in_pool(scheduler, currencies):
+    """Queue SVI fits for each pair's changed tenors; results land in the shards as they finish"""
+    surface_engine.update({currency: pair_shards.get(currency) for currency in currencies})
+    for currency in currencies:
+        surface = surface_engine.get(currency)
+        if surface is None:
+            continue
+        jobs, inputs = smile_calibrator.prepare(surface)
+        if not jobs:
+            continue
+
+        def install(pair, outputs, compute_ms, surface=surface, jobs=jobs, inputs=inputs):
+            result = smile_calibrator.install(surface, jobs, inputs, outputs, compute_ms)
+            pair_shards.update(pair, lambda pair_data: pair_data.update(
+                svi_params=result['params'], svi_fit=result['fit']))
+
+        scheduler.submit(currency, svi_fit_job, inputs,
+                         {'params': (len(jobs), 5), 'iterations': (len(jobs),)},
+                         on_done=install, key=surface.fingerprint)
+
+# Recent skew versions per pair, so grid refreshes can be sent as transactions
+skew_differ = SkewDiffer(STRATEGIES)
+
+# Every skew matrix seen per pair, for the history charts
+skew_history = SkewHistoryStore(
+    STRATEGIES,
+    capacity=int(os.getenv('IV_HISTORY_CAPACITY', 86400)),
+    spill_dir=os.getenv('IV_HISTORY_DIR') or None
+)
+
+# Butterfly/calendar/quote consistency across all pairs, raised as pricing alerts.
+# New and resolved violations are posted to the alert monitor's ingest route
+# (e.g. http://alert-monitor:8050/api/alerts) when IV_ALERT_INGEST_URL is set.
+ALERT_INGEST_URL = os.getenv('IV_ALERT_INGEST_URL')
+arbitrage_checker = ArbitrageChecker(sink=AlertPoster(ALERT_INGEST_URL).send if ALERT_INGEST_URL else None)
+
+def load_pair_shard(currency, pair_data):
+    """Calibrate a pair's smiles as its shard is brought into memory"""
+    if not skew_history.tenors(currency):
+        skew_history.record(currency, pair_data.get('skew_matrix', []))
+    arbitrage_checker.check({currency: pair_data})
+    return calibrate_smiles({currency: pair_data})[currency]
+
+def evict_pair_shard(currency):
+    """Drop the derived caches of a pair whose shard left memory"""
+    surface_engine.discard(currency)
+    smile_calibrator.discard(currency)
+    pricing_grid.discard(currency)
+    scheduler = compute_scheduler()
+    if scheduler is not None:
+        scheduler.forget(currency)
+
+# Per-pair data stays server-side; a pair is loaded when its tab is opened
+pair_shards = PairShardStore(
+    directory=os.getenv('IV_SHARD_DIR', 'iv_shards'),
+    default_factory=sample_pair_data,
+    on_load=load_pair_shard,
+    on_evict=evict_pair_shard,
+    max_bytes=int(os.getenv('IV_SHARD_CACHE_BYTES', 32 * 1024 * 1024))
+)
 
-# Initialize data store
-initial_data = initialize_sample_data()
+# Streamed quotes (optional); with a stream the screen refreshes every second
+QUOTE_STREAM_URL = os.getenv('IV_QUOTE_STREAM_URL', '')
+REFRESH_MS = int(os.getenv('IV_REFRESH_MS', 1000 if QUOTE_STREAM_URL else 30000))
+
+# Quote cells take the colour of their last move until the next one
+def quote_cell_style():
+    moves = f"params.data.{MOVES_FIELD} && params.data.{MOVES_FIELD}[params.colDef.field]"
+    return {
+        "styleConditions": [
+            {"condition": f"{moves} > 0", "style": {'textAlign': 'center', 'color': '#2ecc71'}},
+            {"condition": f"{moves} < 0", "style": {'textAlign': 'center', 'color': '#e74c3c'}}
+        ],
+        "defaultStyle": {'textAlign': 'center'}
+    }
 
 # Skew Matrix Column Definitions
 skew_column_defs = [
@@ -92,35 +206,35 @@ skew_column_defs = [
         "headerName": "ATM",
         "width": 90,
         "valueFormatter": {"function": "d3.format('.2f')(params.value)"},
-        "cellStyle": {'textAlign': 'center'}
+        "cellStyle": quote_cell_style()
     },
     {
         "field": "10RR",
         "headerName": "10Δ RR",
         "width": 90,
         "valueFormatter": {"function": "d3.format('+.2f')(params.value)"},
-        "cellStyle": {'textAlign': 'center'}
+        "cellStyle": quote_cell_style()
     },
     {
         "field": "10STR",
         "headerName": "10Δ STR",
         "width": 90,
         "valueFormatter": {"function": "d3.format('.2f')(params.value)"},
-        "cellStyle": {'textAlign': 'center'}
+        "cellStyle": quote_cell_style()
     },
     {
         "field": "25RR",
         "headerName": "25Δ RR",
         "width": 90,
         "valueFormatter": {"function": "d3.format('+.2f')(params.value)"},
-        "cellStyle": {'textAlign': 'center'}
+        "cellStyle": quote_cell_style()
     },
     {
         "field": "25STR",
         "headerName": "25Δ STR",
         "width": 90,
         "valueFormatter": {"function": "d3.format('.2f')(params.value)"},
-        "cellStyle": {'textAlign': 'center'}
+        "cellStyle": quote_cell_style()
     }
 ]
 
@@ -130,14 +244,16 @@ def create_skew_matrix_section(currency):
         html.H3(f"{currency} Implied Volatility Skew Matrix", 
                 style={'color': '#34495e', 'marginBottom': '15px'}),
         dag.AgGrid(
-            id=f"skew-matrix-{currency}",
+            id={'type': 'skew-matrix', 'pair': currency},
             columnDefs=skew_column_defs,
             rowData=[],
             defaultColDef={
                 "resizable": True,
                 "sortable": False,
-                "filter": False
+                "filter": False,
+                "enableCellChangeFlash": True
             },
+            getRowId="params.data.TENOR",
             dashGridOptions={
                 "animateRows": False,
                 "suppressRowHoverHighlight": True
@@ -158,7 +274,7 @@ def create_atm_vol_section(currency):
         # Input and controls
         html.Div([
             dcc.Input(
-                id=f"vol-input-{currency}",
+                id={'type': 'vol-input', 'pair': currency},
                 type="number",
                 placeholder="Enter new vol value",
                 step=0.1,
@@ -168,7 +284,7 @@ def create_atm_vol_section(currency):
             ),
             html.Button(
                 "Apply Vol", 
-                id=f"apply-vol-{currency}",
+                id={'type': 'apply-vol', 'pair': currency},
                 n_clicks=0,
                 style={'marginRight': '10px', 'padding': '5px 10px',
                        'backgroundColor': '#0074D9', 'color': 'white', 'border': 'none',
@@ -176,7 +292,7 @@ def create_atm_vol_section(currency):
             ),
             html.Button(
                 "Get Current", 
-                id=f"get-current-{currency}",
+                id={'type': 'get-current', 'pair': currency},
                 n_clicks=0,
                 style={'padding': '5px 10px', 'backgroundColor': '#28a745', 
                        'color': 'white', 'border': 'none', 'borderRadius': '3px',
@@ -185,25 +301,29 @@ def create_atm_vol_section(currency):
         ], style={'marginBottom': '15px'}),
         
         # Current status display
-        html.Div(id=f"current-vol-display-{currency}", 
+        html.Div(id={'type': 'current-vol-display', 'pair': currency}, 
                 style={'marginBottom': '15px', 'padding': '10px', 
                        'backgroundColor': '#ecf0f1', 'borderRadius': '3px'}),
         
         # Decay methods table
         html.H4("Active Decay Methods", style={'marginBottom': '10px'}),
         dash_table.DataTable(
-            id=f"decay-table-{currency}",
+            id={'type': 'decay-table', 'pair': currency},
             columns=[
                 {"name": "Method", "id": "method"},
                 {"name": "Parameter", "id": "parameter"},
                 {"name": "Status", "id": "status"},
+                {"name": "Vol Now", "id": "current_vol"},
                 {"name": "Last Updated", "id": "last_updated"}
             ],
             data=[],
             style_cell={'textAlign': 'left', 'padding': '5px'},
             style_header={'backgroundColor': '#34495e', 'color': 'white', 'fontWeight': 'bold'},
             style_data={'backgroundColor': '#f8f9fa'}
-        )
+        ),
+        
+        # Intraday decay paths
+        dcc.Graph(id={'type': 'decay-chart', 'pair': currency}, style={'height': '250px', 'marginTop': '10px'})
     ], style={'width': '48%', 'display': 'inline-block', 'verticalAlign': 'top', 
               'padding': '15px', 'border': '1px solid #bdc3c7', 'borderRadius': '5px'})
 
@@ -212,10 +332,109 @@ def create_volatility_smile_section(currency):
     return html.Div([
         html.H3(f"{currency} Volatility Smile", 
                 style={'color': '#34495e', 'marginBottom': '15px'}),
-        dcc.Graph(id=f"volatility-smile-{currency}")
+        dcc.Graph(id={'type': 'volatility-smile', 'pair': currency})
+    ], style={'width': '49%', 'marginTop': '20px', 'padding': '15px', 
+              'border': '1px solid #bdc3c7', 'borderRadius': '5px'})
+
+def create_pricing_section(currency):
+    """Create the option pricing grid section"""
+    return html.Div([
+        html.H3(f"{currency} Pricing Grid", 
+                style={'color': '#34495e', 'marginBottom': '15px'}),
+        dcc.RadioItems(
+            id={'type': 'pricing-metric', 'pair': currency},
+            options=GREEKS,
+            value='price',
+            inline=True
+        ),
+        dcc.Graph(id={'type': 'pricing-grid', 'pair': currency}),
+        dcc.Store(id={'type': 'pricing-meta', 'pair': currency}, data={})
+    ], style={'width': '49%', 'marginTop': '20px', 'padding': '15px', 
+              'border': '1px solid #bdc3c7', 'borderRadius': '5px'})
+
+def create_vol_surface_section(currency):
+    """Create the 3D vol surface section (WebGL), with a strike x tenor map to zoom on"""
+    return html.Div([
+        html.H3(f"{currency} Vol Surface", 
+                style={'color': '#34495e', 'marginBottom': '15px'}),
+        html.Div([
+            dcc.Graph(id={'type': 'vol-surface-3d', 'pair': currency},
+                      style={'width': '58%', 'display': 'inline-block'}),
+            dcc.Graph(id={'type': 'vol-surface-map', 'pair': currency},
+                      style={'width': '40%', 'display': 'inline-block'})
+        ], style={'display': 'flex', 'justifyContent': 'space-between'}),
+        dcc.Store(id={'type': 'surface-viewport', 'pair': currency}),
+        dcc.Store(id={'type': 'surface-meta', 'pair': currency}, data={})
     ], style={'width': '100%', 'marginTop': '20px', 'padding': '15px', 
               'border': '1px solid #bdc3c7', 'borderRadius': '5px'})
 
+HISTORY_RANGES = {'15m': 900, '1h': 3600, '4h': 4 * 3600, '1d': 86400}
+
+def create_skew_history_section(currency):
+    """Create the skew history time-series section"""
+    tenors = [row['TENOR'] for row in pair_shards.get(currency).get('skew_matrix', [])]
+    return html.Div([
+        html.H3(f"{currency} Skew History", 
+                style={'color': '#34495e', 'marginBottom': '15px'}),
+        html.Div([
+            dcc.Dropdown(
+                id={'type': 'history-tenor', 'pair': currency},
+                options=tenors,
+                value=tenors[0] if tenors else None,
+                clearable=False,
+                style={'width': '120px', 'display': 'inline-block', 'marginRight': '10px'}
+            ),
+            dcc.Checklist(
+                id={'type': 'history-strategies', 'pair': currency},
+                options=STRATEGIES,
+                value=['ATM', '25RR'],
+                inline=True,
+                style={'display': 'inline-block', 'marginRight': '10px'}
+            ),
+            dcc.RadioItems(
+                id={'type': 'history-range', 'pair': currency},
+                options=list(HISTORY_RANGES),
+                value='1d',
+                inline=True,
+                style={'display': 'inline-block'}
+            )
+        ]),
+        dcc.Graph(id={'type': 'skew-history', 'pair': currency})
+    ], style={'width': '100%', 'marginTop': '20px', 'padding': '15px', 
+              'border': '1px solid #bdc3c7', 'borderRadius': '5px'})
+
+def create_bulk_shift_section():
+    """Create the bulk shift section (several pairs/tenors at once, with preview)"""
+    return html.Details([
+        html.Summary("Bulk Vol Shift", style={'fontWeight': 'bold', 'cursor': 'pointer'}),
+        html.Div([
+            dcc.Dropdown(id='bulk-pairs', options=[{'label': pair.label, 'value': pair.code} for pair in pairs()],
+                         multi=True, placeholder="Pairs",
+                         style={'width': '320px', 'display': 'inline-block', 'marginRight': '10px'}),
+            dcc.Dropdown(id='bulk-tenors', options=[], multi=True, placeholder="All tenors",
+                         style={'width': '260px', 'display': 'inline-block', 'marginRight': '10px'}),
+            dcc.Checklist(id='bulk-components', options=list(COMPONENTS), value=['ATM'], inline=True,
+                          style={'display': 'inline-block', 'marginRight': '10px'}),
+            dcc.RadioItems(id='bulk-mode', options=[{'label': 'vol pts', 'value': ABSOLUTE},
+                                                    {'label': '%', 'value': RELATIVE}],
+                           value=ABSOLUTE, inline=True, style={'display': 'inline-block', 'marginRight': '10px'}),
+            dcc.Input(id='bulk-amount', type='number', step=0.05, value=0.5,
+                      style={'width': '80px', 'marginRight': '10px'}),
+            html.Button("Preview", id='bulk-preview', n_clicks=0,
+                        style={'backgroundColor': '#3498db', 'color': 'white', 'border': 'none',
+                               'padding': '8px 16px', 'borderRadius': '4px', 'marginRight': '10px'}),
+            html.Button("Apply Shift", id='bulk-apply', n_clicks=0,
+                        style={'backgroundColor': '#27ae60', 'color': 'white', 'border': 'none',
+                               'padding': '8px 16px', 'borderRadius': '4px'})
+        ], style={'marginTop': '10px'}),
+        html.Div(id='bulk-status', style={'marginTop': '10px'}),
+        dcc.Dropdown(id='bulk-preview-pair', options=[], clearable=False,
+                     style={'width': '160px', 'marginTop': '10px'}),
+        dcc.Graph(id='bulk-preview-graph'),
+        html.Div(id='bulk-preview-summary')
+    ], style={'marginBottom': '20px', 'padding': '15px',
+              'border': '1px solid #bdc3c7', 'borderRadius': '5px'})
+
 app.layout = html.Div([
     # Header
     html.Div([
@@ -223,25 +442,22 @@ app.layout = html.Div([
                 style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': '30px'})
     ]),
     
-    # Data storage
-    dcc.Store(id='volatility-data', data=initial_data),
+    # Data storage: pair data is server-side in pair_shards
+    dcc.Store(id='recent-pairs', storage_type='local'),
     dcc.Store(id='api-config', data={
         'api_endpoint': os.getenv('VOLATILITY_API_ENDPOINT', 'http://localhost:8000/api'),
         'data_file_path': os.getenv('DATA_FILE_PATH', '/shared/volatility_data.json'),
         'update_interval': 30000  # 30 seconds
     }),
     
+    create_bulk_shift_section(),
+
     # Main tabs for currency pairs
-    dcc.Tabs(id="currency-tabs", value='EURUSD', children=[
-        dcc.Tab(label='EUR/USD', value='EURUSD', 
-                style={'padding': '10px', 'fontWeight': 'bold'},
-                selected_style={'backgroundColor': '#0074D9', 'color': 'white'}),
-        dcc.Tab(label='USD/JPY', value='USDJPY',
+    dcc.Tabs(id="currency-tabs", value=pair_codes()[0], children=[
+        dcc.Tab(label=pair.label, value=pair.code,
                 style={'padding': '10px', 'fontWeight': 'bold'},
-                selected_style={'backgroundColor': '#0074D9', 'color': 'white'}),
-        dcc.Tab(label='GBP/USD', value='GBPUSD',
-                style={'padding': '10px', 'fontWeight': 'bold'},
-                selected_style={'backgroundColor': '#0074D9', 'color': 'white'}),
+                selected_style={'backgroundColor': '#0074D9', 'color': 'white'})
+        for pair in pairs()
     ], style={'marginBottom': '20px'}),
     
     # Tab content
@@ -250,7 +466,7 @@ app.layout = html.Div([
     # Auto-update component
     dcc.Interval(
         id='interval-component',
-        interval=30000,  # 30 seconds
+        interval=REFRESH_MS,
         n_intervals=0
     )
 ])
@@ -268,80 +484,464 @@ def render_tab_content(selected_currency):
             create_atm_vol_section(selected_currency)
         ], style={'display': 'flex', 'justifyContent': 'space-between', 'marginBottom': '20px'}),
         
-        # Lower section with volatility smile graph
-        create_volatility_smile_section(selected_currency)
+        # Lower section with volatility smile graph and the pricing grid beside it
+        html.Div([
+            create_volatility_smile_section(selected_currency),
+            create_pricing_section(selected_currency)
+        ], style={'display': 'flex', 'justifyContent': 'space-between'}),
+        create_vol_surface_section(selected_currency),
+        create_skew_history_section(selected_currency),
+
+        # Change counter for this pair, and hashes of what the browser is showing
+        dcc.Store(id={'type': 'pair-version', 'pair': selected_currency}, data=0),
+        dcc.Store(id={'type': 'render-meta', 'pair': selected_currency}, data={})
     ])
 
-# FIXED CALLBACK - This replaces the problematic callback
+@app.callback(
+    Output('recent-pairs', 'data'),
+    Input('currency-tabs', 'value'),
+    State('recent-pairs', 'data')
+)
+def track_recent_pairs(selected_currency, recent):
+    """Remember this browser's recently used pairs and warm their shards"""
+    recent = [pair for pair in remember_pair(recent, selected_currency) if is_registered(pair)]
+    pair_shards.prefetch(recent[1:])
+    return recent
+
+# One set of pattern-matching callbacks serves every registered pair. Only the
+# selected tab's components exist, and mounting them fires the MATCH callback.
+# Outputs are sent as Patches against what the browser already has (render-meta),
+# so an unchanged component costs nothing and a changed one only its new parts.
 
 @app.callback(
-    [Output("skew-matrix-EURUSD", "rowData"),
-     Output("decay-table-EURUSD", "data"),
-     Output("volatility-smile-EURUSD", "figure"),
-     Output("current-vol-display-EURUSD", "children")],
+    [Output({'type': 'skew-matrix', 'pair': MATCH}, "rowData"),
+     Output({'type': 'decay-table', 'pair': MATCH}, "data"),
+     Output({'type': 'volatility-smile', 'pair': MATCH}, "figure"),
+     Output({'type': 'current-vol-display', 'pair': MATCH}, "children"),
+     Output({'type': 'decay-chart', 'pair': MATCH}, "figure"),
+     Output({'type': 'render-meta', 'pair': MATCH}, "data"),
+     Output({'type': 'skew-matrix', 'pair': MATCH}, "rowTransaction")],
     [Input('interval-component', 'n_intervals'),
-     Input('currency-tabs', 'value'),
-     Input('volatility-data', 'data')]
+     Input({'type': 'pair-version', 'pair': MATCH}, 'data')],
+    [State({'type': 'render-meta', 'pair': MATCH}, 'data')]
 )
-def update_all_components(n_intervals, selected_currency, volatility_data):
-    """Update components with current data, but only for the active tab."""
+def update_all_components(n_intervals, version, render_meta):
+    """Update the mounted pair's components with current data."""
     ctx = dash.callback_context
+    selected_currency = ctx.outputs_list[0]['id']['pair']
     triggered_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
 
-    # Update data from external sources if interval triggered
+    # External updates are written into the shards by the background fetcher
     if triggered_id == 'interval-component':
-        updated_data = fetch_updated_data(volatility_data)
-        if updated_data:
-            volatility_data = updated_data
+        data_fetcher()
+        quote_stream()
 
-    # Initialize outputs with dash.no_update for all components
-    # 3 currencies * (1 skew + 1 decay + 1 graph + 1 display) = 12 outputs
-    outputs = [dash.no_update] * 12
-
-    # Calculate the index positions for the selected currency's outputs in the list
-    currency_index = ['EURUSD', 'USDJPY', 'GBPUSD'].index(selected_currency)
-    skew_index = currency_index
-    decay_index = 3 + currency_index  # After 3 skew matrices
-    graph_index = 6 + currency_index  # After 3 decay tables
-    display_index = 9 + currency_index # After 3 graphs
+    render_meta = render_meta or {}
+    outputs = [dash.no_update] * 7
+    meta = dict(render_meta)
 
     try:
-        # Update only the components for the SELECTED currency
-        # 1. Skew matrix data
-        skew_data = volatility_data.get(selected_currency, {}).get('skew_matrix', [])
-        outputs[skew_index] = skew_data
-
-        # 2. Decay methods table data
-        decay_data = [
-            {
-                'method': 'Exponential Decay',
-                'parameter': 'λ=0.05',
-                'status': 'Active',
-                'last_updated': volatility_data.get(selected_currency, {}).get('atm_vol', {}).get('last_updated', 'N/A')
-            }
-        ]
-        outputs[decay_index] = decay_data
+        pair_data = pair_shards.get(selected_currency)
+
+        # 1. Skew matrix data: only the rows that moved, or everything if the
+        # browser's version is unknown here
+        skew_data = pair_data.get('skew_matrix', [])
+        meta['skew'] = digest(skew_data)
+        if meta['skew'] != render_meta.get('skew'):
+            transaction = skew_differ.transaction(selected_currency, render_meta.get('skew'),
+                                                  meta['skew'], skew_data)
+            if transaction is None:
+                outputs[0] = skew_data
+            elif transaction:
+                outputs[6] = transaction
+
+        # 2. Decay methods table data and intraday decay chart
+        stamp = datetime.now().timestamp()
+        now = datetime.fromtimestamp(stamp - stamp % DECAY_REFRESH_SECONDS)
+        decay_data, decay_spec, decay_meta = figure_cache.get_or_build(
+            'decay', (selected_currency, pair_data.get('atm_vol'), meta['skew'], now.isoformat()),
+            lambda: cached_decay(selected_currency, pair_data, now))
+        outputs[1], meta['decay'] = patch_value(decay_data, render_meta.get('decay'))
+        outputs[4], meta['decay_chart'] = patch_figure(decay_spec, render_meta.get('decay_chart'), decay_meta)
 
         # 3. Volatility smile graph
-        smile_data = volatility_data.get(selected_currency, {}).get('smile_data', [])
-        smile_df = pd.DataFrame(smile_data) if smile_data else pd.DataFrame()
-        fig = create_volatility_smile_figure(smile_df, selected_currency)
-        outputs[graph_index] = fig
+        fig, fig_meta = figure_cache.figure(
+            'smile', (selected_currency, quote_fingerprint(pair_data)),
+            lambda: smile_figure(selected_currency, pair_data))
+        outputs[2], meta['smile'] = patch_figure(fig, render_meta.get('smile'), fig_meta)
 
         # 4. Current vol display
-        current_vol = volatility_data.get(selected_currency, {}).get('atm_vol', {}).get('current_value', 'N/A')
+        current_vol = pair_data.get('atm_vol', {}).get('current_value', 'N/A')
         vol_display = html.Div([
             html.Strong("Current 0D ATM Vol: "),
             html.Span(f"{current_vol}%", 
                     style={'color': '#e74c3c', 'fontWeight': 'bold', 'fontSize': '16px'})
         ])
-        outputs[display_index] = vol_display
+        outputs[3], meta['display'] = patch_value(vol_display, render_meta.get('display'))
+
+        outputs[5] = patch_dict(meta, render_meta)
 
     except Exception as e:
         logger.error(f"Error updating components for {selected_currency}: {e}")
 
     return outputs
 
+@app.callback(
+    [Output({'type': 'pricing-grid', 'pair': MATCH}, 'figure'),
+     Output({'type': 'pricing-meta', 'pair': MATCH}, 'data')],
+    [Input('interval-component', 'n_intervals'),
+     Input({'type': 'pair-version', 'pair': MATCH}, 'data'),
+     Input({'type': 'pricing-metric', 'pair': MATCH}, 'value')],
+    [State({'type': 'pricing-meta', 'pair': MATCH}, 'data')]
+)
+def update_pricing_grid(n_intervals, version, metric, pricing_meta):
+    """Heatmap of one Greek across strikes and tenors (puts below the forward, calls above)"""
+    currency = dash.callback_context.outputs_list[0]['id']['pair']
+    pair_data = pair_shards.get(currency)
+    fig, fig_meta = figure_cache.figure(
+        'pricing', (currency, quote_fingerprint(pair_data), pair_rates(pair_data), metric),
+        lambda: pricing_figure(currency, pair_data, metric))
+    return patch_figure(fig, pricing_meta, fig_meta)
+
+def pricing_figure(currency, pair_data, metric):
+    fig = go.Figure()
+    if pair_data.get('skew_matrix'):
+        domestic_rate, foreign_rate = pair_rates(pair_data)
+        grid = pricing_grid.grid(surface_engine.surface(currency, pair_data), domestic_rate, foreign_rate)
+        fig.add_trace(go.Heatmap(
+            x=np.round(grid['strikes'], 4), y=grid['tenors'], z=np.round(grid[metric], 6),
+            customdata=np.round(grid['vol'], 3), colorscale='Viridis',
+            hovertemplate="%{y} K=%{x}<br>" + metric + "=%{z}<br>vol=%{customdata}%<extra></extra>"
+        ))
+    fig.update_layout(
+        template="plotly_dark",
+        title=f"{currency} OTM {metric.title()} (Garman-Kohlhagen)",
+        xaxis_title="Strike Price",
+        yaxis_title="Tenor",
+        height=400
+    )
+    return fig
+
+# The surface mesh is sampled at the resolution the map is drawn at (from the
+# browser's viewport size), and zooming the map resamples just the zoomed
+# window at that same resolution, so dense surfaces stay light in the browser.
+SURFACE_MAP_WIDTH = 0.38
+SURFACE_HEIGHT = 450
+
+app.clientside_callback(
+    "function(id) { return {width: window.innerWidth, height: window.innerHeight}; }",
+    Output({'type': 'surface-viewport', 'pair': MATCH}, 'data'),
+    Input({'type': 'surface-viewport', 'pair': MATCH}, 'id')
+)
+
+def surface_window(relayout, window):
+    """Zoom window {'x': strikes, 'y': years} after a map relayout event (None = full range)"""
+    window = dict(window or {})
+    for axis in ('x', 'y'):
+        if relayout.get(f'{axis}axis.autorange'):
+            window[axis] = None
+        elif f'{axis}axis.range[0]' in relayout:
+            window[axis] = [relayout[f'{axis}axis.range[0]'], relayout[f'{axis}axis.range[1]']]
+        elif f'{axis}axis.range' in relayout:
+            window[axis] = list(relayout[f'{axis}axis.range'])
+    return window
+
+@app.callback(
+    [Output({'type': 'vol-surface-3d', 'pair': MATCH}, 'figure'),
+     Output({'type': 'vol-surface-map', 'pair': MATCH}, 'figure'),
+     Output({'type': 'surface-meta', 'pair': MATCH}, 'data')],
+    [Input('interval-component', 'n_intervals'),
+     Input({'type': 'pair-version', 'pair': MATCH}, 'data'),
+     Input({'type': 'vol-surface-map', 'pair': MATCH}, 'relayoutData'),
+     Input({'type': 'surface-viewport', 'pair': MATCH}, 'data')],
+    [State({'type': 'surface-meta', 'pair': MATCH}, 'data')]
+)
+def update_vol_surface(n_intervals, version, relayout, viewport, surface_meta):
+    """3D surface and its map, meshed at screen resolution over the current zoom window"""
+    ctx = dash.callback_context
+    currency = ctx.outputs_list[0]['id']['pair']
+    surface_meta = surface_meta or {}
+    window = surface_meta.get('window')
+    if ctx.triggered and ctx.triggered[0]['prop_id'].endswith('.relayoutData') and relayout:
+        window = surface_window(relayout, window)
+
+    viewport = viewport or {}
+    n_strikes = mesh_points(viewport.get('width', 0) * SURFACE_MAP_WIDTH)
+    n_years = mesh_points(min(viewport.get('height', 0), SURFACE_HEIGHT))
+    pair_data = pair_shards.get(currency)
+    surface_spec, surface_fig_meta, map_spec, map_fig_meta = figure_cache.get_or_build(
+        'surface', (currency, quote_fingerprint(pair_data), window, n_strikes, n_years),
+        lambda: vol_surface_figures(currency, pair_data, window or {}, n_strikes, n_years))
+
+    surface_out, surface_meta_new = patch_figure(surface_spec, surface_meta.get('surface'), surface_fig_meta)
+    map_out, map_meta_new = patch_figure(map_spec, surface_meta.get('map'), map_fig_meta)
+    return surface_out, map_out, patch_dict({'surface': surface_meta_new, 'map': map_meta_new, 'window': window},
+                                            surface_meta)
+
+def vol_surface_figures(currency, pair_data, window, n_strikes, n_years):
+    """(3D figure JSON, its figure_meta, map figure JSON, its figure_meta) for figure_cache"""
+    surface_fig, map_fig = go.Figure(), go.Figure()
+    title = f"{currency} Implied Vol Surface"
+    if pair_data.get('skew_matrix'):
+        surface = surface_engine.surface(currency, pair_data)
+        mesh = surface_mesh(surface, n_strikes, n_years, window.get('x'), window.get('y'))
+        strikes, years, vols = np.round(mesh['strikes'], 4), np.round(mesh['years'], 4), np.round(mesh['vols'], 3)
+        order = np.argsort(surface.years)
+        ticks = {'tickvals': np.round(surface.years[order], 4), 'ticktext': [surface.tenors[i] for i in order]}
+        surface_fig.add_trace(go.Surface(
+            x=strikes, y=years, z=vols, colorscale='Viridis', showscale=False,
+            hovertemplate="K=%{x}<br>T=%{y}y<br>vol=%{z}%<extra></extra>"
+        ))
+        surface_fig.update_layout(scene={'xaxis_title': "Strike", 'yaxis': {'title': "Tenor", **ticks},
+                                         'zaxis_title': "Vol (%)"})
+        map_fig.add_trace(go.Heatmap(
+            x=strikes, y=years, z=vols, colorscale='Viridis',
+            hovertemplate="K=%{x}<br>T=%{y}y<br>vol=%{z}%<extra></extra>"
+        ))
+        map_fig.update_layout(yaxis=ticks)
+        if mesh['zoomed']:
+            title += f" (zoomed, {n_years}x{n_strikes})"
+    # uirevision keeps the 3D camera and the map zoom across data refreshes
+    surface_fig.update_layout(template="plotly_dark", title=title, height=SURFACE_HEIGHT,
+                              margin={'l': 0, 'r': 0, 't': 40, 'b': 0}, uirevision=currency)
+    map_fig.update_layout(template="plotly_dark", title="Zoom to refine, double-click to reset",
+                          xaxis_title="Strike", yaxis_title="Tenor", height=SURFACE_HEIGHT,
+                          uirevision=currency)
+    surface_spec, map_spec = surface_fig.to_plotly_json(), map_fig.to_plotly_json()
+    return surface_spec, figure_meta(surface_spec), map_spec, figure_meta(map_spec)
+
+@server.route('/api/surface/<pair>/vols', methods=['POST'])
+def query_surface_vols(pair):
+    """Batch vol lookup on the same cached surfaces the dashboard uses.
+
+    Body: {"tenors": ["3M", 0.75, ...], "strikes": [101.2, ...]} (equal lengths,
+    or one of them a single value that is broadcast).
+    """
+    payload = request.get_json(silent=True) or {}
+    tenors = payload.get('tenors')
+    strikes = payload.get('strikes')
+    if tenors is None or strikes is None:
+        return jsonify({'error': "'tenors' and 'strikes' are required"}), 400
+    if not is_registered(pair):
+        return jsonify({'error': f"No surface for {pair}"}), 404
+    pair_data = pair_shards.get(pair)
+    if not pair_data.get('skew_matrix'):
+        return jsonify({'error': f"No skew quotes for {pair}"}), 404
+    surface_engine.surface(pair, pair_data)
+    try:
+        vols = surface_engine.query(pair, tenors, strikes)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    # Points on tenors with incomplete quotes have no vol; NaN is not valid JSON
+    return jsonify({'pair': pair, 'vols': [vol if np.isfinite(vol) else None
+                                           for vol in np.round(vols, 4).tolist()]})
+
+# Bulk shift previews are computed for all selected pairs in one pass over
+# snapshots of the shards. Apply re-runs the shift on each pair inside its
+# shard update, so quotes that arrived since the preview are kept.
+
+def bulk_shift(selected_pairs, tenors, components, mode, amount):
+    """(current pair data, shifted changes) for the selected, registered pairs"""
+    data = {pair: pair_shards.get(pair) for pair in selected_pairs or [] if is_registered(pair)}
+    return data, shift_pairs(data, tenors or None, components or [], mode, float(amount))
+
+@app.callback(
+    [Output('bulk-tenors', 'options'),
+     Output('bulk-preview-pair', 'options'),
+     Output('bulk-preview-pair', 'value')],
+    Input('bulk-pairs', 'value'),
+    State('bulk-preview-pair', 'value')
+)
+def update_bulk_choices(selected_pairs, preview_pair):
+    """Tenor choices are the union of the selected pairs' tenors"""
+    selected_pairs = [pair for pair in selected_pairs or [] if is_registered(pair)]
+    tenors = {row['TENOR'] for pair in selected_pairs for row in pair_shards.get(pair).get('skew_matrix', [])}
+    if preview_pair not in selected_pairs:
+        preview_pair = selected_pairs[0] if selected_pairs else None
+    return sorted(tenors, key=tenor_to_years), selected_pairs, preview_pair
+
+@app.callback(
+    [Output('bulk-preview-graph', 'figure'),
+     Output('bulk-preview-summary', 'children')],
+    [Input('bulk-preview', 'n_clicks'),
+     Input('bulk-preview-pair', 'value')],
+    [State('bulk-pairs', 'value'),
+     State('bulk-tenors', 'value'),
+     State('bulk-components', 'value'),
+     State('bulk-mode', 'value'),
+     State('bulk-amount', 'value')],
+    prevent_initial_call=True
+)
+def preview_bulk_shift(clicks, preview_pair, selected_pairs, tenors, components, mode, amount):
+    """What-if smiles and changed quotes for a bulk shift, without storing anything"""
+    if not clicks or not selected_pairs or amount is None:
+        return dash.no_update, dash.no_update
+    data, shifted = bulk_shift(selected_pairs, tenors, components, mode, amount)
+    summary = shift_summary(data, shifted)
+    surfaces = preview_surfaces(data, shifted)
+
+    fig = go.Figure()
+    if preview_pair in data and data[preview_pair].get('skew_matrix'):
+        base = surface_engine.surface(preview_pair, data[preview_pair])
+        after = surfaces.get(preview_pair, base)
+        for index, tenor in enumerate(base.tenors):
+            color = px.colors.qualitative.Plotly[index % len(px.colors.qualitative.Plotly)]
+            fig.add_trace(go.Scatter(x=base.strikes[index], y=base.vols[index], name=f"{tenor} now",
+                                     legendgroup=tenor, line={'color': color, 'dash': 'dot'}))
+            fig.add_trace(go.Scatter(x=after.strikes[index], y=after.vols[index], name=f"{tenor} shifted",
+                                     legendgroup=tenor, line={'color': color}, mode='lines+markers'))
+    fig.update_layout(title=f"{preview_pair or ''} Smile After Shift", xaxis_title="Strike Price",
+                      yaxis_title="Implied Volatility (%)", template="plotly_dark", height=400)
+
+    before_alerts = len(find_violations(data))
+    after_alerts = len(find_violations({pair: {**data[pair], **shifted[pair]} for pair in data}))
+    return fig, html.Div([
+        html.P(f"{len(summary)} quotes across {len(data)} pairs would change; "
+               f"arbitrage violations {before_alerts} -> {after_alerts}",
+               style={'color': '#e74c3c' if after_alerts > before_alerts else '#27ae60'}),
+        dash_table.DataTable(data=summary, page_size=15,
+                             columns=[{'name': key.title(), 'id': key}
+                                      for key in ('pair', 'tenor', 'strategy', 'before', 'after')],
+                             style_cell={'textAlign': 'center'})
+    ])
+
+@app.callback(
+    [Output('bulk-status', 'children'),
+     Output({'type': 'pair-version', 'pair': ALL}, 'data', allow_duplicate=True)],
+    Input('bulk-apply', 'n_clicks'),
+    [State('bulk-pairs', 'value'),
+     State('bulk-tenors', 'value'),
+     State('bulk-components', 'value'),
+     State('bulk-mode', 'value'),
+     State('bulk-amount', 'value'),
+     State({'type': 'pair-version', 'pair': ALL}, 'data')],
+    prevent_initial_call=True
+)
+def apply_bulk_shift(clicks, selected_pairs, tenors, components, mode, amount, versions):
+    """Shift the selected pairs/tenors in their shards and recalibrate the shifted smiles"""
+    if not clicks or not selected_pairs or not components or amount is None:
+        return "Select pairs, components and an amount first", [dash.no_update] * len(versions)
+    updated = {}
+    for pair in selected_pairs:
+        if not is_registered(pair):
+            continue
+        shifted = {}
+
+        def apply_shift(pair_data, pair=pair, shifted=shifted):
+            # Shift the shard as it is now; only the shifted keys are replaced
+            shifted.update(shift_pairs({pair: pair_data}, tenors or None, components, mode, float(amount))[pair])
+            pair_data.update(shifted)
+            if 'skew_matrix' in shifted:
+                calibrate_smiles({pair: pair_data})
+
+        pair_data = pair_shards.update(pair, apply_shift)
+        if not shifted:
+            continue
+        updated[pair] = pair_data
+        if 'skew_matrix' in shifted:
+            skew_history.record(pair, pair_data['skew_matrix'])
+    arbitrage_checker.check(updated)
+    unit = 'vol pts' if mode == ABSOLUTE else '%'
+    logger.info(f"Bulk shift {amount:+g} {unit} of {components} on {sorted(updated)} tenors {tenors or 'all'}")
+    return (f"Shifted {', '.join(components)} by {amount:+g} {unit} on {len(updated)} pairs",
+            [(version or 0) + 1 for version in versions])
+
+@server.route('/api/figure-cache/stats', methods=['GET'])
+def figure_cache_stats():
+    """Hit/miss counters and size of this process's figure cache"""
+    return jsonify(figure_cache.stats())
+
+@server.route('/api/arbitrage/alerts', methods=['GET'])
+def arbitrage_alerts():
+    """Open arbitrage violations as alert dicts, optionally for one ?pair="""
+    pair = request.args.get('pair')
+    alerts = arbitrage_checker.active_alerts(pair)
+    return jsonify({'alerts': [json.loads(alert.json()) for alert in alerts],
+                    'elapsed_ms': arbitrage_checker.last_elapsed_ms})
+
+@app.callback(
+    Output({'type': 'skew-history', 'pair': MATCH}, 'figure'),
+    [Input('interval-component', 'n_intervals'),
+     Input({'type': 'history-tenor', 'pair': MATCH}, 'value'),
+     Input({'type': 'history-strategies', 'pair': MATCH}, 'value'),
+     Input({'type': 'history-range', 'pair': MATCH}, 'value')]
+)
+def update_skew_history(n_intervals, tenor, strategies, history_range):
+    """Downsampled history of the selected tenor's quotes"""
+    currency = dash.callback_context.outputs_list['id']['pair']
+    fig = go.Figure()
+    for strategy in strategies or []:
+        times, values = skew_history.series(currency, tenor, strategy,
+                                            span_seconds=HISTORY_RANGES.get(history_range, 86400),
+                                            max_points=1000)
+        fig.add_trace(go.Scattergl(x=times, y=values, mode='lines+markers' if len(times) < 50 else 'lines',
+                                   name=strategy))
+    fig.update_layout(
+        template="plotly_dark",
+        margin={'l': 40, 'r': 10, 't': 30, 'b': 30},
+        title=f"{currency} {tenor} Skew History",
+        yaxis_title="Vol (%)",
+        legend={'orientation': 'h'},
+        height=300
+    )
+    return fig
+
+def smile_figure(currency, pair_data):
+    surface = surface_engine.surface(currency, pair_data) if pair_data.get('skew_matrix') else None
+    smile_df = surface.to_frame() if surface is not None else pd.DataFrame()
+    return create_volatility_smile_figure(smile_df, currency)
+
+def cached_decay(currency, pair_data, now):
+    """(table rows, chart JSON, chart figure_meta) for figure_cache"""
+    decay_data, fig = evaluate_decay(currency, pair_data, now)
+    spec = fig.to_plotly_json()
+    return decay_data, spec, figure_meta(spec)
+
+def evaluate_decay(currency, pair_data, now=None):
+    """Decay table rows and intraday chart from the decay engine's output"""
+    atm_vol = pair_data.get('atm_vol', {})
+    skew_rows = pair_data.get('skew_matrix', [])
+    if 'applied_vol' not in atm_vol or not skew_rows:
+        return [], go.Figure()
+
+    # Decay target: ATM of the shortest quoted tenor
+    target = min(skew_rows, key=lambda row: tenor_to_years(row['TENOR']))['ATM']
+    now = now or datetime.now()
+    # Only an apply sets applied_at (quote and refresh updates just move last_updated);
+    # a vol never applied here decays from the start of the day
+    if 'applied_at' in atm_vol:
+        applied_at = datetime.strptime(atm_vol['applied_at'], '%Y-%m-%d %H:%M:%S')
+    else:
+        applied_at = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    curve = decay_engine.evaluate(currency, float(atm_vol['applied_vol']), applied_at, float(target), now=now)
+    current = decay_engine.current_values(curve, now)
+
+    active_method = atm_vol.get('decay_method', 'Exponential')
+    decay_data = [
+        {
+            'method': method,
+            'parameter': describe_parameters(method, decay_engine.methods[method]),
+            'status': 'Active' if method == active_method else 'Available',
+            'current_vol': 'N/A' if np.isnan(current[method]) else f"{current[method]:.2f}",
+            'last_updated': atm_vol.get('last_updated', 'N/A')
+        }
+        for method in curve.methods
+    ]
+
+    fig = go.Figure()
+    for i, method in enumerate(curve.methods):
+        fig.add_trace(go.Scatter(x=curve.times, y=curve.values[i], mode='lines', name=method,
+                                 line={'width': 3 if method == active_method else 1}))
+    fig.add_vline(x=now, line_dash='dot')
+    fig.update_layout(
+        template="plotly_dark",
+        margin={'l': 40, 'r': 10, 't': 30, 'b': 30},
+        title=f"{currency} 0D ATM Vol Decay",
+        yaxis_title="Vol (%)",
+        legend={'orientation': 'h'}
+    )
+    return decay_data, fig
+
 def create_volatility_smile_figure(smile_df, currency):
     """Create volatility smile plot"""
     if smile_df.empty or 'Strike' not in smile_df.columns or 'Implied_Vol' not in smile_df.columns:
@@ -357,126 +957,140 @@ def create_volatility_smile_figure(smile_df, currency):
         return fig
     
     fig = px.line(smile_df, x='Strike', y='Implied_Vol', template="plotly_dark",
+                  color='Tenor' if 'Tenor' in smile_df.columns else None,
+                  hover_data=['Delta'] if 'Delta' in smile_df.columns else None,
                   title=f"{currency} Volatility Smile",
                   markers=True)
     
     fig.update_layout(
         xaxis_title="Strike Price",
         yaxis_title="Implied Volatility (%)",
-        showlegend=False,
+        showlegend='Tenor' in smile_df.columns,
         template="plotly_white",
         height=400
     )
     
     return fig
 
-def fetch_updated_data(current_data):
-    """
-    Fetch updated data from API and file system
-    This function handles both API calls and file reading
+def overlay_fetched(shard, pair_data):
+    """Overlay fetched data onto a shard, keeping track of when its 0D ATM vol was applied.
+
+    Payloads carry applied_vol but not applied_at: a changed applied vol is
+    stamped as applied now, an unchanged one keeps the shard's applied_at.
     """
-    try:
-        updated_data = current_data.copy()
-        
-        # Try API first
-        try:
-            api_config = current_data.get('api_config', {})
-            api_endpoint = api_config.get('api_endpoint', '')
-            if api_endpoint:
-                response = requests.get(api_endpoint, timeout=10)
-                if response.status_code == 200:
-                    api_data = response.json()
-                    updated_data.update(api_data)
-                    logger.info("Successfully updated data from API")
-        except Exception as e:
-            logger.warning(f"API update failed: {e}")
-        
-        # Try file system
-        try:
-            file_path = current_data.get('api_config', {}).get('data_file_path', '')
-            if file_path and os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    file_data = json.load(f)
-                updated_data.update(file_data)
-                logger.info("Successfully updated data from file")
-        except Exception as e:
-            logger.warning(f"File update failed: {e}")
-        
-        return updated_data
-        
-    except Exception as e:
-        logger.error(f"Data update failed: {e}")
-        return current_data
-for currency in ['EURUSD', 'USDJPY', 'GBPUSD']:
-    @app.callback(
-        Output('volatility-data', 'data', allow_duplicate=True),
-        [Input(f"apply-vol-{currency}", "n_clicks")],
-        [State(f"vol-input-{currency}", "value") ],
-        [State('volatility-data', 'data')],
-        prevent_initial_call=True
-    )
-    def update_volatility_value(clicks, vol, volatility_data):
-        """Update volatility value when Apply button is clicked"""
-        ctx = dash.callback_context
-        if not ctx.triggered:
-            return dash.no_update
-        #usd_clicks, gbp_clicks, eur_vol, usd_vol, gbp_
-        # Get the triggered button
-        triggered_id = ctx.triggered[0]['prop_id']
-        
-        # Determine which currency was triggered
-        if 'EURUSD' in triggered_id:
-            currency = 'EURUSD'
-            new_vol_value = vol
-        elif 'USDJPY' in triggered_id:
-            currency = 'USDJPY'
-            new_vol_value = vol
-        elif 'GBPUSD' in triggered_id:
-            currency = 'GBPUSD'
-            new_vol_value = vol
+    previous = shard.get('atm_vol') or {}
+    shard.update(pair_data)
+    atm_vol = shard.get('atm_vol')
+    if isinstance(atm_vol, dict) and 'applied_vol' in atm_vol and 'applied_at' not in atm_vol:
+        if atm_vol['applied_vol'] != previous.get('applied_vol'):
+            applied_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         else:
-            return dash.no_update
-        
-        if new_vol_value is not None:
-            # Update the data
-            if currency in volatility_data:
-                volatility_data[currency]['atm_vol']['current_value'] = float(new_vol_value)
-                volatility_data[currency]['atm_vol']['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                volatility_data[currency]['atm_vol']['applied_vol'] = float(new_vol_value)
-                logger.info(f"Updated {currency} vol to {new_vol_value}")
-        
-        return volatility_data
+            applied_at = previous.get('applied_at')
+        if applied_at:
+            shard['atm_vol'] = {**atm_vol, 'applied_at': applied_at}
+
+def store_fetched_data(updates):
+    """Calibrate fetched pairs and write them into their shards (fetcher thread)"""
+    updates = {pair: pair_data for pair, pair_data in updates.items() if is_registered(pair)}
+    for pair, pair_data in updates.items():
+        if isinstance(pair_data, dict):
+            skew_history.record(pair, pair_data.get('skew_matrix', []))
+    scheduler = compute_scheduler() if len(updates) >= POOL_MIN_PAIRS else None
+    if scheduler is None:
+        written = pair_shards.merge(calibrate_smiles(updates), overlay_fetched)
+    else:
+        written = pair_shards.merge(updates, overlay_fetched)
+        calibrate_in_pool(scheduler, written)
+    arbitrage_checker.check({pair: pair_shards.get(pair) for pair in written})
+
+def apply_quote_updates(updates):
+    """Patch coalesced streamed quotes into their pairs' shards (quote stream thread)"""
+    written = {}
+    for pair, update in updates.items():
+        if not is_registered(pair):
+            continue
+
+        def apply_quotes(pair_data, update=update, pair=pair):
+            rows = pair_data.setdefault('skew_matrix', [])
+            by_tenor = {row['TENOR']: row for row in rows}
+            for tenor, quotes in update.get('skew', {}).items():
+                if tenor not in by_tenor:
+                    by_tenor[tenor] = {'TENOR': tenor}
+                    rows.append(by_tenor[tenor])
+                    rows.sort(key=lambda row: tenor_to_years(row['TENOR']))
+                by_tenor[tenor].update(quotes)
+            if 'atm_vol' in update:
+                atm_vol = pair_data.setdefault('atm_vol', {})
+                atm_vol['current_value'] = update['atm_vol']
+                atm_vol['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if update.get('skew'):
+                calibrate_smiles({pair: pair_data})
 
-    @app.callback(
-        Output('volatility-data', 'data', allow_duplicate=True),
-        Input(f"get-current-{currency}", "n_clicks"),
-        [State('volatility-data', 'data')],
-        prevent_initial_call=True
+        written[pair] = pair_shards.update(pair, apply_quotes)
+        if update.get('skew'):
+            skew_history.record(pair, written[pair]['skew_matrix'])
+    if written:
+        arbitrage_checker.check(written)
+
+def quote_stream():
+    """This process's quote stream connection, if IV_QUOTE_STREAM_URL is set"""
+    if not QUOTE_STREAM_URL:
+        return None
+    return get_quote_stream(QUOTE_STREAM_URL, pair_codes(), sink=apply_quote_updates,
+                            window=float(os.getenv('IV_QUOTE_WINDOW', 0.25)), strategies=STRATEGIES)
+
+def data_fetcher():
+    """This process's background fetcher for the API endpoint and shared data file"""
+    return get_data_fetcher(
+        api_endpoint=os.getenv('VOLATILITY_API_ENDPOINT', 'http://localhost:8000/api'),
+        file_path=os.getenv('DATA_FILE_PATH', '/shared/volatility_data.json'),
+        interval=30,
+        sink=store_fetched_data
     )
-    def refresh_current_vol(eur_clicks, volatility_data):
-        """Refresh current volatility data when Get Current button is clicked"""
-        ctx = dash.callback_context
-        if not ctx.triggered:
-            return dash.no_update
-        #  usd_clicks, gbp_clicks,
-        # This would typically fetch from an external source
-        # For now, we'll just update the timestamp to show it's refreshed
-        triggered_id = ctx.triggered[0]['prop_id']
-        
-        if 'EURUSD' in triggered_id:
-            currency = 'EURUSD'
-        elif 'USDJPY' in triggered_id:
-            currency = 'USDJPY'
-        elif 'GBPUSD' in triggered_id:
-            currency = 'GBPUSD'
-        else:
-            return dash.no_update
-        
-        if currency in volatility_data:
-            volatility_data[currency]['atm_vol']['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            logger.info(f"Refreshed current vol for {currency}")
-        
-        return volatility_data
+
+@app.callback(
+    Output({'type': 'pair-version', 'pair': MATCH}, 'data', allow_duplicate=True),
+    [Input({'type': 'apply-vol', 'pair': MATCH}, "n_clicks")],
+    [State({'type': 'vol-input', 'pair': MATCH}, "value"),
+     State({'type': 'pair-version', 'pair': MATCH}, 'data')],
+    prevent_initial_call=True
+)
+def update_volatility_value(clicks, new_vol_value, version):
+    """Update volatility value when Apply button is clicked"""
+    currency = dash.callback_context.triggered_id['pair']
+    if not clicks or new_vol_value is None or not is_registered(currency):
+        return dash.no_update
+
+    def apply_vol(pair_data):
+        atm_vol = pair_data.setdefault('atm_vol', {})
+        atm_vol['current_value'] = float(new_vol_value)
+        atm_vol['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        atm_vol['applied_vol'] = float(new_vol_value)
+        atm_vol['applied_at'] = atm_vol['last_updated']
+
+    pair_shards.update(currency, apply_vol)
+    logger.info(f"Updated {currency} vol to {new_vol_value}")
+    return (version or 0) + 1
+
+@app.callback(
+    Output({'type': 'pair-version', 'pair': MATCH}, 'data', allow_duplicate=True),
+    Input({'type': 'get-current', 'pair': MATCH}, "n_clicks"),
+    [State({'type': 'pair-version', 'pair': MATCH}, 'data')],
+    prevent_initial_call=True
+)
+def refresh_current_vol(clicks, version):
+    """Refresh current volatility data when Get Current button is clicked"""
+    currency = dash.callback_context.triggered_id['pair']
+    if not clicks or not is_registered(currency):
+        return dash.no_update
+    # This would typically fetch from an external source
+    # For now, we'll just update the timestamp to show it's refreshed
+    def touch(pair_data):
+        pair_data.setdefault('atm_vol', {})['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    pair_shards.update(currency, touch)
+    logger.info(f"Refreshed current vol for {currency}")
+    return (version or 0) + 1
 
 # Deployment configuration
 def configure_deployment():
@@ -491,6 +1105,8 @@ def configure_deployment():
 
 if __name__ == '__main__':
     configure_deployment()
+    data_fetcher()
+    quote_stream()
     port = int(os.environ.get('PORT', 8050))
     debug = os.environ.get('DASH_DEBUG', 'False').lower() == 'true'
     debug = True  # Force debug mode for development
@@ -500,167 +1116,3 @@ if __name__ == '__main__':
         debug=debug,
         dev_tools_hot_reload=debug
     )
-
-
-#2############################################################
-import dash
-from dash import dcc, html, Input, Output, State, ctx
-import dash_ag_grid as dag
-import dash_table
-import plotly.graph_objs as go
-import pandas as pd
-import numpy as np
-import threading
-import time
-import json
-import os
-
-# ---------------------- CONFIG ----------------------
-CURRENCY_PAIRS = {
-    "EURUSD": "EUR/USD",
-    "GBPUSD": "GBP/USD",
-    "USDJPY": "USD/JPY"
-}
-DATA_FILE = "iv_data.json"
-API_REFRESH_INTERVAL = 30  # seconds
-
-# ---------------------- DATA ----------------------
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {cp: {"skew": [], "atm": 0.0, "decay": []} for cp in CURRENCY_PAIRS}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f)
-
-data_store = load_data()
-
-def simulate_api_updates():
-    while True:
-        for cp in CURRENCY_PAIRS:
-            # Simulate skew matrix update
-            tenors = ["1W", "1M", "3M", "6M"]
-            strikes = ["25P", "ATM", "25C"]
-            skew = [
-                {"tenor": t, **{k: round(np.random.uniform(5, 15), 2) for k in strikes}}
-                for t in tenors
-            ]
-            data_store[cp]["skew"] = skew
-            data_store[cp]["atm"] = round(np.random.uniform(7, 13), 2)
-        save_data(data_store)
-        time.sleep(API_REFRESH_INTERVAL)
-
-threading.Thread(target=simulate_api_updates, daemon=True).start()
-
-# ---------------------- APP ----------------------
-app = dash.Dash(__name__)
-app.title = "Implied Volatility Manager"
-
-app.layout = html.Div([
-    dcc.Tabs(
-        id="tabs",
-        value="EURUSD",
-        children=[
-            dcc.Tab(label=label, value=cp)
-            for cp, label in CURRENCY_PAIRS.items()
-        ]
-    ),
-    html.Div(id="tab-content"),
-    dcc.Interval(id="refresh-interval", interval=API_REFRESH_INTERVAL * 1000)
-])
-
-# ---------------------- TAB RENDER ----------------------
-def render_tab(cp):
-    skew = data_store[cp]["skew"]
-    atm = data_store[cp]["atm"]
-    decay = data_store[cp]["decay"]
-
-    skew_columns = [{"field": "tenor"}] + [
-        {"field": strike} for strike in ["25P", "ATM", "25C"]
-    ]
-
-    return html.Div([
-        html.Div([
-            html.Div([
-                html.H4("Skew Matrix"),
-                dag.AgGrid(
-                    id=f"{cp}-skew-matrix",
-                    columnDefs=skew_columns,
-                    rowData=skew,
-                    className="ag-theme-alpine",
-                    style={"height": "300px"}
-                )
-            ], style={"width": "48%", "display": "inline-block"}),
-
-            html.Div([
-                html.H4("0d ATM Vol Manager"),
-                dcc.Input(id=f"{cp}-atm-input", type="number", value=atm),
-                html.Button("Apply", id=f"{cp}-atm-apply"),
-                html.Button("Fetch", id=f"{cp}-atm-fetch"),
-                dash_table.DataTable(
-                    id=f"{cp}-atm-decay-table",
-                    columns=[{"name": "Method", "id": "method"}],
-                    data=[{"method": m} for m in decay],
-                    style_table={"marginTop": "10px"}
-                )
-            ], style={"width": "48%", "display": "inline-block", "marginLeft": "4%"})
-        ]),
-        html.Div([
-            dcc.Graph(id=f"{cp}-vol-smile")
-        ], style={"marginTop": "30px"})
-    ])
-
-@app.callback(Output("tab-content", "children"), Input("tabs", "value"))
-def update_tab(cp):
-    return render_tab(cp)
-
-# ---------------------- CALLBACKS ----------------------
-for cp in CURRENCY_PAIRS:
-    @app.callback(
-        Output(f"{cp}-vol-smile", "figure"),
-        Input(f"{cp}-skew-matrix", "rowData"),
-        prevent_initial_call=True
-    )
-    def update_smile(row_data):
-        if not row_data:
-            return go.Figure()
-        tenors = [row["tenor"] for row in row_data]
-        fig = go.Figure()
-        for strike in ["25P", "ATM", "25C"]:
-            vols = [row[strike] for row in row_data]
-            fig.add_trace(go.Scatter(x=tenors, y=vols, mode="lines+markers", name=strike))
-        fig.update_layout(title="Implied Volatility Smile", xaxis_title="Tenor", yaxis_title="Volatility")
-        return fig
-
-    @app.callback(
-        Output(f"{cp}-atm-input", "value"),
-        Input(f"{cp}-atm-fetch", "n_clicks"),
-        prevent_initial_call=True
-    )
-    def fetch_atm(n):
-        return data_store[cp]["atm"]
-
-    @app.callback(
-        Output(f"{cp}-atm-decay-table", "data"),
-        Input(f"{cp}-atm-apply", "n_clicks"),
-        State(f"{cp}-atm-input", "value"),
-        prevent_initial_call=True
-    )
-    def apply_atm(n, new_value):
-        data_store[cp]["atm"] = new_value
-        data_store[cp]["decay"].append(f"Manual override to {new_value}")
-        save_data(data_store)
-        return [{"method": m} for m in data_store[cp]["decay"]]
-
-    @app.callback(
-        Output(f"{cp}-skew-matrix", "rowData"),
-        Input("refresh-interval", "n_intervals")
-    )
-    def refresh_skew(n):
-        return data_store[cp]["skew"]
-
-# ---------------------- RUN ----------------------
-if __name__ == "__main__":
-    app.run(debug=True)
@@ -0,0 +1,177 @@
+# iv_manager.py
+import dash
+from dash import dcc, html, Input, Output, State, ctx, MATCH
+import dash_ag_grid as dag
+from dash import dash_table
+import plotly.graph_objs as go
+import pandas as pd
+import numpy as np
+import threading
+import time
+from override_journal import OverrideJournal
+from currency_pairs import pairs
+from skew_history import SkewHistoryStore
+
+# ---------------------- CONFIG ----------------------
+CURRENCY_PAIRS = {pair.code: pair.label for pair in pairs()}
+DATA_FILE = "iv_data.json"
+STRIKES = ["25P", "ATM", "25C"]
+API_REFRESH_INTERVAL = 30  # seconds
+
+# ---------------------- DATA ----------------------
+def default_data():
+    return {cp: {"skew": [], "atm": 0.0, "decay": []} for cp in CURRENCY_PAIRS}
+
+# Snapshot in DATA_FILE plus an append-only journal of changes next to it
+journal = OverrideJournal(DATA_FILE, default=default_data)
+data_store = journal.data
+
+# Every simulated skew update, kept for the history chart
+sim_skew_history = SkewHistoryStore(STRIKES, tenor_key="tenor")
+
+def simulate_api_updates():
+    while True:
+        for cp in CURRENCY_PAIRS:
+            # Simulate skew matrix update
+            tenors = ["1W", "1M", "3M", "6M"]
+            strikes = STRIKES
+            skew = [
+                {"tenor": t, **{k: round(np.random.uniform(5, 15), 2) for k in strikes}}
+                for t in tenors
+            ]
+            journal.set(cp, "skew", skew)
+            sim_skew_history.record(cp, skew)
+            journal.set(cp, "atm", round(np.random.uniform(7, 13), 2))
+        time.sleep(API_REFRESH_INTERVAL)
+
+threading.Thread(target=simulate_api_updates, daemon=True).start()
+
+# ---------------------- APP ----------------------
+app = dash.Dash(__name__)
+app.title = "Implied Volatility Manager"
+
+app.layout = html.Div([
+    dcc.Tabs(
+        id="tabs",
+        value=next(iter(CURRENCY_PAIRS)),
+        children=[
+            dcc.Tab(label=label, value=cp)
+            for cp, label in CURRENCY_PAIRS.items()
+        ]
+    ),
+    html.Div(id="tab-content"),
+    dcc.Interval(id="refresh-interval", interval=API_REFRESH_INTERVAL * 1000)
+])
+
+# ---------------------- TAB RENDER ----------------------
+def render_tab(cp):
+    pair_data = data_store.get(cp, {})
+    skew = pair_data.get("skew", [])
+    atm = pair_data.get("atm", 0.0)
+    decay = pair_data.get("decay", [])
+
+    skew_columns = [{"field": "tenor"}] + [
+        {"field": strike} for strike in STRIKES
+    ]
+
+    return html.Div([
+        html.Div([
+            html.Div([
+                html.H4("Skew Matrix"),
+                dag.AgGrid(
+                    id={"type": "skew-matrix", "pair": cp},
+                    columnDefs=skew_columns,
+                    rowData=skew,
+                    className="ag-theme-alpine",
+                    style={"height": "300px"}
+                )
+            ], style={"width": "48%", "display": "inline-block"}),
+
+            html.Div([
+                html.H4("0d ATM Vol Manager"),
+                dcc.Input(id={"type": "atm-input", "pair": cp}, type="number", value=atm),
+                html.Button("Apply", id={"type": "atm-apply", "pair": cp}),
+                html.Button("Fetch", id={"type": "atm-fetch", "pair": cp}),
+                dash_table.DataTable(
+                    id={"type": "atm-decay-table", "pair": cp},
+                    columns=[{"name": "Method", "id": "method"}],
+                    data=[{"method": m} for m in decay],
+                    style_table={"marginTop": "10px"}
+                )
+            ], style={"width": "48%", "display": "inline-block", "marginLeft": "4%"})
+        ]),
+        html.Div([
+            dcc.Graph(id={"type": "vol-smile", "pair": cp})
+        ], style={"marginTop": "30px"}),
+        html.Div([
+            dcc.Graph(id={"type": "skew-history", "pair": cp})
+        ], style={"marginTop": "30px"})
+    ])
+
+@app.callback(Output("tab-content", "children"), Input("tabs", "value"))
+def update_tab(cp):
+    return render_tab(cp)
+
+# ---------------------- CALLBACKS ----------------------
+# Pattern-matching ids: one callback set covers every pair in the registry
+@app.callback(
+    Output({"type": "vol-smile", "pair": MATCH}, "figure"),
+    Input({"type": "skew-matrix", "pair": MATCH}, "rowData"),
+    prevent_initial_call=True
+)
+def update_smile(row_data):
+    if not row_data:
+        return go.Figure()
+    tenors = [row["tenor"] for row in row_data]
+    fig = go.Figure()
+    for strike in STRIKES:
+        vols = [row[strike] for row in row_data]
+        fig.add_trace(go.Scatter(x=tenors, y=vols, mode="lines+markers", name=strike))
+    fig.update_layout(title="Implied Volatility Smile", xaxis_title="Tenor", yaxis_title="Volatility")
+    return fig
+
+@app.callback(
+    Output({"type": "atm-input", "pair": MATCH}, "value"),
+    Input({"type": "atm-fetch", "pair": MATCH}, "n_clicks"),
+    prevent_initial_call=True
+)
+def fetch_atm(n):
+    return data_store[ctx.triggered_id["pair"]]["atm"]
+
+@app.callback(
+    Output({"type": "atm-decay-table", "pair": MATCH}, "data"),
+    Input({"type": "atm-apply", "pair": MATCH}, "n_clicks"),
+    State({"type": "atm-input", "pair": MATCH}, "value"),
+    prevent_initial_call=True
+)
+def apply_atm(n, new_value):
+    cp = ctx.triggered_id["pair"]
+    journal.set(cp, "atm", new_value)
+    journal.append(cp, "decay", f"Manual override to {new_value}")
+    return [{"method": m} for m in data_store[cp]["decay"]]
+
+@app.callback(
+    Output({"type": "skew-history", "pair": MATCH}, "figure"),
+    Input("refresh-interval", "n_intervals"),
+    Input({"type": "skew-history", "pair": MATCH}, "id")
+)
+def update_skew_history(n, component_id):
+    cp = component_id["pair"]
+    fig = go.Figure()
+    for tenor in sim_skew_history.tenors(cp):
+        times, values = sim_skew_history.series(cp, tenor, "ATM", span_seconds=86400, max_points=1000)
+        fig.add_trace(go.Scattergl(x=times, y=values, mode="lines", name=tenor))
+    fig.update_layout(title="ATM History", xaxis_title="Time", yaxis_title="Volatility")
+    return fig
+
+@app.callback(
+    Output({"type": "skew-matrix", "pair": MATCH}, "rowData"),
+    Input("refresh-interval", "n_intervals"),
+    Input({"type": "skew-matrix", "pair": MATCH}, "id")
+)
+def refresh_skew(n, component_id):
+    return data_store[component_id["pair"]]["skew"]
+
+# ---------------------- RUN ----------------------
+if __name__ == "__main__":
+    app.run(debug=True)
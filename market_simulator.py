@@ -0,0 +1,218 @@
+# market_simulator.py
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from vol_surface import STRATEGIES, tenor_to_years
+
+logger = logging.getLogger(__name__)
+
+TENORS = ['1W', '1M', '2M', '3M', '6M', '9M', '1Y', '2Y']
+CURRENCIES = ['EUR', 'USD', 'JPY', 'GBP', 'CHF', 'AUD', 'NZD', 'CAD', 'SEK', 'NOK',
+              'MXN', 'ZAR', 'TRY', 'BRL', 'CNH', 'SGD', 'HKD', 'PLN', 'HUF', 'CZK', 'KRW', 'INR']
+
+# Per regime: multiplier on the long-run ATM level, |RR| and STR, and on vol-of-vol
+REGIMES = {
+    'calm': {'atm': 1.0, 'rr': 1.0, 'str': 1.0, 'vol_of_vol': 1.0},
+    'stressed': {'atm': 1.6, 'rr': 2.2, 'str': 1.8, 'vol_of_vol': 2.5},
+}
+# Mean time spent in each regime before switching, in seconds
+REGIME_DURATION = {'calm': 600.0, 'stressed': 120.0}
+# Mean reversion speed (per second) and calm-regime vol-of-vol (vol points per sqrt second)
+KAPPA = np.array([0.02, 0.03, 0.03, 0.03, 0.03])
+VOL_OF_VOL = np.array([0.04, 0.02, 0.008, 0.015, 0.005])
+
+
+def synthetic_pairs(count: int) -> List[str]:
+    """count pair codes, majors first (EURUSD, EURJPY, ...)"""
+    codes = [a + b for a, b in itertools.combinations(CURRENCIES, 2)]
+    if count > len(codes):
+        raise ValueError(f"at most {len(codes)} synthetic pairs")
+    return codes[:count]
+
+
+class MarketSimulator:
+    """Seeded, vectorised skew-matrix and 0D ATM paths for many pairs.
+
+    Every (pair, tenor, strategy) quote is an Ornstein-Uhlenbeck process
+    around a per-pair term structure. Shocks mix a global factor, a per-pair
+    factor and idiosyncratic noise (corr_global / corr_pair), scale down with
+    tenor so the short end leads, and are amplified in the stressed regime.
+    The regime is a two-state Markov chain shared by all pairs. Spikes are
+    Poisson jumps in ATM and STR (and RR towards the pair's skew) that then
+    mean-revert. The same seed and call sequence give the same paths.
+    """
+
+    def __init__(self, pairs: Sequence[str], tenors: Sequence[str] = TENORS, seed: int = 0,
+                 corr_global: float = 0.5, corr_pair: float = 0.3, spike_rate: float = 1 / 300,
+                 regime: str = 'calm'):
+        self.pairs = list(pairs)
+        self.tenors = list(tenors)
+        self.rng = np.random.default_rng(seed)
+        self.regime = regime
+        self.elapsed = 0.0
+        self.spike_rate = spike_rate
+        self._weights = np.sqrt([corr_global, corr_pair, max(0.0, 1.0 - corr_global - corr_pair)])
+
+        n_pairs = len(self.pairs)
+        years = np.array([tenor_to_years(tenor) for tenor in self.tenors])
+        # Short tenors move more: shocks scale with (1M / T)^0.3
+        self._tenor_scale = np.minimum((1 / 12 / years) ** 0.3, 2.0)[None, :, None]
+        base_atm = self.rng.uniform(6.0, 14.0, n_pairs)[:, None]
+        slope = self.rng.uniform(-0.05, 0.08, n_pairs)[:, None]
+        skew = self.rng.uniform(-1.0, 0.4, n_pairs)[:, None]
+        term = np.log(years / years[0])[None, :]
+        self._base = np.stack([
+            base_atm * (1 + slope * term),
+            skew * base_atm / 8 * np.sqrt(1 + term),
+            0.11 * base_atm * np.ones_like(term),
+            0.5 * skew * base_atm / 8 * np.sqrt(1 + term),
+            0.035 * base_atm * np.ones_like(term),
+        ], axis=-1)
+        self.quotes = self._levels().copy()
+        self._atm_0d = self.quotes[:, 0, 0] * self.rng.uniform(0.95, 1.1, n_pairs)
+        self._applied = np.round(self._atm_0d, 2)
+
+    def _levels(self) -> np.ndarray:
+        factors = REGIMES[self.regime]
+        return self._base * np.array([factors['atm'], factors['rr'], factors['str'], factors['rr'], factors['str']])
+
+    def advance(self, dt: float):
+        """Move every path forward by dt seconds"""
+        if dt <= 0:
+            return
+        self.elapsed += dt
+        if self.rng.random() < 1 - np.exp(-dt / REGIME_DURATION[self.regime]):
+            self.regime = 'stressed' if self.regime == 'calm' else 'calm'
+            logger.info(f"Simulated market switched to {self.regime} regime at {self.elapsed:.0f}s")
+
+        n_pairs, n_tenors, n_strategies = self.quotes.shape
+        shocks = (self._weights[0] * self.rng.standard_normal((1, 1, n_strategies))
+                  + self._weights[1] * self.rng.standard_normal((n_pairs, 1, n_strategies))
+                  + self._weights[2] * self.rng.standard_normal((n_pairs, n_tenors, n_strategies)))
+        sigma = VOL_OF_VOL * REGIMES[self.regime]['vol_of_vol'] * self._tenor_scale
+        levels = self._levels()
+        self.quotes += KAPPA * (levels - self.quotes) * dt + sigma * np.sqrt(dt) * shocks
+
+        spikes = self.rng.random(n_pairs) < 1 - np.exp(-self.spike_rate * dt)
+        if spikes.any():
+            size = self.rng.exponential(1.0, spikes.sum())[:, None] * self._tenor_scale[0, :, 0]
+            self.quotes[spikes, :, 0] += size * 1.5
+            self.quotes[spikes, :, 1] += size * 0.6 * np.sign(self._base[spikes, :, 1])
+            self.quotes[spikes, :, 2] += size * 0.25
+            self.quotes[spikes, :, 3] += size * 0.3 * np.sign(self._base[spikes, :, 3])
+            self.quotes[spikes, :, 4] += size * 0.08
+
+        # Keep quotes in a sane range: positive ATM, 10STR above 25STR above zero
+        np.maximum(self.quotes[..., 0], 0.5, out=self.quotes[..., 0])
+        np.maximum(self.quotes[..., 4], 0.01, out=self.quotes[..., 4])
+        np.maximum(self.quotes[..., 2], self.quotes[..., 4], out=self.quotes[..., 2])
+
+        self._atm_0d += 0.05 * (self.quotes[:, 0, 0] * 1.02 - self._atm_0d) * dt \
+            + 0.05 * np.sqrt(dt) * self.rng.standard_normal(n_pairs) * REGIMES[self.regime]['vol_of_vol']
+        np.maximum(self._atm_0d, 0.5, out=self._atm_0d)
+
+    def snapshot(self, decimals: int = 4) -> Dict[str, Dict[str, Any]]:
+        """All pairs in the shared volatility file format"""
+        quotes = np.round(self.quotes, decimals).tolist()
+        atm_0d = np.round(self._atm_0d, decimals).tolist()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        data = {}
+        for p, pair in enumerate(self.pairs):
+            data[pair] = {
+                'skew_matrix': [{'TENOR': tenor, **dict(zip(STRATEGIES, quotes[p][t]))}
+                                for t, tenor in enumerate(self.tenors)],
+                'atm_vol': {'current_value': atm_0d[p], 'decay_method': 'Exponential',
+                            'last_updated': now, 'applied_vol': float(self._applied[p])},
+            }
+        return data
+
+    def ticks(self, pairs: Sequence[str], count: int, rate: Optional[float] = None,
+              decimals: int = 4) -> List[Dict[str, Any]]:
+        """count stream ticks for random cells of the given pairs.
+
+        With a rate (ticks per second) the paths first advance by count / rate.
+        About one tick in twenty is a 0D ATM update.
+        """
+        if rate:
+            self.advance(count / rate)
+        index = {pair: p for p, pair in enumerate(self.pairs)}
+        rows = np.array([index[pair] for pair in pairs])
+        picks = rows[self.rng.integers(0, len(rows), count)]
+        tenors = self.rng.integers(0, len(self.tenors), count)
+        strategies = self.rng.integers(0, len(STRATEGIES), count)
+        atm = self.rng.random(count) < 0.05
+        ticks = []
+        for p, t, s, is_atm in zip(picks.tolist(), tenors.tolist(), strategies.tolist(), atm.tolist()):
+            if is_atm:
+                ticks.append({'pair': self.pairs[p], 'atm_vol': round(float(self._atm_0d[p]), decimals)})
+            else:
+                ticks.append({'pair': self.pairs[p], 'tenor': self.tenors[t], 'strategy': STRATEGIES[s],
+                              'value': round(float(self.quotes[p, t, s]), decimals)})
+        return ticks
+
+
+class StreamingSimulator:
+    """A MarketSimulator whose clock advances with the ticks served (for mock_quote_server.serve)"""
+
+    def __init__(self, simulator: MarketSimulator, rate: float):
+        self.simulator = simulator
+        self.rate = rate
+        self.pairs = simulator.pairs
+
+    def ticks(self, pairs: Sequence[str], count: int) -> List[Dict[str, Any]]:
+        return self.simulator.ticks(pairs, count, rate=self.rate)
+
+
+def write_snapshot(simulator: MarketSimulator, path: str):
+    """Atomically replace the volatility file, so readers never see a partial write"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(simulator.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def run_file(simulator: MarketSimulator, path: str, interval: float, duration: Optional[float] = None):
+    """Rewrite the volatility file every interval seconds of simulated (and wall) time"""
+    started = time.monotonic()
+    writes = 0
+    while duration is None or time.monotonic() - started < duration:
+        simulator.advance(interval)
+        write_snapshot(simulator, path)
+        writes += 1
+        if writes % 100 == 0:
+            logger.info(f"{writes} snapshots of {len(simulator.pairs)} pairs written to {path}")
+        time.sleep(max(0.0, started + writes * interval - time.monotonic()))
+
+
+if __name__ == '__main__':
+    from mock_quote_server import serve
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Seeded market simulator for IV dashboard load tests")
+    parser.add_argument('mode', choices=['file', 'stream'])
+    parser.add_argument('--pairs', type=int, default=100, help="number of synthetic pairs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--path', default=os.getenv('DATA_FILE_PATH', 'volatility_data.json'))
+    parser.add_argument('--interval', type=float, default=0.5, help="file mode: seconds between snapshots")
+    parser.add_argument('--duration', type=float, default=None, help="file mode: stop after this many seconds")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=2000.0, help="stream mode: ticks per second per client")
+    parser.add_argument('--batch', type=int, default=50, help="stream mode: ticks per message")
+    args = parser.parse_args()
+
+    simulator = MarketSimulator(synthetic_pairs(args.pairs), seed=args.seed)
+    logger.info(f"Run the IV app with IV_CURRENCY_PAIRS={','.join(simulator.pairs)}")
+    if args.mode == 'file':
+        run_file(simulator, args.path, args.interval, args.duration)
+    else:
+        asyncio.run(serve(StreamingSimulator(simulator, args.rate), args.host, args.port, args.rate, args.batch))
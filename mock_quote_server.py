@@ -0,0 +1,93 @@
+# mock_quote_server.py
+import argparse
+import asyncio
+import json
+import logging
+import random
+from typing import Dict, List, Set
+
+import websockets
+
+from currency_pairs import pair_codes
+
+logger = logging.getLogger(__name__)
+
+TENORS = ['1M', '2M', '3M', '6M', '1Y']
+STRATEGIES = ['ATM', '10RR', '10STR', '25RR', '25STR']
+BASE_QUOTES = {'ATM': 8.0, '10RR': -0.3, '10STR': 0.9, '25RR': -0.3, '25STR': 0.3}
+STEP = {'ATM': 0.02, '10RR': 0.01, '10STR': 0.005, '25RR': 0.01, '25STR': 0.003}
+
+
+class QuoteBook:
+    """Random-walking skew quotes and 0D ATM vol for a set of pairs"""
+
+    def __init__(self, pairs: List[str], seed: int = 0):
+        self.random = random.Random(seed)
+        self.pairs = list(pairs)
+        self.quotes = {pair: {tenor: dict(BASE_QUOTES) for tenor in TENORS} for pair in pairs}
+        self.atm = {pair: 8.2 for pair in pairs}
+
+    def tick(self, pair: str) -> Dict:
+        if self.random.random() < 0.05:
+            self.atm[pair] = round(max(0.5, self.atm[pair] + self.random.gauss(0, 0.05)), 4)
+            return {'pair': pair, 'atm_vol': self.atm[pair]}
+        tenor = self.random.choice(TENORS)
+        strategy = self.random.choice(STRATEGIES)
+        value = self.quotes[pair][tenor][strategy] + self.random.gauss(0, STEP[strategy])
+        if strategy.endswith('STR') or strategy == 'ATM':
+            value = max(value, 0.01)
+        self.quotes[pair][tenor][strategy] = value = round(value, 4)
+        return {'pair': pair, 'tenor': tenor, 'strategy': strategy, 'value': value}
+
+    def ticks(self, pairs: List[str], count: int) -> List[Dict]:
+        return [self.tick(self.random.choice(pairs)) for _ in range(count)]
+
+
+async def serve_client(websocket, book, rate: float, batch: int):
+    """Stream ticks for whatever pairs this client subscribed to.
+
+    book is anything with .pairs and .ticks(pairs, count), e.g. a QuoteBook
+    or a market_simulator.MarketSimulator.
+    """
+    subscribed: Set[str] = set()
+
+    async def read_subscriptions():
+        async for message in websocket:
+            request = json.loads(message)
+            if request.get('action') == 'subscribe':
+                subscribed.update(pair for pair in request.get('pairs', []) if pair in book.pairs)
+                logger.info(f"Client subscribed to {sorted(subscribed)}")
+
+    reader = asyncio.create_task(read_subscriptions())
+    try:
+        while True:
+            await asyncio.sleep(batch / rate)
+            if subscribed:
+                await websocket.send(json.dumps(book.ticks(sorted(subscribed), batch)))
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        reader.cancel()
+
+
+async def serve(book, host: str, port: int, rate: float, batch: int):
+    # websockets < 10.1 also passes the request path
+    async with websockets.serve(lambda ws, path=None: serve_client(ws, book, rate, batch), host, port):
+        logger.info(f"Mock quote server on ws://{host}:{port} ({rate:.0f} ticks/s)")
+        await asyncio.Future()
+
+
+async def main(host: str, port: int, rate: float, batch: int, seed: int):
+    await serve(QuoteBook(pair_codes(), seed), host, port, rate, batch)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Stand-in vol quote stream for the IV manager")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=200.0, help="ticks per second per client")
+    parser.add_argument('--batch', type=int, default=10, help="ticks per message")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.rate, args.batch, args.seed))
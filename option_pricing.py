@@ -0,0 +1,131 @@
+# option_pricing.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from vol_surface import SmileSurface, interp_rows
+
+logger = logging.getLogger(__name__)
+
+# Grid strikes are forward * exp(k) for k evenly spaced in [-width, width]
+DEFAULT_STRIKES = 41
+DEFAULT_WIDTH = 0.2
+GREEKS = ['price', 'delta', 'vega', 'gamma']
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz-Stegun 7.1.26, |error| < 1.5e-7)"""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def garman_kohlhagen(forward: np.ndarray, strikes: np.ndarray, years: np.ndarray, vols: np.ndarray,
+                     domestic_rate: float = 0.0, foreign_rate: float = 0.0,
+                     is_call: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Garman-Kohlhagen price and spot Greeks, all inputs broadcast together.
+
+    vols are in percent. Calls by default, puts where is_call is False.
+    price is in domestic units per unit of foreign notional, delta is the
+    premium-unadjusted spot delta, vega is per 1 vol point and gamma per
+    unit of spot.
+    """
+    sigma = np.maximum(vols / 100.0, 1e-8)
+    sqrt_t = np.sqrt(np.maximum(years, 1e-8))
+    sd = sigma * sqrt_t
+    df_domestic = np.exp(-domestic_rate * years)
+    df_foreign = np.exp(-foreign_rate * years)
+    spot = forward * df_domestic / df_foreign
+
+    d1 = (np.log(forward / strikes) + 0.5 * sd * sd) / sd
+    d2 = d1 - sd
+    sign = 1.0 if is_call is None else np.where(is_call, 1.0, -1.0)
+    n_d1 = norm_cdf(sign * d1)
+    price = sign * df_domestic * (forward * n_d1 - strikes * norm_cdf(sign * d2))
+    density = norm_pdf(d1)
+    return {
+        'price': price,
+        'delta': sign * df_foreign * n_d1,
+        'vega': spot * df_foreign * density * sqrt_t / 100.0,
+        'gamma': df_foreign * density / (spot * sd),
+    }
+
+
+class PricingGrid:
+    """Per-pair strikes x tenors grid of OTM option prices and Greeks.
+
+    Strikes sit on a fixed log-moneyness grid around the forward and each
+    tenor's vols come from its own pillars, so a row depends only on that
+    tenor's smile. Rows are cached with the smile (and forward/rates) they
+    were priced from, and grid() reprices only the tenors whose vols
+    changed, all of them in one NumPy pass.
+    """
+
+    def __init__(self, n_strikes: int = DEFAULT_STRIKES, width: float = DEFAULT_WIDTH):
+        self.moneyness = np.linspace(-width, width, n_strikes)
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Tuple[Any, Dict[str, np.ndarray]]]] = {}
+        self.last_repriced = 0
+        self.last_elapsed_ms: Optional[float] = None
+
+    def discard(self, pair: str):
+        with self._lock:
+            self._rows.pop(pair, None)
+
+    def grid(self, surface: SmileSurface, domestic_rate: float = 0.0,
+             foreign_rate: float = 0.0) -> Dict[str, Any]:
+        """{'tenors', 'strikes', 'is_call', 'price', 'delta', 'vega', 'gamma'} for one pair"""
+        started = time.perf_counter()
+        strikes = surface.forward * np.exp(self.moneyness)
+        is_call = strikes >= surface.forward
+        with self._lock:
+            cached = dict(self._rows.get(surface.pair, {}))
+
+        keys, stale = [], []
+        for index, tenor in enumerate(surface.tenors):
+            key = (surface.forward, domestic_rate, foreign_rate, surface.years[index],
+                   surface.strikes[index].tobytes(), surface.vols[index].tobytes())
+            keys.append(key)
+            if tenor not in cached or cached[tenor][0] != key:
+                stale.append(index)
+
+        if stale:
+            # Each row from its own tenor's pillars: linear in log-moneyness, flat outside
+            log_k = np.log(surface.strikes[stale] / surface.forward)
+            order = np.argsort(log_k, axis=1)
+            vols = interp_rows(np.tile(self.moneyness, (len(stale), 1)), np.take_along_axis(log_k, order, 1),
+                               np.take_along_axis(surface.vols[stale], order, 1)).ravel()
+            years = np.repeat(surface.years[stale], len(strikes))
+            flat_strikes = np.tile(strikes, len(stale))
+            greeks = garman_kohlhagen(surface.forward, flat_strikes, years, vols, domestic_rate, foreign_rate,
+                                      np.tile(is_call, len(stale)))
+            shape = (len(stale), len(strikes))
+            for row, index in enumerate(stale):
+                values = {name: greeks[name].reshape(shape)[row] for name in GREEKS}
+                values['vol'] = vols.reshape(shape)[row]
+                cached[surface.tenors[index]] = (keys[index], values)
+            with self._lock:
+                self._rows[surface.pair] = {tenor: cached[tenor] for tenor in surface.tenors}
+
+        result: Dict[str, Any] = {'tenors': list(surface.tenors), 'strikes': strikes, 'is_call': is_call}
+        for name in GREEKS + ['vol']:
+            result[name] = np.array([cached[tenor][1][name] for tenor in surface.tenors]).reshape(
+                len(surface.tenors), len(strikes))
+        self.last_repriced = len(stale)
+        self.last_elapsed_ms = (time.perf_counter() - started) * 1000
+        return result
+
+
+def pair_rates(pair_data: Dict[str, Any]) -> Tuple[float, float]:
+    """(domestic, foreign) continuously compounded rates from a pair's data, 0 if not given"""
+    rates = pair_data.get('rates') or {}
+    return float(rates.get('domestic', 0.0)), float(rates.get('foreign', 0.0))
@@ -0,0 +1,192 @@
+# override_journal.py
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SET = "set"
+APPEND = "append"
+
+
+def _fsync_dir(path: str):
+    """Make a rename in the file's directory durable (no-op where unsupported)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class OverrideJournal:
+    """Per-pair IV state persisted as a snapshot plus an append-only journal.
+
+    Every change is one small JSON line with a sequence number. A single
+    writer thread appends queued lines in batches with one fsync per batch,
+    so write cost tracks the size of the change. After snapshot_every records
+    the state is written to a temp file and atomically renamed over the
+    snapshot, then the journal is truncated. On startup the snapshot is loaded
+    and journal records newer than it are replayed; a torn final line from a
+    crash is cut off.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None,
+                 default: Optional[Callable[[], Dict[str, Any]]] = None,
+                 snapshot_every: int = 500, flush_interval: float = 0.05):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{snapshot_path}.journal"
+        self.snapshot_every = snapshot_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._closed = False
+
+        self.data, self._seq, self._snapshot_seq = self._recover(default)
+        self._since_snapshot = self._seq - self._snapshot_seq
+
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._writer = threading.Thread(target=self._write_loop, name="override-journal-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _recover(self, default: Optional[Callable[[], Dict[str, Any]]]):
+        started = time.perf_counter()
+        data: Dict[str, Any] = default() if default else {}
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if isinstance(snapshot, dict) and set(snapshot) == {"seq", "data"}:
+                snapshot_seq, snapshot = snapshot["seq"], snapshot["data"]
+            # Older files are a bare data dump with no sequence number
+            data.update(snapshot)
+
+        seq, replayed = snapshot_seq, 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb+") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        record = json.loads(line)
+                    except ValueError:
+                        # Cut the torn tail so later appends stay replayable
+                        logger.warning(f"Truncating torn journal record at {self.journal_path} offset {offset}")
+                        f.truncate(offset)
+                        break
+                    offset += len(line)
+                    if record["seq"] <= snapshot_seq:
+                        continue
+                    self._apply(data, record)
+                    seq, replayed = record["seq"], replayed + 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Recovered {self.snapshot_path} at seq {seq} ({replayed} journal records) in {elapsed_ms:.1f} ms")
+        return data, seq, snapshot_seq
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], record: Dict[str, Any]):
+        pair = data.setdefault(record["pair"], {})
+        if record["op"] == SET:
+            pair[record["field"]] = record["value"]
+        elif record["op"] == APPEND:
+            pair.setdefault(record["field"], []).append(record["value"])
+
+    def _record(self, op: str, pair: str, field: str, value: Any):
+        if self._closed:
+            raise RuntimeError("OverrideJournal is closed")
+        with self._lock:
+            self._seq += 1
+            record = {"seq": self._seq, "ts": time.time(), "op": op, "pair": pair, "field": field, "value": value}
+            line = json.dumps(record, separators=(",", ":"))
+            self._apply(self.data, record)
+            self._queue.put_nowait(line)
+
+    def set(self, pair: str, field: str, value: Any):
+        """Replace one field of a pair"""
+        self._record(SET, pair, field, value)
+
+    def append(self, pair: str, field: str, value: Any):
+        """Append one item to a list field of a pair"""
+        self._record(APPEND, pair, field, value)
+
+    def flush(self):
+        """Block until every recorded change is on disk"""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+
+    def _write_loop(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            lines = [line for line in batch if line is not None]
+            stopping = len(lines) != len(batch)
+            try:
+                if lines:
+                    self._append(lines)
+                if self._since_snapshot >= self.snapshot_every or (stopping and self._since_snapshot):
+                    self._compact()
+            except Exception as e:
+                logger.error(f"Override journal write of {len(lines)} records failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        self._journal.close()
+
+    def _append(self, lines: List[str]):
+        self._journal.write("\n".join(lines) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._since_snapshot += len(lines)
+
+    def _compact(self):
+        """Write a snapshot atomically, then drop the journal records it covers"""
+        started = time.perf_counter()
+        with self._lock:
+            seq = self._seq
+            data = copy.deepcopy(self.data)
+
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "data": data}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        _fsync_dir(self.snapshot_path)
+
+        # Records with seq <= the snapshot's are skipped on replay, so a crash
+        # before this truncation is harmless, as are queued records it already covers.
+        self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        self._snapshot_seq = seq
+        self._since_snapshot = 0
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Compacted {self.snapshot_path} at seq {seq} in {elapsed_ms:.1f} ms")
@@ -0,0 +1,165 @@
+# pair_shards.py
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Shards kept in memory at most, measured as their JSON size
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+RECENT_PAIRS = 5
+
+
+class PairShardStore:
+    """Server-side per-pair data, one JSON shard file per currency pair.
+
+    Shards are loaded on first use and kept in an LRU bounded by max_bytes;
+    evicted shards are dropped from memory (and reported to on_evict) and
+    reloaded from disk when next needed. Pairs with no shard yet are created
+    from default_factory and persisted. Every change is written through, so
+    eviction never loses data. prefetch() warms shards on a background thread.
+    """
+
+    def __init__(self, directory: str, default_factory: Callable[[str], Dict[str, Any]],
+                 on_load: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.default_factory = default_factory
+        self.on_load = on_load
+        self.on_evict = on_evict
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._shards: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._pair_locks: Dict[str, threading.Lock] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'prefetched': 0}
+
+        self._prefetch_queue: "queue.Queue[str]" = queue.Queue()
+        self._prefetcher = threading.Thread(target=self._prefetch_loop, name='pair-shard-prefetch', daemon=True)
+        self._prefetcher.start()
+
+    def _path(self, pair: str) -> str:
+        return os.path.join(self.directory, f"{pair}.json")
+
+    def _pair_lock(self, pair: str) -> threading.Lock:
+        with self._lock:
+            return self._pair_locks.setdefault(pair, threading.Lock())
+
+    def get(self, pair: str) -> Dict[str, Any]:
+        """The pair's shard, loading it if needed; treat the result as read-only"""
+        with self._lock:
+            shard = self._shards.get(pair)
+            if shard is not None:
+                self._shards.move_to_end(pair)
+                self._stats['hits'] += 1
+                return shard
+        # One loader per pair; concurrent callers wait for it instead of reading twice
+        with self._pair_lock(pair):
+            with self._lock:
+                shard = self._shards.get(pair)
+                if shard is not None:
+                    self._shards.move_to_end(pair)
+                    self._stats['hits'] += 1
+                    return shard
+                self._stats['misses'] += 1
+            shard = self._load(pair)
+            self._insert(pair, shard)
+            return shard
+
+    def update(self, pair: str, changes: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """Apply changes to a copy of the shard, write it through and cache it"""
+        with self._pair_lock(pair):
+            shard = copy.deepcopy(self._shards.get(pair) or self._load(pair))
+            changes(shard)
+            self._write(pair, shard)
+            self._insert(pair, shard)
+            return shard
+
+    def merge(self, updates: Dict[str, Dict[str, Any]],
+              overlay: Callable[[Dict[str, Any], Dict[str, Any]], None] = dict.update) -> List[str]:
+        """Overlay fetched pair data onto the stored shards; returns the pairs written.
+
+        overlay(shard, pair_data) applies one pair's data, by default a plain dict.update.
+        """
+        written = []
+        for pair, pair_data in updates.items():
+            if not isinstance(pair_data, dict):
+                continue
+            self.update(pair, lambda shard, pair_data=pair_data: overlay(shard, pair_data))
+            written.append(pair)
+        return written
+
+    def prefetch(self, pairs: Iterable[str]):
+        """Queue pairs to be loaded in the background if they are not resident"""
+        for pair in pairs:
+            self._prefetch_queue.put(pair)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, 'resident': len(self._shards), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes}
+
+    def _load(self, pair: str) -> Dict[str, Any]:
+        path = self._path(pair)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                shard = json.load(f)
+        else:
+            shard = self.default_factory(pair)
+            self._write(pair, shard)
+        if self.on_load is not None:
+            shard = self.on_load(pair, shard)
+        return shard
+
+    def _write(self, pair: str, shard: Dict[str, Any]):
+        path = self._path(pair)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(shard, f)
+        os.replace(tmp_path, path)
+
+    def _insert(self, pair: str, shard: Dict[str, Any]):
+        size = len(json.dumps(shard))
+        evicted = []
+        with self._lock:
+            self._bytes += size - self._sizes.get(pair, 0)
+            self._shards[pair] = shard
+            self._sizes[pair] = size
+            self._shards.move_to_end(pair)
+            # Always keep the shard just inserted, even if it alone exceeds the cap
+            while self._bytes > self.max_bytes and len(self._shards) > 1:
+                old_pair, _ = self._shards.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_pair)
+                self._stats['evictions'] += 1
+                evicted.append(old_pair)
+        for old_pair in evicted:
+            if self.on_evict is not None:
+                self.on_evict(old_pair)
+
+    def _prefetch_loop(self):
+        while True:
+            pair = self._prefetch_queue.get()
+            with self._lock:
+                resident = pair in self._shards
+            if resident:
+                continue
+            try:
+                self.get(pair)
+                with self._lock:
+                    self._stats['prefetched'] += 1
+            except Exception as e:
+                logger.warning(f"Prefetch of {pair} shard failed: {e}")
+
+
+def remember_pair(recent: Optional[List[str]], pair: str, limit: int = RECENT_PAIRS) -> List[str]:
+    """Most-recently-used pair list with pair moved to the front"""
+    return [pair] + [p for p in recent or [] if p != pair][:limit - 1]
@@ -0,0 +1,196 @@
+# quote_connector.py
+import asyncio
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# Ticks arriving within one window reach the callbacks as a single update
+DEFAULT_WINDOW = 0.25
+MAX_RECONNECT_DELAY = 30.0
+
+
+class QuoteCoalescer:
+    """Latest streamed value per (pair, tenor, strategy) and per pair 0D ATM vol.
+
+    Ticks are {"pair", "tenor", "strategy", "value"} for skew quotes or
+    {"pair", "atm_vol"} for the 0D ATM vol. drain() hands back everything
+    since the previous drain as {pair: {'skew': {tenor: {strategy: value}},
+    'atm_vol': value}}, so a cell that ticked 50 times costs one write.
+    """
+
+    def __init__(self, strategies: Optional[Sequence[str]] = None):
+        self.strategies = set(strategies) if strategies else None
+        self._lock = threading.Lock()
+        self._skew: Dict[Tuple[str, str, str], float] = {}
+        self._atm: Dict[str, float] = {}
+        self._stats = {'received': 0, 'rejected': 0, 'coalesced': 0, 'flushed': 0}
+
+    def add(self, tick: Dict[str, Any]) -> bool:
+        pair = tick.get('pair') if isinstance(tick, dict) else None
+        if not isinstance(pair, str):
+            return self._reject()
+        if 'atm_vol' in tick:
+            value = tick['atm_vol']
+            if type(value) not in (int, float):
+                return self._reject()
+            with self._lock:
+                self._count(pair in self._atm)
+                self._atm[pair] = float(value)
+            return True
+        tenor, strategy, value = tick.get('tenor'), tick.get('strategy'), tick.get('value')
+        if not isinstance(tenor, str) or type(value) not in (int, float) \
+                or (self.strategies is not None and strategy not in self.strategies):
+            return self._reject()
+        key = (pair, tenor, strategy)
+        with self._lock:
+            self._count(key in self._skew)
+            self._skew[key] = float(value)
+        return True
+
+    def _count(self, replaced: bool):
+        self._stats['received'] += 1
+        if replaced:
+            self._stats['coalesced'] += 1
+
+    def _reject(self) -> bool:
+        with self._lock:
+            self._stats['rejected'] += 1
+        return False
+
+    def drain(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            skew, self._skew = self._skew, {}
+            atm, self._atm = self._atm, {}
+            self._stats['flushed'] += len(skew) + len(atm)
+        updates: Dict[str, Dict[str, Any]] = {}
+        for (pair, tenor, strategy), value in skew.items():
+            updates.setdefault(pair, {}).setdefault('skew', {}).setdefault(tenor, {})[strategy] = value
+        for pair, value in atm.items():
+            updates.setdefault(pair, {})['atm_vol'] = value
+        return updates
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+class QuoteStreamConnector:
+    """Subscribes to per-pair skew and ATM quotes over websocket.
+
+    Incoming ticks are coalesced and the callbacks get one update dict per
+    window (see QuoteCoalescer.drain), run off the event loop so slow
+    consumers never hold up the socket. start() runs the whole thing on a
+    daemon thread with its own loop; it reconnects with backoff and
+    resubscribes after a dropped connection.
+    """
+
+    def __init__(self, server_url: str, pairs: Iterable[str], window: float = DEFAULT_WINDOW,
+                 strategies: Optional[Sequence[str]] = None):
+        self.server_url = server_url
+        self.pairs = list(pairs)
+        self.window = window
+        self.coalescer = QuoteCoalescer(strategies)
+        self.callbacks: List[Callable[[Dict[str, Dict[str, Any]]], None]] = []
+        self.websocket = None
+        self.last_message_at: Optional[datetime] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def connect(self):
+        """Connect to the quote server and subscribe to the configured pairs"""
+        self.websocket = await websockets.connect(self.server_url)
+        await self.subscribe(self.pairs)
+
+    async def subscribe(self, pairs: Iterable[str]):
+        await self.websocket.send(json.dumps({"action": "subscribe", "pairs": list(pairs)}))
+
+    async def listen_for_quotes(self):
+        """Read quotes until the connection drops, then reconnect with backoff"""
+        delay = 1.0
+        while True:
+            try:
+                if self.websocket is None:
+                    await self.connect()
+                    delay = 1.0
+                async for message in self.websocket:
+                    self.handle_message(message)
+            except (websockets.exceptions.WebSocketException, OSError, asyncio.TimeoutError) as e:
+                # Closed connections, refused/failed handshakes (InvalidStatus, InvalidURI, ...)
+                logger.warning(f"Quote stream {self.server_url} unavailable ({e!r}), "
+                               f"reconnecting in {delay:.0f}s")
+            except Exception:
+                logger.exception(f"Quote stream {self.server_url} failed, reconnecting in {delay:.0f}s")
+            self.websocket = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def handle_message(self, message: Union[str, bytes]) -> int:
+        """Decode one message (a tick or a list of ticks) into the coalescer"""
+        self.last_message_at = datetime.utcnow()
+        try:
+            ticks = json.loads(message)
+        except ValueError:
+            logger.warning("Dropped undecodable quote message")
+            return 0
+        if isinstance(ticks, dict):
+            ticks = [ticks]
+        return sum(self.coalescer.add(tick) for tick in ticks)
+
+    def register_callback(self, callback: Callable[[Dict[str, Dict[str, Any]]], None]):
+        """Register a callback for coalesced quote updates"""
+        self.callbacks.append(callback)
+
+    def flush(self) -> int:
+        """Hand everything coalesced since the last flush to the callbacks"""
+        updates = self.coalescer.drain()
+        if updates:
+            for callback in self.callbacks:
+                try:
+                    callback(updates)
+                except Exception as e:
+                    logger.error(f"Quote update callback failed: {e}")
+        return len(updates)
+
+    async def flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.window)
+            await loop.run_in_executor(None, self.flush)
+
+    async def run(self):
+        await asyncio.gather(self.listen_for_quotes(), self.flush_loop())
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()),
+                                        name='quote-stream', daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.coalescer.stats(), 'connected': self.websocket is not None,
+                'last_message_at': self.last_message_at.isoformat() if self.last_message_at else None}
+
+
+_stream: Optional[QuoteStreamConnector] = None
+_stream_pid: Optional[int] = None
+_stream_lock = threading.Lock()
+
+
+def get_quote_stream(server_url: str, pairs: Iterable[str],
+                     sink: Callable[[Dict[str, Dict[str, Any]]], None], **kwargs) -> QuoteStreamConnector:
+    """Per-process quote stream, started lazily like the data fetcher"""
+    global _stream, _stream_pid
+    with _stream_lock:
+        if _stream is None or _stream_pid != os.getpid():
+            _stream = QuoteStreamConnector(server_url, pairs, **kwargs)
+            _stream.register_callback(sink)
+            _stream_pid = os.getpid()
+            _stream.start()
+        return _stream
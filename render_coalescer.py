@@ -0,0 +1,114 @@
+# render_coalescer.py
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+ADD = "add"
+UPDATE = "update"
+REMOVE = "remove"
+
+
+class AlertRenderCoalescer:
+    """Merge alert deltas per client session into at most one AG Grid
+    rowTransaction per frame window.
+
+    Within a window, repeated updates to the same alert id collapse into the
+    latest row, and rows that were added and then removed before the session
+    was flushed are dropped entirely. Resolved alerts stay in the grid, so an
+    alert added and resolved in one window is still sent as an add.
+    """
+
+    def __init__(self, frame_ms: int = 250, session_ttl: float = 300.0):
+        self.frame_ms = frame_ms
+        self.session_ttl = session_ttl
+        self._lock = threading.Lock()
+        # session_id -> {alert_id: (op, row)}; dict order keeps arrival order
+        self._pending: Dict[str, Dict[str, tuple]] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._last_seen: Dict[str, float] = {}
+
+    def register_session(self, session_id: str):
+        """Start buffering deltas for a session"""
+        with self._lock:
+            self._register(session_id, time.monotonic())
+
+    def _register(self, session_id: str, now: float):
+        if session_id not in self._pending:
+            self._pending[session_id] = {}
+            self._last_flush[session_id] = 0.0
+        self._last_seen[session_id] = now
+
+    def publish_new(self, rows: Iterable[Dict[str, Any]]):
+        """Queue alerts that are not yet in any session's grid"""
+        self._publish(rows, ADD)
+
+    def publish(self, rows: Iterable[Dict[str, Any]]):
+        """Queue changed alert rows for every registered session"""
+        self._publish(rows, UPDATE)
+
+    def publish_removed(self, alert_ids: Iterable[str]):
+        """Queue removal of alert rows for every registered session"""
+        self._publish([{"id": alert_id} for alert_id in alert_ids], REMOVE)
+
+    def _publish(self, rows: Iterable[Dict[str, Any]], op: str):
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            for pending in self._pending.values():
+                for row in rows:
+                    self._merge(pending, row, op)
+
+    @staticmethod
+    def _merge(pending: Dict[str, tuple], row: Dict[str, Any], op: str):
+        alert_id = row["id"]
+        previous = pending.get(alert_id)
+
+        if previous is None:
+            pending[alert_id] = (op, row)
+        elif previous[0] == ADD:
+            # Added and then removed inside the same frame: the grid never
+            # saw the row, so nothing needs to be sent at all
+            if op == REMOVE:
+                del pending[alert_id]
+            else:
+                pending[alert_id] = (ADD, row)
+        elif previous[0] == REMOVE:
+            # Re-added before the removal was flushed: the row is still in the grid
+            if op == ADD:
+                pending[alert_id] = (UPDATE, row)
+        else:
+            pending[alert_id] = (op, row)
+
+    def drain(self, session_id: str, now: Optional[float] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Return the merged transaction for a session, or None if the frame
+        budget has not elapsed yet or nothing changed"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if session_id not in self._pending:
+                self._register(session_id, now)
+                return None
+            self._last_seen[session_id] = now
+            self._expire_sessions(now)
+
+            pending = self._pending[session_id]
+            if not pending or (now - self._last_flush[session_id]) * 1000 < self.frame_ms:
+                return None
+            self._pending[session_id] = {}
+            self._last_flush[session_id] = now
+
+        transaction = {ADD: [], UPDATE: [], REMOVE: []}
+        for op, row in pending.values():
+            transaction[op].append(row)
+        return {op: rows for op, rows in transaction.items() if rows}
+
+    def _expire_sessions(self, now: float):
+        expired = [sid for sid, seen in self._last_seen.items() if now - seen > self.session_ttl]
+        for sid in expired:
+            self._pending.pop(sid, None)
+            self._last_flush.pop(sid, None)
+            self._last_seen.pop(sid, None)
+
+    def session_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
@@ -2,12 +2,17 @@
 import json
 import asyncio
 import websockets
-from typing import Callable, List
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, List, Optional, Union
 from models import Alert
 
+if TYPE_CHECKING:
+    from traffic_capture import TrafficRecorder
+
 class AlertServerConnector:
-    def __init__(self, server_url: str):
+    def __init__(self, server_url: str, recorder: Optional["TrafficRecorder"] = None):
         self.server_url = server_url
+        self.recorder = recorder
         self.callbacks = []
         
     async def connect(self):
@@ -18,14 +23,21 @@ class AlertServerConnector:
         """Continuously listen for new alerts"""
         try:
             async for message in self.websocket:
-                alerts = [Alert(**alert_data) for alert_data in json.loads(message)]
-                for callback in self.callbacks:
-                    callback(alerts)
+                if self.recorder is not None:
+                    self.recorder.record(message)
+                self.handle_message(message)
         except websockets.exceptions.ConnectionClosed:
             print("Connection closed, attempting to reconnect...")
             await self.connect()
             await self.listen_for_alerts()
             
+    def handle_message(self, message: Union[str, bytes]) -> int:
+        """Decode one raw upstream message and dispatch it to the registered callbacks"""
+        alerts = [Alert(**alert_data) for alert_data in json.loads(message)]
+        for callback in self.callbacks:
+            callback(alerts)
+        return len(alerts)
+
     def register_callback(self, callback: Callable[[List[Alert]], None]):
         """Register a callback for new alerts"""
         self.callbacks.append(callback)
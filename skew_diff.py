@@ -0,0 +1,92 @@
+# skew_diff.py
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Row field carrying per-cell moves (+1 up, -1 down) for the grid's flash rules
+MOVES_FIELD = '_moves'
+
+
+def skew_array(rows: List[Dict[str, Any]], columns: Sequence[str],
+               tenor_key: str = 'TENOR') -> Tuple[List[str], np.ndarray]:
+    """Tenor labels and a (tenors, columns) float array, NaN for missing quotes"""
+    tenors = [row[tenor_key] for row in rows]
+    values = np.array([[np.nan if row.get(c) is None else row[c] for c in columns] for row in rows],
+                      dtype=float).reshape(len(rows), len(columns))
+    return tenors, values
+
+
+def diff_skew(previous: Tuple[List[str], np.ndarray], current: Tuple[List[str], np.ndarray],
+              rows: List[Dict[str, Any]], columns: Sequence[str], tenor_key: str = 'TENOR',
+              tol: float = 1e-9) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """AG Grid rowTransaction turning the previous skew into the current one.
+
+    Only rows with a moved cell are sent in 'update', each tagged with the
+    direction of every moved cell. Returns None when nothing changed.
+    """
+    old_tenors, old_values = previous
+    new_tenors, new_values = current
+    old_index = {tenor: i for i, tenor in enumerate(old_tenors)}
+
+    common = [(i, old_index[tenor]) for i, tenor in enumerate(new_tenors) if tenor in old_index]
+    update = []
+    if common:
+        new_rows, old_rows = (np.array(idx) for idx in zip(*common))
+        new_block, old_block = new_values[new_rows], old_values[old_rows]
+        both_nan = np.isnan(new_block) & np.isnan(old_block)
+        delta = np.where(both_nan, 0.0, new_block - old_block)
+        # NaN <-> number counts as a move with direction 0
+        moved = ~both_nan & ~(np.abs(delta) <= tol)
+        direction = np.sign(np.nan_to_num(delta))
+        for r in np.flatnonzero(moved.any(axis=1)):
+            row = dict(rows[new_rows[r]])
+            row[MOVES_FIELD] = {columns[c]: int(direction[r, c]) for c in np.flatnonzero(moved[r])}
+            update.append(row)
+
+    new_set = set(new_tenors)
+    add = [dict(rows[i]) for i, tenor in enumerate(new_tenors) if tenor not in old_index]
+    remove = [{tenor_key: tenor} for tenor in old_tenors if tenor not in new_set]
+    if not (update or add or remove):
+        return None
+    transaction = {}
+    if add:
+        transaction['add'] = add
+    if update:
+        transaction['update'] = update
+    if remove:
+        transaction['remove'] = remove
+    return transaction
+
+
+class SkewDiffer:
+    """Recent skew arrays per pair, keyed by the content digest clients hold.
+
+    A client reports the digest of the rows it is showing; if that version is
+    still cached the grid gets a transaction, otherwise the caller falls back
+    to sending full rowData.
+    """
+
+    def __init__(self, columns: Sequence[str], tenor_key: str = 'TENOR', versions: int = 8):
+        self.columns = list(columns)
+        self.tenor_key = tenor_key
+        self.versions = versions
+        self._lock = threading.Lock()
+        self._arrays: Dict[str, "OrderedDict[str, Tuple[List[str], np.ndarray]]"] = {}
+
+    def transaction(self, pair: str, previous_version: Optional[str], version: str,
+                    rows: List[Dict[str, Any]]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Transaction from previous_version to rows ({} if no quote moved),
+        or None if that version is no longer cached"""
+        current = skew_array(rows, self.columns, self.tenor_key)
+        with self._lock:
+            cache = self._arrays.setdefault(pair, OrderedDict())
+            previous = cache.get(previous_version) if previous_version else None
+            cache[version] = current
+            cache.move_to_end(version)
+            while len(cache) > self.versions:
+                cache.popitem(last=False)
+        if previous is None:
+            return None
+        return diff_skew(previous, current, rows, self.columns, self.tenor_key) or {}
@@ -0,0 +1,235 @@
+# skew_history.py
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# One day of 1-second ticks per pair before the oldest rows are spilled/dropped
+DEFAULT_CAPACITY = 86400
+# Fraction of the ring released at once when it is full
+SPILL_FRACTION = 8
+# Rows allocated up front; the buffer doubles from here as rows arrive, up to capacity
+INITIAL_ROWS = 1024
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling; returns the kept indices.
+
+    x must be increasing and y finite. The first and last points are always
+    kept, and each bucket in between contributes the point that forms the
+    largest triangle with the previous pick and the next bucket's average.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Shift x so large epoch values don't cancel out in the area products
+    x = np.asarray(x, dtype=np.float64) - x[0]
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+    # Average point of each following bucket (the last point for the final one)
+    csum_x = np.concatenate([[0.0], np.cumsum(x)])
+    csum_y = np.concatenate([[0.0], np.cumsum(y)])
+    next_lo = ends
+    next_hi = np.append(ends[1:], n)
+    count = np.maximum(next_hi - next_lo, 1)
+    avg_x = (csum_x[next_hi] - csum_x[next_lo]) / count
+    avg_y = (csum_y[next_hi] - csum_y[next_lo]) / count
+
+    # Buckets padded into one matrix by repeating their last point
+    sizes = ends - starts
+    idx = starts[:, None] + np.minimum(np.arange(int(sizes.max())), sizes[:, None] - 1)
+    bx, by = x[idx], y[idx]
+
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    ax, ay = float(x[0]), float(y[0])
+    for i in range(threshold - 2):
+        cx, cy = avg_x[i], avg_y[i]
+        # Twice the triangle area (a, p, c) for every p in the bucket
+        area = np.abs(bx[i] * (cy - ay) - by[i] * (cx - ax) + (cx * ay - ax * cy))
+        a = idx[i, int(np.argmax(area))]
+        picked[i + 1] = a
+        ax, ay = float(x[a]), float(y[a])
+    return picked
+
+
+class SkewHistory:
+    """Columnar ring buffer of one pair's skew matrix: time x tenor x column.
+
+    Values are float32, NaN where a tenor was not quoted. Storage grows by
+    doubling as rows arrive, so a quiet pair never holds a full capacity's
+    worth of memory. When the ring is full the oldest rows are released in
+    chunks, written as .npy files to spill_dir if one is set (and read back
+    memory-mapped by series()).
+    """
+
+    def __init__(self, columns: Sequence[str], capacity: int = DEFAULT_CAPACITY,
+                 spill_dir: Optional[str] = None):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.tenors: List[str] = []
+        self._tenor_index: Dict[str, int] = {}
+        rows = min(capacity, INITIAL_ROWS)
+        self._times = np.zeros(rows, dtype=np.float64)
+        self._values = np.full((rows, 0, len(self.columns)), np.nan, dtype=np.float32)
+        self._start = 0
+        self._count = 0
+        self._chunks: List[Dict[str, Any]] = []
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            index_path = os.path.join(spill_dir, 'index.json')
+            if os.path.exists(index_path):
+                with open(index_path, 'r') as f:
+                    self._chunks = json.load(f)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._times.nbytes + self._values.nbytes
+
+    def _tenor_slot(self, tenor: str) -> int:
+        slot = self._tenor_index.get(tenor)
+        if slot is None:
+            slot = len(self.tenors)
+            self.tenors.append(tenor)
+            self._tenor_index[tenor] = slot
+            grown = np.full((len(self._times), slot + 1, len(self.columns)), np.nan, dtype=np.float32)
+            grown[:, :slot] = self._values
+            self._values = grown
+        return slot
+
+    def _grow(self):
+        # Only called before the ring first fills, while rows start at index 0
+        rows = min(self.capacity, 2 * len(self._times))
+        times = np.zeros(rows, dtype=np.float64)
+        times[:self._count] = self._times[:self._count]
+        values = np.full((rows,) + self._values.shape[1:], np.nan, dtype=np.float32)
+        values[:self._count] = self._values[:self._count]
+        self._times, self._values = times, values
+
+    def append(self, at: float, rows: List[Dict[str, Any]], tenor_key: str = 'TENOR'):
+        slots = [self._tenor_slot(row[tenor_key]) for row in rows]
+        if self._count == self.capacity:
+            self._release(max(1, self.capacity // SPILL_FRACTION))
+        elif self._count == len(self._times):
+            self._grow()
+        index = (self._start + self._count) % len(self._times)
+        matrix = np.full((len(self.tenors), len(self.columns)), np.nan, dtype=np.float32)
+        matrix[slots] = [[np.nan if row.get(c) is None else row[c] for c in self.columns] for row in rows]
+        self._times[index] = at
+        self._values[index] = matrix
+        self._count += 1
+
+    def _ordered(self, array: np.ndarray, first: int = 0, count: Optional[int] = None) -> np.ndarray:
+        """Rows first..first+count in time order (a copy only when they wrap)"""
+        count = self._count - first if count is None else count
+        rows = len(self._times)
+        begin = (self._start + first) % rows
+        end = begin + count
+        if end <= rows:
+            return array[begin:end]
+        return np.concatenate([array[begin:], array[:end - rows]])
+
+    def _release(self, count: int):
+        if self.spill_dir:
+            times = self._ordered(self._times, 0, count)
+            values = self._ordered(self._values, 0, count)
+            name = f"{int(times[0] * 1e6)}_{int(times[-1] * 1e6)}"
+            np.save(os.path.join(self.spill_dir, f"{name}.times.npy"), times)
+            np.save(os.path.join(self.spill_dir, f"{name}.values.npy"), values)
+            self._chunks.append({'name': name, 'start': float(times[0]), 'end': float(times[-1]),
+                                 'tenors': list(self.tenors)})
+            with open(os.path.join(self.spill_dir, 'index.json.tmp'), 'w') as f:
+                json.dump(self._chunks, f)
+            os.replace(os.path.join(self.spill_dir, 'index.json.tmp'), os.path.join(self.spill_dir, 'index.json'))
+        self._start = (self._start + count) % len(self._times)
+        self._count -= count
+
+    def series(self, tenor: str, column: str, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(epoch seconds, values) for one tenor/column, spilled chunks included"""
+        col = self.columns.index(column)
+        times, values = [], []
+        for chunk in self._chunks:
+            if (since is not None and chunk['end'] < since) or tenor not in chunk['tenors']:
+                continue
+            base = os.path.join(self.spill_dir, chunk['name'])
+            times.append(np.load(f"{base}.times.npy", mmap_mode='r'))
+            values.append(np.load(f"{base}.values.npy", mmap_mode='r')[:, chunk['tenors'].index(tenor), col])
+
+        slot = self._tenor_index.get(tenor)
+        if slot is not None and self._count:
+            first = 0
+            if since is not None:
+                first = int(np.searchsorted(self._ordered(self._times), since))
+            times.append(self._ordered(self._times, first))
+            values.append(self._ordered(self._values[:, slot, col], first))
+        if not times:
+            return np.zeros(0), np.zeros(0, dtype=np.float32)
+
+        times, values = np.concatenate(times), np.concatenate(values)
+        if since is not None:
+            keep = times >= since
+            times, values = times[keep], values[keep]
+        return times, values
+
+
+class SkewHistoryStore:
+    """Per-pair skew histories with downsampled time-series queries"""
+
+    def __init__(self, columns: Sequence[str], capacity: int = DEFAULT_CAPACITY,
+                 spill_dir: Optional[str] = None, tenor_key: str = 'TENOR'):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.tenor_key = tenor_key
+        self._lock = threading.Lock()
+        self._histories: Dict[str, SkewHistory] = {}
+
+    def record(self, pair: str, rows: List[Dict[str, Any]], at: Optional[float] = None):
+        """Append a skew matrix snapshot (list of tenor rows) for one pair"""
+        if not rows:
+            return
+        at = time.time() if at is None else at
+        with self._lock:
+            history = self._histories.get(pair)
+            if history is None:
+                spill_dir = os.path.join(self.spill_dir, pair) if self.spill_dir else None
+                history = self._histories[pair] = SkewHistory(self.columns, self.capacity, spill_dir)
+            history.append(at, rows, self.tenor_key)
+
+    def tenors(self, pair: str) -> List[str]:
+        history = self._histories.get(pair)
+        return list(history.tenors) if history is not None else []
+
+    def series(self, pair: str, tenor: str, column: str, span_seconds: Optional[float] = None,
+               max_points: Optional[int] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(datetime64 times, values) over the last span_seconds, LTTB-downsampled to max_points"""
+        history = self._histories.get(pair)
+        if history is None:
+            return np.zeros(0, dtype='datetime64[ms]'), np.zeros(0)
+        end = time.time() if end is None else end
+        since = end - span_seconds if span_seconds else None
+        with self._lock:
+            times, values = history.series(tenor, column, since)
+
+        finite = np.isfinite(values)
+        times, values = times[finite], values[finite].astype(np.float64)
+        if max_points and len(times) > max_points:
+            keep = lttb(times, values, max_points)
+            times, values = times[keep], values[keep]
+        return (times * 1000).astype(np.int64).astype('datetime64[ms]'), values
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(history.nbytes for history in self._histories.values())
@@ -0,0 +1,237 @@
+# smile_calibration.py
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vol_surface import SmileSurface
+
+logger = logging.getLogger(__name__)
+
+SVI_PARAMS = ['a', 'b', 'rho', 'm', 'sigma']
+
+
+def svi_total_variance(params: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """Raw SVI w(k) = a + b (rho (k - m) + sqrt((k - m)^2 + sigma^2)); params (..., 5)"""
+    a, b, rho, m, sigma = (params[..., i:i + 1] for i in range(5))
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + sigma * sigma))
+
+
+def _to_internal(params: np.ndarray) -> np.ndarray:
+    """(a, b, rho, m, sigma) -> unconstrained (a, log b, atanh rho, m, log sigma)"""
+    a, b, rho, m, sigma = params.T
+    return np.stack([a, np.log(np.maximum(b, 1e-12)), np.arctanh(np.clip(rho, -0.999, 0.999)), m,
+                     np.log(np.maximum(sigma, 1e-12))], axis=-1)
+
+
+def _from_internal(theta: np.ndarray) -> np.ndarray:
+    a, log_b, atanh_rho, m, log_sigma = theta.T
+    return np.stack([a, np.exp(log_b), np.tanh(atanh_rho), m, np.exp(log_sigma)], axis=-1)
+
+
+def _residuals_and_jacobian(theta: np.ndarray, k: np.ndarray, w_target: np.ndarray,
+                            weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Weighted residuals (n, p) and their Jacobian (n, p, 5) for n smiles at once"""
+    a, log_b, atanh_rho, m, log_sigma = (theta[:, i:i + 1] for i in range(5))
+    b, rho, sigma = np.exp(log_b), np.tanh(atanh_rho), np.exp(log_sigma)
+    x = k - m
+    root = np.sqrt(x * x + sigma * sigma)
+    w = a + b * (rho * x + root)
+
+    jac = np.stack([
+        np.ones_like(x),
+        b * (rho * x + root),
+        b * x * (1 - rho * rho),
+        -b * (rho + x / root),
+        b * sigma * sigma / root,
+    ], axis=-1)
+    return (w - w_target) * weights, jac * weights[..., None]
+
+
+def _initial_guess(k: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """Cold-start SVI parameters from the shape of each quoted smile"""
+    atm = w[:, w.shape[1] // 2]
+    half_width = np.maximum((k[:, -1] - k[:, 0]) / 2, 1e-4)
+    wings = (w[:, 0] + w[:, -1]) / 2
+    b = np.maximum((wings - atm) / half_width, 1e-4) + np.abs(w[:, -1] - w[:, 0]) / (2 * half_width)
+    rho = np.clip((w[:, -1] - w[:, 0]) / (2 * half_width * b), -0.9, 0.9)
+    sigma = half_width / 2
+    a = atm - b * sigma
+    return np.stack([a, b, rho, np.zeros_like(a), sigma], axis=-1)
+
+
+def fit_svi(k: np.ndarray, w_target: np.ndarray, weights: np.ndarray, initial: np.ndarray,
+            max_iter: int = 100, tol: float = 1e-12) -> Tuple[np.ndarray, np.ndarray]:
+    """Levenberg-Marquardt on n smiles in lockstep; returns params (n, 5) and iterations (n,)"""
+    theta = _to_internal(initial)
+    n = len(theta)
+    damping = np.full(n, 1e-3)
+    active = np.ones(n, dtype=bool)
+    iterations = np.zeros(n, dtype=int)
+    residuals, jac = _residuals_and_jacobian(theta, k, w_target, weights)
+    cost = (residuals ** 2).sum(axis=1)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if not len(idx):
+            break
+        J = jac[idx]
+        JtJ = np.einsum('npi,npj->nij', J, J)
+        grad = np.einsum('npi,np->ni', J, residuals[idx])
+        diag = np.einsum('nii->ni', JtJ)
+        lhs = JtJ + (damping[idx, None] * (diag + 1e-12))[..., None] * np.eye(5)
+        step = np.linalg.solve(lhs, -grad[..., None])[..., 0]
+
+        trial = theta[idx] + step
+        # Overshooting steps can overflow exp(); they are rejected via isfinite below
+        with np.errstate(over='ignore', invalid='ignore'):
+            trial_res, trial_jac = _residuals_and_jacobian(trial, k[idx], w_target[idx], weights[idx])
+            trial_cost = (trial_res ** 2).sum(axis=1)
+        improved = np.isfinite(trial_cost) & (trial_cost < cost[idx])
+
+        accept = idx[improved]
+        theta[accept] = trial[improved]
+        residuals[accept] = trial_res[improved]
+        jac[accept] = trial_jac[improved]
+        converged = improved & ((cost[idx] - trial_cost) < tol * (1 + cost[idx]))
+        cost[accept] = trial_cost[improved]
+        damping[idx] = np.where(improved, damping[idx] / 3, damping[idx] * 4)
+        iterations[idx] += 1
+
+        done = converged | (cost[idx] < tol) | (damping[idx] > 1e10) | (np.abs(step).max(axis=1) < 1e-10)
+        active[idx[done]] = False
+
+    return _from_internal(theta), iterations
+
+
+class SmileCalibrator:
+    """SVI calibration per tenor, warm-started from the previous fit.
+
+    Tenors whose quotes (pillar strikes and vols) are unchanged since their
+    last fit are skipped; everything else is fitted in one batched LM solve.
+    """
+
+    def __init__(self, max_iter: int = 100):
+        self.max_iter = max_iter
+        self._lock = threading.Lock()
+        # (pair, tenor) -> (quote key, params, rmse in vol points)
+        self._fits: Dict[Tuple[str, str], Tuple[Tuple, np.ndarray, float]] = {}
+
+    def discard(self, pair: str):
+        """Forget a pair's fits; its next calibration starts cold"""
+        with self._lock:
+            for key in [key for key in self._fits if key[0] == pair]:
+                del self._fits[key]
+
+    def _jobs(self, surfaces: List[SmileSurface]) -> List[Tuple]:
+        """(surface, tenor index, tenor, quote key, cached fit) for every tenor needing a fit"""
+        jobs = []
+        for surface in surfaces:
+            for i, tenor in enumerate(surface.tenors):
+                key = (surface.forward, float(surface.years[i])) + tuple(np.round(surface.vols[i], 8))
+                cached = self._fits.get((surface.pair, tenor))
+                if cached is not None and cached[0] == key:
+                    continue
+                if not np.isfinite(surface.vols[i]).all():
+                    continue
+                jobs.append((surface, i, tenor, key, cached))
+        return jobs
+
+    def _job_arrays(self, jobs: List[Tuple]) -> Dict[str, np.ndarray]:
+        """Fit inputs for svi_fit_job, warm-started where a previous fit exists"""
+        k = np.array([np.log(s.strikes[i] / s.forward) for s, i, _, _, _ in jobs])
+        years = np.array([s.years[i] for s, i, _, _, _ in jobs])
+        vols = np.array([s.vols[i] / 100.0 for s, i, _, _, _ in jobs])
+        w_target = vols ** 2 * years[:, None]
+        # Weighting by 1/(2 sigma T) makes residuals approximately vol errors
+        weights = 1.0 / (2 * vols * years[:, None])
+
+        initial = _initial_guess(k, w_target)
+        warm = np.array([cached is not None for _, _, _, _, cached in jobs])
+        if warm.any():
+            initial[warm] = np.array([cached[1] for *_, cached in jobs if cached is not None])
+        return {'k': k, 'w_target': w_target, 'weights': weights, 'initial': initial,
+                'max_iter': np.array([float(self.max_iter)])}
+
+    def _store(self, jobs: List[Tuple], inputs: Dict[str, np.ndarray], params: np.ndarray):
+        k, w_target = inputs['k'], inputs['w_target']
+        years = np.array([s.years[i] for s, i, _, _, _ in jobs])
+        vols = np.sqrt(w_target / years[:, None])
+        fitted_vols = np.sqrt(np.maximum(svi_total_variance(params, k), 0) / years[:, None])
+        rmse = np.sqrt(((fitted_vols - vols) ** 2).mean(axis=1)) * 100.0
+        with self._lock:
+            for (surface, _, tenor, key, _), p, err in zip(jobs, params, rmse):
+                self._fits[(surface.pair, tenor)] = (key, p, float(err))
+
+    def calibrate(self, surfaces: List[SmileSurface]) -> Dict[str, Dict[str, Any]]:
+        """Fit every changed tenor of the given surfaces; returns per-pair results"""
+        started = time.perf_counter()
+        jobs = self._jobs(surfaces)
+        iterations = np.zeros(0, dtype=int)
+        if jobs:
+            inputs = self._job_arrays(jobs)
+            params, iterations = fit_svi(inputs['k'], inputs['w_target'], inputs['weights'], inputs['initial'],
+                                         max_iter=self.max_iter)
+            self._store(jobs, inputs, params)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if jobs:
+            logger.info(f"SVI calibration: {len(jobs)} tenors across {len(surfaces)} pairs in {elapsed_ms:.1f} ms")
+        return self._results(surfaces, jobs, iterations, elapsed_ms)
+
+    def prepare(self, surface: SmileSurface) -> Tuple[List[Tuple], Optional[Dict[str, np.ndarray]]]:
+        """One pair's pending fits and their inputs, for running svi_fit_job elsewhere"""
+        jobs = self._jobs([surface])
+        return jobs, (self._job_arrays(jobs) if jobs else None)
+
+    def install(self, surface: SmileSurface, jobs: List[Tuple], inputs: Optional[Dict[str, np.ndarray]],
+                outputs: Optional[Dict[str, np.ndarray]], elapsed_ms: float) -> Dict[str, Any]:
+        """Store fits computed by svi_fit_job from prepare()'s inputs; returns the pair's result"""
+        iterations = np.zeros(0, dtype=int)
+        if jobs:
+            self._store(jobs, inputs, outputs['params'])
+            iterations = outputs['iterations'].astype(int)
+        return self._results([surface], jobs, iterations, elapsed_ms)[surface.pair]
+
+    def _results(self, surfaces: List[SmileSurface], jobs: List[Tuple], iterations: np.ndarray,
+                 elapsed_ms: float) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for surface in surfaces:
+            fitted = [n for n, job in enumerate(jobs) if job[0] is surface]
+            rows = []
+            for tenor in surface.tenors:
+                fit = self._fits.get((surface.pair, tenor))
+                if fit is None:
+                    continue
+                rows.append({'TENOR': tenor, **{name: float(v) for name, v in zip(SVI_PARAMS, fit[1])},
+                             'rmse_vol': round(fit[2], 6)})
+            results[surface.pair] = {
+                'params': rows,
+                'fit': {
+                    'tenors_fitted': len(fitted),
+                    'tenors_skipped': len(surface.tenors) - len(fitted),
+                    'warm_started': sum(1 for n in fitted if jobs[n][4] is not None),
+                    'max_rmse_vol': max((r['rmse_vol'] for r in rows), default=None),
+                    'iterations': int(iterations[fitted].max()) if fitted else 0,
+                    'elapsed_ms': round(elapsed_ms, 3),
+                },
+            }
+        return results
+
+
+def svi_fit_job(batch: List[Dict[str, np.ndarray]]):
+    """Process-pool job: fit a batch of SmileCalibrator.prepare inputs in one LM solve,
+    writing params/iterations into each job's arrays in place"""
+    stacked = {name: np.concatenate([arrays[name] for arrays in batch])
+               for name in ('k', 'w_target', 'weights', 'initial')}
+    params, iterations = fit_svi(stacked['k'], stacked['w_target'], stacked['weights'], stacked['initial'],
+                                 max_iter=int(max(arrays['max_iter'][0] for arrays in batch)))
+    offset = 0
+    for arrays in batch:
+        rows = len(arrays['k'])
+        arrays['params'][:] = params[offset:offset + rows]
+        arrays['iterations'][:] = iterations[offset:offset + rows]
+        offset += rows
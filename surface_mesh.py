@@ -0,0 +1,59 @@
+# surface_mesh.py
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vol_surface import SmileSurface
+
+# One mesh point per this many screen pixels, within [MIN_POINTS, MAX_POINTS] per axis
+PIXELS_PER_POINT = 6
+MIN_POINTS = 8
+MAX_POINTS = 160
+
+Range = Optional[Sequence[float]]
+
+
+def mesh_points(pixels: Optional[float], pixels_per_point: int = PIXELS_PER_POINT) -> int:
+    """Points along an axis that is `pixels` wide on screen"""
+    if not pixels:
+        return MIN_POINTS * 4
+    return int(np.clip(pixels // pixels_per_point, MIN_POINTS, MAX_POINTS))
+
+
+def surface_bounds(surface: SmileSurface) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    """(strike range, year range) covered by the surface's quotes"""
+    if not len(surface.grid_years):
+        return (surface.forward, surface.forward), (0.0, 0.0)
+    strikes = surface.forward * np.exp(surface.grid_k[[0, -1]])
+    return (float(strikes[0]), float(strikes[1])), (float(surface.grid_years[0]), float(surface.grid_years[-1]))
+
+
+def _clip_range(requested: Range, bounds: Tuple[float, float]) -> Tuple[float, float]:
+    if not requested:
+        return bounds
+    low, high = sorted(float(value) for value in requested)
+    low, high = max(low, bounds[0]), min(high, bounds[1])
+    return (low, high) if high > low else bounds
+
+
+def surface_mesh(surface: SmileSurface, n_strikes: int, n_years: int,
+                 strike_range: Range = None, year_range: Range = None) -> Dict[str, Any]:
+    """Vols (%) on an n_years x n_strikes mesh over a window of the surface.
+
+    The mesh is sampled straight from the surface's interpolation at the
+    requested resolution, so a zoomed window gets the same number of points
+    as the full view and detail is only ever paid for where it is visible.
+    Windows are clipped to the quoted range (vols are flat outside it);
+    strikes are spaced evenly in log-moneyness, like the smiles themselves.
+    """
+    strike_bounds, year_bounds = surface_bounds(surface)
+    strike_low, strike_high = _clip_range(strike_range, strike_bounds)
+    year_low, year_high = _clip_range(year_range, year_bounds)
+    strikes = np.geomspace(strike_low, strike_high, n_strikes)
+    years = np.linspace(year_low, year_high, n_years)
+    return {
+        'strikes': strikes,
+        'years': years,
+        'vols': surface.vols_at(years[:, None], strikes[None, :]),
+        'zoomed': (strike_low, strike_high) != strike_bounds or (year_low, year_high) != year_bounds,
+    }
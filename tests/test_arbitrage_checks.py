@@ -0,0 +1,66 @@
+# tests/test_arbitrage_checks.py
+import copy
+
+from arbitrage_checks import BUTTERFLY, CALENDAR, NEGATIVE_STR, TOTAL_VARIANCE, ArbitrageChecker, find_violations
+from models import AlertImportance, AlertStatus
+
+CLEAN = {
+    'forward': 1.1,
+    'skew_matrix': [
+        {'TENOR': '1Y', 'ATM': 12.0, '10RR': -3.0, '10STR': 1.2, '25RR': -1.5, '25STR': 0.4},
+        {'TENOR': '1M', 'ATM': 10.0, '10RR': -2.0, '10STR': 1.0, '25RR': -1.0, '25STR': 0.3},
+    ],
+}
+
+
+def quoted(tenor, **quotes):
+    pair = copy.deepcopy(CLEAN)
+    for row in pair['skew_matrix']:
+        if row['TENOR'] == tenor:
+            row.update(quotes)
+    return pair
+
+
+def checks(pairs):
+    return sorted((v['pair'], v['tenor'], v['check']) for v in find_violations(pairs))
+
+
+def test_each_check_flags_its_violation_only():
+    assert find_violations({'EURUSD': CLEAN}) == []
+    assert checks({'EURUSD': quoted('1M', **{'25STR': -0.5})}) == [('EURUSD', '1M', NEGATIVE_STR)]
+    assert checks({'EURUSD': quoted('1Y', **{'25STR': 3.0, '10STR': 0.1})}) == [('EURUSD', '1Y', BUTTERFLY)]
+    # A 1M ATM of 45% carries more total variance than the 1Y
+    assert checks({'EURUSD': quoted('1M', ATM=45.0)}) == [('EURUSD', '1Y', CALENDAR), ('EURUSD', '1Y', TOTAL_VARIANCE)]
+
+
+def test_pairs_are_checked_together_without_mixing():
+    pairs = {'EURUSD': CLEAN, 'USDJPY': dict(quoted('1M', **{'10STR': -0.2}), forward=150.0),
+             'GBPUSD': {'skew_matrix': CLEAN['skew_matrix'][:1]}, 'meta': 'not a pair'}
+    assert checks(pairs) == [('USDJPY', '1M', NEGATIVE_STR)]
+
+
+def test_checker_reports_new_and_resolved_once_and_forwards_changes():
+    forwarded = []
+    checker = ArbitrageChecker(sink=forwarded.extend)
+    broken = quoted('1M', **{'25STR': -0.5})
+
+    [raised] = checker.check({'EURUSD': broken, 'USDJPY': CLEAN})
+    assert raised.status == AlertStatus.NEW and raised.importance == AlertImportance.WARNING
+    assert raised.id == 'ARB-EURUSD-NEGATIVE_STR-1M'
+    assert checker.check({'EURUSD': broken}) == []
+    # Pairs left out of a check keep their alerts
+    assert checker.check({'USDJPY': CLEAN}) == []
+    assert [alert.id for alert in checker.active_alerts('EURUSD')] == [raised.id]
+
+    [cleared] = checker.check({'EURUSD': CLEAN})
+    assert cleared.id == raised.id and cleared.status == AlertStatus.RESOLVED
+    assert checker.active_alerts() == []
+    assert forwarded == [raised, cleared]
+
+
+def test_failing_sink_does_not_break_checks():
+    def sink(alerts):
+        raise RuntimeError("monitor down")
+
+    checker = ArbitrageChecker(sink=sink)
+    assert len(checker.check({'EURUSD': quoted('1M', **{'25STR': -0.5})})) == 1
@@ -0,0 +1,69 @@
+# tests/test_bulk_shift.py
+import copy
+
+import pytest
+
+from bulk_shift import ABSOLUTE, MIN_VOL, RELATIVE, shift_pairs, shift_summary
+
+DATA = {
+    'EURUSD': {
+        'skew_matrix': [
+            {'TENOR': '1M', 'ATM': 10.123456789, '10RR': -2.0, '10STR': 1.0, '25RR': -1.0, '25STR': 0.3},
+            {'TENOR': '1Y', 'ATM': 12.0, '10RR': -3.0, '10STR': 1.2, '25RR': -1.5, '25STR': 0.4},
+        ],
+        'atm_vol': {'current_value': 9.0, 'applied_vol': 9.5},
+    },
+    'USDJPY': {
+        'skew_matrix': [{'TENOR': '1M', 'ATM': 11.0, '10RR': 1.0, '10STR': 0.8, '25RR': 0.5, '25STR': 0.2}],
+        'atm_vol': {'current_value': 11.0},
+    },
+    'timestamp': '2026-01-05 09:00:00',
+}
+
+
+def rows(shifted, pair):
+    return {row['TENOR']: row for row in shifted[pair]['skew_matrix']}
+
+
+def test_absolute_shift_of_selected_tenors_only():
+    before = copy.deepcopy(DATA)
+    shifted = shift_pairs(DATA, ['1M'], ['ATM', 'RR'], ABSOLUTE, 0.5)
+    assert DATA == before
+    assert set(shifted) == {'EURUSD', 'USDJPY'}
+
+    eurusd = rows(shifted, 'EURUSD')
+    assert eurusd['1M']['ATM'] == 10.6235
+    assert (eurusd['1M']['10RR'], eurusd['1M']['25RR']) == (-1.5, -0.5)
+    # Unselected cells keep their exact values
+    assert eurusd['1M']['10STR'] == 1.0 and eurusd['1Y'] == DATA['EURUSD']['skew_matrix'][1]
+    assert rows(shifted, 'USDJPY')['1M']['ATM'] == 11.5
+    assert 'atm_vol' not in shifted['EURUSD']
+
+
+def test_relative_shift_floors_atm_and_moves_0d_level():
+    shifted = shift_pairs(DATA, None, ['ATM', '0D'], RELATIVE, -100.0)
+    assert all(row['ATM'] == MIN_VOL for row in shifted['EURUSD']['skew_matrix'])
+    assert rows(shifted, 'EURUSD')['1Y']['25RR'] == -1.5
+
+    shifted = shift_pairs(DATA, None, ['0D'], RELATIVE, 10.0)
+    assert shifted['EURUSD']['atm_vol']['applied_vol'] == pytest.approx(10.45)
+    assert shifted['USDJPY']['atm_vol']['applied_vol'] == pytest.approx(12.1)
+    assert 'skew_matrix' not in shifted['EURUSD']
+
+
+def test_invalid_requests_raise_value_error():
+    with pytest.raises(ValueError):
+        shift_pairs(DATA, None, ['VEGA'], ABSOLUTE, 1.0)
+    with pytest.raises(ValueError):
+        shift_pairs(DATA, None, ['ATM'], 'log', 1.0)
+
+
+def test_summary_lists_only_changed_quotes():
+    shifted = shift_pairs(DATA, ['1Y'], ['STR', '0D'], ABSOLUTE, 0.25)
+    summary = shift_summary(DATA, shifted)
+    assert {(r['pair'], r['tenor'], r['strategy'], r['before'], r['after']) for r in summary} == {
+        ('EURUSD', '1Y', '10STR', 1.2, 1.45),
+        ('EURUSD', '1Y', '25STR', 0.4, 0.65),
+        ('EURUSD', '0D', 'ATM', 9.5, 9.75),
+        ('USDJPY', '0D', 'ATM', 11.0, 11.25),
+    }
@@ -0,0 +1,52 @@
+# tests/test_compute_pool.py
+import numpy as np
+import pytest
+
+from compute_pool import ComputeScheduler, get_compute_scheduler
+
+
+def double_job(batch):
+    for arrays in batch:
+        arrays['out'][:] = arrays['x'] * 2
+
+
+@pytest.fixture(scope='module')
+def scheduler():
+    scheduler = ComputeScheduler(workers=2)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def submit(scheduler, delivered, pair, value, key):
+    return scheduler.submit(pair, double_job, {'x': np.full(3, float(value))}, {'out': (3,)},
+                            lambda pair, outputs, ms: delivered.append((pair, outputs['out'].tolist())), key=key)
+
+
+def test_duplicate_keys_are_dropped_until_forgotten(scheduler):
+    delivered = []
+    assert submit(scheduler, delivered, 'EURUSD', 1, key='v1')
+    assert not submit(scheduler, delivered, 'EURUSD', 1, key='v1')
+    assert submit(scheduler, delivered, 'USDJPY', 5, key='v1')
+    assert scheduler.wait(timeout=60)
+    assert sorted(delivered) == [('EURUSD', [2.0] * 3), ('USDJPY', [10.0] * 3)]
+
+    # The last finished key still counts as a duplicate
+    assert not submit(scheduler, delivered, 'EURUSD', 1, key='v1')
+    scheduler.forget('EURUSD')
+    assert submit(scheduler, delivered, 'EURUSD', 1, key='v1')
+    assert scheduler.wait(timeout=60)
+    assert len(delivered) == 3
+    assert scheduler.stats()['duplicates'] == 2
+
+
+def test_newer_submission_wins_over_queued_and_running_jobs(scheduler):
+    delivered = []
+    for value in range(1, 6):
+        assert submit(scheduler, delivered, 'GBPUSD', value, key=value)
+    assert scheduler.wait(timeout=60)
+    assert delivered[-1] == ('GBPUSD', [10.0] * 3)
+    assert len(delivered) < 5
+
+
+def test_fewer_than_two_workers_means_inline():
+    assert get_compute_scheduler(1) is None
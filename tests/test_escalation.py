@@ -0,0 +1,56 @@
+# tests/test_escalation.py
+from datetime import datetime, timedelta
+
+from escalation import ESCALATE, NOTIFY, EscalationScheduler, epoch_seconds
+from models import AlertImportance, AlertStatus
+
+CREATED = datetime(2026, 1, 5, 9, 0, 0)
+T0 = epoch_seconds(CREATED)
+
+
+def alert(alert_id, importance, status=AlertStatus.NEW, **extra):
+    return {"id": alert_id, "importance": importance.value, "status": status.value, "timestamp": CREATED, **extra}
+
+
+def test_unacknowledged_alert_escalates_then_notifies():
+    scheduler = EscalationScheduler()
+    events = []
+    scheduler.register_callback(events.append)
+    scheduler.observe([alert("A1", AlertImportance.INFORMATION)], now=T0)
+
+    assert scheduler.poll(now=T0 + 3599) == []
+    [first] = scheduler.poll(now=T0 + 3600)
+    assert (first["action"], first["new_importance"]) == (ESCALATE, "Warning")
+    # Thresholds of the new level run from the escalation, not from creation
+    assert scheduler.poll(now=T0 + 3600 + 1799) == []
+    [second] = scheduler.poll(now=T0 + 3600 + 1800)
+    assert second["new_importance"] == "Critical"
+
+    critical_at = T0 + 5400
+    notices = scheduler.poll(now=critical_at + 3600)
+    assert [(e["action"], e["threshold_s"]) for e in notices] == [(NOTIFY, 300), (NOTIFY, 900), (NOTIFY, 3600)]
+    assert scheduler.poll(now=critical_at + 10 ** 6) == []
+    assert events == [first, second] + notices
+    assert scheduler.breaches == 5
+
+
+def test_acknowledging_cancels_the_timer_and_records_time_to_acknowledge():
+    scheduler = EscalationScheduler()
+    scheduler.observe([alert("A1", AlertImportance.CRITICAL), alert("A2", AlertImportance.CRITICAL)], now=T0)
+    acked_at = CREATED + timedelta(seconds=120)
+    acknowledged = alert("A1", AlertImportance.CRITICAL, status=AlertStatus.ACKNOWLEDGED, acknowledged_at=acked_at)
+    scheduler.observe([acknowledged], now=T0 + 120)
+
+    assert [e["alert_id"] for e in scheduler.poll(now=T0 + 300)] == ["A2"]
+    assert scheduler.stats()["time_to_acknowledge"]["Critical"]["mean"] == 120
+
+    scheduler.observe([alert("A1", AlertImportance.CRITICAL, status=AlertStatus.RESOLVED)], now=T0 + 600)
+    assert scheduler.open_count() == 1
+    assert scheduler.stats()["time_to_resolve"]["Critical"]["count"] == 1
+
+
+def test_resolved_alerts_never_start_a_timer():
+    scheduler = EscalationScheduler()
+    scheduler.observe([alert("A1", AlertImportance.WARNING, status=AlertStatus.RESOLVED)], now=T0)
+    assert scheduler.open_count() == 0
+    assert scheduler.poll(now=T0 + 10 ** 6) == []
@@ -0,0 +1,72 @@
+# tests/test_override_journal.py
+import atexit
+import json
+
+from override_journal import OverrideJournal
+
+
+def open_journal(tmp_path, **kwargs):
+    return OverrideJournal(str(tmp_path / "state.json"), flush_interval=0.001, **kwargs)
+
+
+def crash(journal):
+    """Leave a journal the way a killed process would: flushed, never closed or compacted"""
+    journal.flush()
+    atexit.unregister(journal.close)
+
+
+def test_changes_survive_a_restart(tmp_path):
+    journal = open_journal(tmp_path, default=lambda: {"EURUSD": {"atm": 10.0}})
+    journal.set("EURUSD", "atm", 10.5)
+    journal.append("EURUSD", "history", {"atm": 10.5})
+    journal.set("USDJPY", "atm", 9.0)
+    crash(journal)
+
+    recovered = open_journal(tmp_path)
+    assert recovered.data == {"EURUSD": {"atm": 10.5, "history": [{"atm": 10.5}]}, "USDJPY": {"atm": 9.0}}
+    recovered.close()
+
+
+def test_torn_tail_is_cut_and_later_records_replay(tmp_path):
+    journal = open_journal(tmp_path, snapshot_every=1000)
+    journal.set("EURUSD", "atm", 10.5)
+    crash(journal)
+    with open(journal.journal_path, "a") as f:
+        f.write('{"seq": 2, "op": "set", "pa')
+
+    recovered = open_journal(tmp_path, snapshot_every=1000)
+    assert recovered.data == {"EURUSD": {"atm": 10.5}}
+    recovered.set("EURUSD", "atm", 11.0)
+    recovered.flush()
+    with open(recovered.journal_path) as f:
+        assert [json.loads(line)["seq"] for line in f] == [1, 2]
+    recovered.close()
+
+
+def test_compaction_snapshots_and_truncates_the_journal(tmp_path):
+    journal = open_journal(tmp_path, snapshot_every=3)
+    for value in range(5):
+        journal.set("EURUSD", "atm", float(value))
+        journal.flush()
+    with open(journal.snapshot_path) as f:
+        snapshot = json.load(f)
+    assert snapshot["seq"] >= 3
+    with open(journal.journal_path) as f:
+        assert len(f.readlines()) == 5 - snapshot["seq"]
+    journal.close()
+
+    recovered = open_journal(tmp_path)
+    assert recovered.data == {"EURUSD": {"atm": 4.0}}
+    recovered.close()
+
+
+def test_bare_legacy_snapshot_is_loaded(tmp_path):
+    (tmp_path / "state.json").write_text(json.dumps({"EURUSD": {"atm": 10.0}}))
+    journal = open_journal(tmp_path)
+    assert journal.data == {"EURUSD": {"atm": 10.0}}
+    journal.set("EURUSD", "atm", 10.5)
+    journal.close()
+
+    recovered = open_journal(tmp_path)
+    assert recovered.data == {"EURUSD": {"atm": 10.5}}
+    recovered.close()
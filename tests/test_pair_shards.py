@@ -0,0 +1,28 @@
+# tests/test_pair_shards.py
+import json
+
+from pair_shards import RECENT_PAIRS, PairShardStore, remember_pair
+
+
+def test_remember_pair_keeps_the_most_recent_pairs():
+    recent = None
+    for pair in 'ABCDE':
+        recent = remember_pair(recent, pair)
+    assert recent == ['E', 'D', 'C', 'B', 'A']
+
+    recent = remember_pair(recent, 'F')
+    assert recent == ['F', 'E', 'D', 'C', 'B'] and len(recent) == RECENT_PAIRS
+    assert remember_pair(recent, 'C') == ['C', 'F', 'E', 'D', 'B']
+
+
+def test_updates_are_written_through_and_survive_eviction(tmp_path):
+    evicted = []
+    store = PairShardStore(str(tmp_path), lambda pair: {'pair': pair, 'atm': 10.0},
+                           on_evict=evicted.append, max_bytes=60)
+    store.update('EURUSD', lambda shard: shard.update(atm=11.0))
+    store.get('USDJPY')
+    store.get('GBPUSD')
+
+    assert 'EURUSD' in evicted
+    assert json.loads((tmp_path / 'EURUSD.json').read_text())['atm'] == 11.0
+    assert store.get('EURUSD')['atm'] == 11.0
@@ -0,0 +1,77 @@
+# tests/test_render_coalescer.py
+from render_coalescer import ADD, REMOVE, UPDATE, AlertRenderCoalescer
+
+
+def row(alert_id, status="New", **extra):
+    return {"id": alert_id, "status": status, **extra}
+
+
+def coalescer_with(*sessions):
+    coalescer = AlertRenderCoalescer(frame_ms=250, session_ttl=300.0)
+    for session_id in sessions:
+        coalescer.register_session(session_id)
+    return coalescer
+
+
+def test_changes_to_one_alert_collapse_into_the_latest_row():
+    coalescer = coalescer_with("s1")
+    coalescer.publish_new([row("A1")])
+    coalescer.publish([row("A1", status="Acknowledged")])
+    coalescer.publish([row("B1", importance="Warning")])
+    coalescer.publish([row("B1", importance="Critical")])
+
+    assert coalescer.drain("s1", now=1000.0) == {
+        ADD: [row("A1", status="Acknowledged")],
+        UPDATE: [row("B1", importance="Critical")],
+    }
+    assert coalescer.drain("s1", now=1001.0) is None
+
+
+def test_add_then_resolve_is_sent_but_add_then_remove_is_not():
+    coalescer = coalescer_with("s1")
+    coalescer.publish_new([row("A1"), row("A2")])
+    coalescer.publish([row("A1", status="Resolved")])
+    coalescer.publish_removed(["A2"])
+
+    assert coalescer.drain("s1", now=1000.0) == {ADD: [row("A1", status="Resolved")]}
+
+
+def test_remove_then_re_add_becomes_an_update_and_update_then_remove_a_remove():
+    coalescer = coalescer_with("s1")
+    coalescer.publish_removed(["A1"])
+    coalescer.publish_new([row("A1", status="Acknowledged")])
+    coalescer.publish([row("A2")])
+    coalescer.publish_removed(["A2"])
+
+    assert coalescer.drain("s1", now=1000.0) == {
+        UPDATE: [row("A1", status="Acknowledged")],
+        REMOVE: [{"id": "A2"}],
+    }
+
+
+def test_sessions_drain_independently_within_their_frame_budget():
+    coalescer = coalescer_with("s1", "s2")
+    coalescer.publish_new([row("A1")])
+    assert coalescer.drain("s1", now=1000.0) == {ADD: [row("A1")]}
+
+    coalescer.publish([row("A1", status="Resolved")])
+    # s1 flushed 100 ms ago, so its update waits for the next frame
+    assert coalescer.drain("s1", now=1000.1) is None
+    assert coalescer.drain("s1", now=1000.3) == {UPDATE: [row("A1", status="Resolved")]}
+    assert coalescer.drain("s2", now=1000.3) == {ADD: [row("A1", status="Resolved")]}
+
+
+def test_deltas_reach_only_registered_sessions_and_idle_sessions_expire():
+    coalescer = coalescer_with()
+    coalescer.publish_new([row("A0")])
+    # An unknown session is registered by its first drain and only sees later deltas
+    assert coalescer.drain("s1", now=1000.0) is None
+    coalescer.publish_new([row("A1")])
+    assert coalescer.drain("s2", now=1000.0) is None
+    coalescer.publish_new([row("A2")])
+    assert coalescer.drain("s1", now=1001.0) == {ADD: [row("A1"), row("A2")]}
+    assert coalescer.drain("s2", now=1001.0) == {ADD: [row("A2")]}
+    assert coalescer.session_count() == 2
+
+    assert coalescer.drain("s2", now=1400.0) is None
+    assert coalescer.session_count() == 1
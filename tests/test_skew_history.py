@@ -0,0 +1,71 @@
+# tests/test_skew_history.py
+import numpy as np
+
+from skew_history import INITIAL_ROWS, SkewHistory, SkewHistoryStore, lttb
+
+COLUMNS = ['ATM', '25RR']
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000, dtype=float) + 1.7e9
+    y = np.sin(x / 50.0)
+    y[437] = 25.0
+    keep = lttb(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    assert 437 in keep
+    np.testing.assert_array_equal(lttb(x[:50], y[:50], 100), np.arange(50))
+
+
+def fill(history, start, stop):
+    for t in range(start, stop):
+        rows = [{'TENOR': '1M', 'ATM': float(t), '25RR': -1.0}]
+        if t % 2:
+            rows.append({'TENOR': '1Y', 'ATM': float(t) + 0.5})
+        history.append(float(t), rows)
+
+
+def test_history_grows_lazily_and_wraps_in_time_order():
+    history = SkewHistory(COLUMNS, capacity=3000)
+    assert len(history._times) == INITIAL_ROWS
+    fill(history, 0, 2500)
+    assert len(history) == 2500 and len(history._times) == 3000
+
+    fill(history, 2500, 4000)
+    times, values = history.series('1M', 'ATM')
+    assert len(history) <= 3000
+    assert times[-1] == 3999 and np.all(np.diff(times) == 1)
+    np.testing.assert_array_equal(values, times)
+
+    times, values = history.series('1Y', 'ATM', since=3990)
+    np.testing.assert_array_equal(times, np.arange(3990, 4000))
+    assert np.isnan(values[::2]).all() and np.array_equal(values[1::2], times[1::2] + 0.5)
+
+
+def test_released_rows_are_spilled_and_read_back(tmp_path):
+    history = SkewHistory(COLUMNS, capacity=64, spill_dir=str(tmp_path))
+    fill(history, 0, 500)
+    times, values = history.series('1M', 'ATM')
+    np.testing.assert_array_equal(times, np.arange(500))
+    np.testing.assert_array_equal(values, np.arange(500))
+
+    # A new history over the same directory picks up the spilled chunks
+    reopened = SkewHistory(COLUMNS, capacity=64, spill_dir=str(tmp_path))
+    assert len(reopened.series('1M', 'ATM')[0]) == 500 - len(history)
+
+
+def test_store_series_is_downsampled_and_skips_gaps():
+    store = SkewHistoryStore(COLUMNS)
+    for t in range(2000):
+        store.record('EURUSD', [{'TENOR': '1M', 'ATM': float(t % 97)}], at=1.7e9 + t)
+    store.record('EURUSD', [{'TENOR': '3M', 'ATM': 9.0}], at=1.7e9 + 2000)
+
+    times, values = store.series('EURUSD', '1M', 'ATM', max_points=200, end=1.7e9 + 2000)
+    assert len(times) == 200 and times.dtype == np.dtype('datetime64[ms]')
+    times, values = store.series('EURUSD', '1M', 'ATM', span_seconds=10, end=1.7e9 + 2000)
+    # The last snapshot did not quote 1M, so the window ends at the row before it
+    np.testing.assert_array_equal(values, np.arange(1990, 2000) % 97)
+    assert store.tenors('EURUSD') == ['1M', '3M']
+    assert len(store.series('GBPUSD', '1M', 'ATM')[0]) == 0
@@ -0,0 +1,58 @@
+# tests/test_smile_calibration.py
+import numpy as np
+import pytest
+
+from smile_calibration import SmileCalibrator, _initial_guess, fit_svi, svi_fit_job, svi_total_variance
+from vol_surface import VolSurfaceEngine
+
+TRUE_PARAMS = np.array([[0.01, 0.1, -0.3, 0.02, 0.15],
+                        [0.04, 0.2, -0.5, -0.05, 0.3]])
+
+EURUSD = {
+    'forward': 1.1,
+    'skew_matrix': [
+        {'TENOR': '1M', 'ATM': 10.0, '10RR': -2.0, '10STR': 1.0, '25RR': -1.0, '25STR': 0.3},
+        {'TENOR': '1Y', 'ATM': 12.0, '10RR': -3.0, '10STR': 1.2, '25RR': -1.5, '25STR': 0.4},
+    ],
+}
+
+
+def test_fit_svi_recovers_exact_smiles_from_a_cold_start():
+    k = np.tile(np.linspace(-0.4, 0.4, 9), (2, 1))
+    w = svi_total_variance(TRUE_PARAMS, k)
+    params, iterations = fit_svi(k, w, np.ones_like(w), _initial_guess(k, w), max_iter=500)
+
+    np.testing.assert_allclose(svi_total_variance(params, k), w, atol=1e-6)
+    assert (params[:, 1] > 0).all() and (np.abs(params[:, 2]) < 1).all() and (params[:, 4] > 0).all()
+    assert (iterations > 0).all()
+
+
+def test_calibrator_skips_unchanged_tenors_and_warm_starts_changed_ones():
+    engine = VolSurfaceEngine()
+    calibrator = SmileCalibrator()
+    first = calibrator.calibrate([engine.surface('EURUSD', EURUSD)])['EURUSD']
+    assert first['fit']['tenors_fitted'] == 2 and first['fit']['warm_started'] == 0
+    assert first['fit']['max_rmse_vol'] < 0.05
+
+    again = calibrator.calibrate([engine.surface('EURUSD', EURUSD)])['EURUSD']
+    assert again['fit']['tenors_fitted'] == 0 and again['params'] == first['params']
+
+    bumped = {**EURUSD, 'skew_matrix': [dict(EURUSD['skew_matrix'][0], ATM=10.5), EURUSD['skew_matrix'][1]]}
+    third = calibrator.calibrate([engine.surface('EURUSD', bumped)])['EURUSD']
+    assert third['fit']['tenors_fitted'] == 1 and third['fit']['warm_started'] == 1
+    assert third['params'][1] == first['params'][1]
+
+
+def test_svi_fit_job_matches_inline_calibration():
+    surface = VolSurfaceEngine().surface('EURUSD', EURUSD)
+    inline = SmileCalibrator().calibrate([surface])['EURUSD']
+
+    calibrator = SmileCalibrator()
+    jobs, inputs = calibrator.prepare(surface)
+    arrays = dict(inputs, params=np.zeros((len(jobs), 5)), iterations=np.zeros(len(jobs)))
+    svi_fit_job([arrays])
+    pooled = calibrator.install(surface, jobs, inputs, arrays, elapsed_ms=0.0)
+
+    for row, expected in zip(pooled['params'], inline['params']):
+        assert row['TENOR'] == expected['TENOR']
+        assert row['rmse_vol'] == pytest.approx(expected['rmse_vol'], abs=1e-9)
@@ -0,0 +1,70 @@
+# tests/test_vol_surface.py
+import numpy as np
+import pytest
+
+from vol_surface import PILLAR_D1, VolSurfaceEngine, delta_to_strike, tenor_to_years
+
+EURUSD = {
+    'forward': 1.1,
+    'skew_matrix': [
+        {'TENOR': '1M', 'ATM': 10.0, '10RR': -2.0, '10STR': 1.0, '25RR': -1.0, '25STR': 0.3},
+        {'TENOR': '1Y', 'ATM': 12.0, '10RR': -3.0, '10STR': 1.2, '25RR': -1.5, '25STR': 0.4},
+    ],
+}
+
+
+def test_tenor_to_years():
+    assert tenor_to_years('1W') == pytest.approx(7 / 365)
+    assert tenor_to_years('3m') == pytest.approx(0.25)
+    assert tenor_to_years('ON') == pytest.approx(1 / 365)
+    for tenor in ('3X', 'M', 'ABC'):
+        with pytest.raises(ValueError):
+            tenor_to_years(tenor)
+
+
+def test_delta_to_strike_inverts_pillar_deltas():
+    vols = np.array([[12.0, 10.8, 10.0, 9.8, 10.0]])
+    years, forwards = np.array([0.5]), np.array([1.1])
+    strikes = delta_to_strike(vols, years, forwards)
+
+    assert np.all(np.diff(strikes) > 0)
+    sd = vols / 100.0 * np.sqrt(years[:, None])
+    d1 = (np.log(forwards[:, None] / strikes) + 0.5 * sd ** 2) / sd
+    np.testing.assert_allclose(d1[0], PILLAR_D1, atol=1e-12)
+    # The delta-neutral ATM strike sits just above the forward
+    assert strikes[0, 2] == pytest.approx(1.1 * np.exp(0.5 * 0.1 ** 2 * 0.5))
+
+
+def test_vols_at_reproduces_quotes_and_interpolates_in_total_variance():
+    engine = VolSurfaceEngine()
+    assert engine.update({'EURUSD': EURUSD}) == ['EURUSD']
+    surface = engine.get('EURUSD')
+
+    np.testing.assert_allclose(surface.vols_at(surface.years[:, None], surface.strikes), surface.vols, atol=0.02)
+
+    short, long = surface.years
+    atm = surface.forward
+    w_short = (surface.vols_at(short, atm) / 100) ** 2 * short
+    w_long = (surface.vols_at(long, atm) / 100) ** 2 * long
+    middle = (short + long) / 2
+    w_middle = (surface.vols_at(middle, atm) / 100) ** 2 * middle
+    assert w_middle == pytest.approx((w_short + w_long) / 2, rel=1e-9)
+
+    # Flat outside the quoted tenors and strikes
+    assert surface.vols_at(5.0, atm) == pytest.approx(surface.vols_at(long, atm))
+    assert surface.vols_at(0.001, atm) == pytest.approx(surface.vols_at(short, atm))
+    assert surface.vols_at(short, 0.5) == pytest.approx(surface.vols[0, 0])
+
+
+def test_engine_rebuilds_only_changed_pairs():
+    engine = VolSurfaceEngine()
+    engine.update({'EURUSD': EURUSD, 'USDJPY': {**EURUSD, 'forward': 150.0}})
+    assert engine.update({'EURUSD': EURUSD}) == []
+
+    bumped = {**EURUSD, 'skew_matrix': [dict(EURUSD['skew_matrix'][0], ATM=11.0), EURUSD['skew_matrix'][1]]}
+    assert engine.update({'EURUSD': bumped, 'USDJPY': {**EURUSD, 'forward': 150.0}}) == ['EURUSD']
+
+    vols = engine.query('EURUSD', ['1M', 1.0], [1.1, 1.1])
+    assert vols.shape == (2,)
+    with pytest.raises(KeyError):
+        engine.query('GBPUSD', ['1M'], [1.3])
@@ -0,0 +1,181 @@
+# traffic_capture.py
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from server_connector import AlertServerConnector
+
+# Record layout: receive time (ns since epoch), payload length, raw payload bytes
+RECORD_HEADER = struct.Struct("<qI")
+
+
+class TrafficRecorder:
+    """Append raw upstream messages with their receive timestamps to a compact
+    binary log that TrafficReplayer can feed back through the ingest path."""
+
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        self._unflushed = 0
+        self.records = 0
+        # Buffered records would otherwise be lost on interpreter shutdown
+        atexit.register(self.close)
+
+    def record(self, message: Union[str, bytes], received_at_ns: Optional[int] = None):
+        """Append one message; called from the listener before decoding"""
+        if received_at_ns is None:
+            received_at_ns = time.time_ns()
+        payload = message.encode("utf-8") if isinstance(message, str) else message
+        with self._lock:
+            self._file.write(RECORD_HEADER.pack(received_at_ns, len(payload)))
+            self._file.write(payload)
+            self.records += 1
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+
+def read_capture(path: str) -> Iterator[Tuple[int, bytes]]:
+    """Yield (received_at_ns, payload) records; a torn final record is ignored"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            received_at_ns, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield received_at_ns, payload
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class TrafficReplayer:
+    """Replay a capture through AlertServerConnector.handle_message, i.e. the same
+    decode and callback path the live websocket listener uses.
+
+    speed=1.0 keeps the recorded pacing, speed=N plays N times faster and
+    speed=None replays as fast as the ingest path allows.
+    """
+
+    def __init__(self, connector: AlertServerConnector, speed: Optional[float] = 1.0):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive, or None for max speed")
+        self.connector = connector
+        self.speed = speed
+
+    async def replay(self, path: str) -> Dict[str, Any]:
+        latencies_ms: List[float] = []
+        lags_ms: List[float] = []
+        messages = alerts = errors = 0
+        first_ts = None
+        started = time.perf_counter()
+
+        for received_at_ns, payload in read_capture(path):
+            if first_ts is None:
+                first_ts = received_at_ns
+            if self.speed is not None:
+                due = started + (received_at_ns - first_ts) / 1e9 / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                lags_ms.append(max(0.0, time.perf_counter() - due) * 1000)
+
+            t0 = time.perf_counter()
+            try:
+                alerts += self.connector.handle_message(payload)
+            except Exception as e:
+                errors += 1
+                print(f"Replay decode failed for message {messages}: {e}")
+            latencies_ms.append((time.perf_counter() - t0) * 1000)
+            messages += 1
+
+        elapsed = time.perf_counter() - started
+        latencies_ms.sort()
+        lags_ms.sort()
+        return {
+            "messages": messages,
+            "alerts": alerts,
+            "errors": errors,
+            "elapsed_s": elapsed,
+            "messages_per_s": messages / elapsed if elapsed else 0.0,
+            "alerts_per_s": alerts / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "p50": _percentile(latencies_ms, 50),
+                "p95": _percentile(latencies_ms, 95),
+                "p99": _percentile(latencies_ms, 99),
+                "max": latencies_ms[-1] if latencies_ms else 0.0,
+            },
+            "schedule_lag_ms": {
+                "p50": _percentile(lags_ms, 50),
+                "p99": _percentile(lags_ms, 99),
+                "max": lags_ms[-1] if lags_ms else 0.0,
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured upstream alert traffic")
+    parser.add_argument("capture", help="capture file written by TrafficRecorder")
+    parser.add_argument("--speed", default="1",
+                        help="replay speed multiplier (1, 10, ...) or 'max'")
+    parser.add_argument("--db", help="alert database to replay into (default: a new temporary file)")
+    parser.add_argument("--allow-app-db", action="store_true",
+                        help="allow --db to be the app's configured database (ALERT_DB_PATH or alerts.db)")
+    parser.add_argument("--store-only", action="store_true",
+                        help="only write alerts to the AlertStore instead of going through app.ingest_alerts")
+    args = parser.parse_args()
+
+    # Replays never touch the live alert history unless explicitly asked to
+    app_db = os.getenv("ALERT_DB_PATH", "alerts.db")
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="alert-replay-"), "alerts.db")
+    if os.path.realpath(db_path) == os.path.realpath(app_db) and not args.allow_app_db:
+        parser.error(f"{db_path} is the app's alert database; pass --allow-app-db to replay into it")
+    os.environ["ALERT_DB_PATH"] = db_path
+
+    connector = AlertServerConnector("replay://" + args.capture)
+    if args.store_only:
+        from alert_store import AlertStore
+        store = AlertStore(db_path)
+        connector.register_callback(lambda alerts: store.enqueue(alert.dict() for alert in alerts))
+    else:
+        # The app's ingest path: index, store, escalation timers, rollups and grid deltas
+        import app
+        store = app.alert_store
+        connector.register_callback(lambda alerts: app.ingest_alerts([alert.dict() for alert in alerts]))
+
+    speed = None if args.speed == "max" else float(args.speed)
+    report = asyncio.run(TrafficReplayer(connector, speed=speed).replay(args.capture))
+    flush_started = time.perf_counter()
+    store.flush()
+    store.close()
+    report["store_drain_s"] = time.perf_counter() - flush_started
+    report["db"] = db_path
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
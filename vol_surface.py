@@ -0,0 +1,250 @@
+# vol_surface.py
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+STRATEGIES = ['ATM', '10RR', '10STR', '25RR', '25STR']
+
+# Smile pillars ordered by increasing strike
+PILLARS = ['10P', '25P', 'ATM', '25C', '10C']
+
+# N^-1(0.10) and N^-1(0.25); pillar d1 values for forward deltas, puts first.
+# Call: N(d1) = delta, put: N(-d1) = |delta|, ATM is the delta-neutral straddle.
+Z10 = 1.2815515655446004
+Z25 = 0.6744897501960817
+PILLAR_D1 = np.array([Z10, Z25, 0.0, -Z25, -Z10])
+
+DEFAULT_FORWARD = 100.0
+
+# Log-moneyness nodes per tenor in the precomputed total-variance grid
+GRID_POINTS = 201
+
+TENOR_UNITS = {'D': 1 / 365.0, 'W': 7 / 365.0, 'M': 1 / 12.0, 'Y': 1.0}
+
+
+def tenor_to_years(tenor: str) -> float:
+    """'1W', '3M', '1Y', 'ON' -> year fraction"""
+    tenor = tenor.strip().upper()
+    if tenor in ('ON', 'O/N', '0D'):
+        return 1 / 365.0
+    unit = TENOR_UNITS.get(tenor[-1:])
+    try:
+        count = float(tenor[:-1])
+    except ValueError:
+        unit = None
+    if unit is None:
+        raise ValueError(f"unknown tenor {tenor!r}")
+    return count * unit
+
+
+def quote_fingerprint(pair_data: Dict[str, Any]) -> Tuple:
+    """Hashable view of the inputs a pair's surface depends on"""
+    rows = tuple(
+        (row.get('TENOR'),) + tuple(row.get(strategy) for strategy in STRATEGIES)
+        for row in pair_data.get('skew_matrix', [])
+    )
+    return rows, pair_data.get('forward', DEFAULT_FORWARD)
+
+
+def pillar_vols(quotes: np.ndarray) -> np.ndarray:
+    """(..., 5) quotes in STRATEGIES order -> (..., 5) vols in PILLARS order"""
+    atm, rr10, str10, rr25, str25 = np.moveaxis(quotes, -1, 0)
+    return np.stack([
+        atm + str10 - rr10 / 2,
+        atm + str25 - rr25 / 2,
+        atm,
+        atm + str25 + rr25 / 2,
+        atm + str10 + rr10 / 2,
+    ], axis=-1)
+
+
+def delta_to_strike(vols: np.ndarray, years: np.ndarray, forwards: np.ndarray) -> np.ndarray:
+    """Forward-delta pillars to strikes: K = F exp(-d1 sigma sqrt(T) + sigma^2 T / 2).
+
+    vols is (N, 5) in percent, years and forwards are (N,).
+    """
+    sigma = vols / 100.0
+    sqrt_t = np.sqrt(years)[:, None]
+    return forwards[:, None] * np.exp(-PILLAR_D1 * sigma * sqrt_t + 0.5 * sigma ** 2 * years[:, None])
+
+
+def interp_rows(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """Row-wise linear interpolation with flat ends; x (n, q), xp/fp (n, p) with xp increasing"""
+    right = np.clip((x[:, :, None] >= xp[:, None, :]).sum(axis=-1), 1, xp.shape[1] - 1)
+    left = right - 1
+    x0, x1 = np.take_along_axis(xp, left, 1), np.take_along_axis(xp, right, 1)
+    f0, f1 = np.take_along_axis(fp, left, 1), np.take_along_axis(fp, right, 1)
+    frac = np.clip((x - x0) / np.where(x1 > x0, x1 - x0, 1.0), 0.0, 1.0)
+    return f0 + (f1 - f0) * frac
+
+
+class SmileSurface:
+    """Strike-space smiles for every tenor of one currency pair, plus the
+    interpolation state used by batch queries.
+
+    On build, each tenor's smile is resampled onto a shared log-moneyness grid
+    as total variance w = sigma^2 T, so a query is two searchsorted calls and a
+    bilinear blend: linear across strikes, linear in total variance across
+    tenors. Outside the quoted range vols are held flat.
+    """
+
+    def __init__(self, pair: str, tenors: List[str], years: np.ndarray, forward: float,
+                 strikes: np.ndarray, vols: np.ndarray, fingerprint: Tuple):
+        self.pair = pair
+        self.tenors = tenors
+        self.years = years
+        self.forward = forward
+        self.strikes = strikes
+        self.vols = vols
+        self.fingerprint = fingerprint
+        self._build_interpolation()
+
+    def _build_interpolation(self):
+        order = np.argsort(self.years)
+        years = self.years[order]
+        log_k = np.log(self.strikes[order] / self.forward)
+        vols = self.vols[order]
+        valid = np.isfinite(log_k).all(axis=1) & np.isfinite(vols).all(axis=1)
+        years, log_k, vols = years[valid], log_k[valid], vols[valid]
+
+        self.grid_years = years
+        if not len(years):
+            self.grid_k = np.zeros(0)
+            self.grid_w = np.zeros((0, 0))
+            return
+        self.grid_k = np.linspace(log_k.min(), log_k.max(), GRID_POINTS)
+        grid_vols = np.empty((len(years), GRID_POINTS))
+        for i in range(len(years)):
+            pillar_order = np.argsort(log_k[i])
+            grid_vols[i] = np.interp(self.grid_k, log_k[i][pillar_order], vols[i][pillar_order])
+        self.grid_w = (grid_vols / 100.0) ** 2 * years[:, None]
+
+    def vols_at(self, years: np.ndarray, strikes: np.ndarray) -> np.ndarray:
+        """Implied vols (%) at arbitrary (year fraction, strike) points, vectorized"""
+        years, strikes = np.broadcast_arrays(np.asarray(years, dtype=float),
+                                             np.asarray(strikes, dtype=float))
+        if not len(self.grid_years):
+            return np.full(years.shape, np.nan)
+
+        # Smile interpolation: linear along the log-moneyness grid, flat outside
+        k = np.clip(np.log(strikes / self.forward), self.grid_k[0], self.grid_k[-1])
+        right = np.clip(np.searchsorted(self.grid_k, k), 1, GRID_POINTS - 1)
+        left = right - 1
+        frac_k = (k - self.grid_k[left]) / (self.grid_k[right] - self.grid_k[left])
+
+        # Calendar interpolation: linear in total variance between tenors
+        t = np.clip(years, self.grid_years[0], self.grid_years[-1])
+        upper = np.clip(np.searchsorted(self.grid_years, t), 0, len(self.grid_years) - 1)
+        lower = np.maximum(upper - 1, 0)
+
+        w_lower = self.grid_w[lower, left] * (1 - frac_k) + self.grid_w[lower, right] * frac_k
+        w_upper = self.grid_w[upper, left] * (1 - frac_k) + self.grid_w[upper, right] * frac_k
+        span = self.grid_years[upper] - self.grid_years[lower]
+        frac_t = np.divide(t - self.grid_years[lower], span, out=np.zeros_like(t), where=span > 0)
+        w = w_lower + (w_upper - w_lower) * frac_t
+
+        # Outside the quoted tenors keep the edge vol constant in time
+        query_years = np.maximum(years, 1e-8)
+        w = np.where(years != t, w / t * query_years, w)
+        return np.sqrt(np.maximum(w, 0.0) / query_years) * 100.0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-format smile table (Tenor, Delta, Strike, Implied_Vol) for plotting"""
+        return pd.DataFrame({
+            'Tenor': np.repeat(self.tenors, len(PILLARS)),
+            'Delta': np.tile(PILLARS, len(self.tenors)),
+            'Strike': self.strikes.ravel(),
+            'Implied_Vol': self.vols.ravel(),
+        }).dropna()
+
+
+class VolSurfaceEngine:
+    """Per-pair cache of smile surfaces built from the skew matrix quotes.
+
+    update() rebuilds only the pairs whose quotes changed since the last call,
+    and does so in one vectorized pass over all of their tenors.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._surfaces: Dict[str, SmileSurface] = {}
+
+    def get(self, pair: str) -> Optional[SmileSurface]:
+        return self._surfaces.get(pair)
+
+    def discard(self, pair: str):
+        with self._lock:
+            self._surfaces.pop(pair, None)
+
+    def update(self, volatility_data: Dict[str, Any]) -> List[str]:
+        """Rebuild surfaces for pairs whose quotes changed; returns the rebuilt pairs"""
+        stale = []
+        for pair, pair_data in volatility_data.items():
+            if not isinstance(pair_data, dict) or 'skew_matrix' not in pair_data:
+                continue
+            fingerprint = quote_fingerprint(pair_data)
+            cached = self._surfaces.get(pair)
+            if cached is None or cached.fingerprint != fingerprint:
+                stale.append((pair, pair_data, fingerprint))
+        if not stale:
+            return []
+
+        surfaces = build_surfaces(stale)
+        with self._lock:
+            self._surfaces.update(surfaces)
+        return list(surfaces)
+
+    def query(self, pair: str, tenors: Sequence[Union[str, float]],
+              strikes: Sequence[float]) -> np.ndarray:
+        """Batch vol lookup for one pair; tenors are labels ('3M') or year fractions"""
+        surface = self._surfaces.get(pair)
+        if surface is None:
+            raise KeyError(pair)
+        try:
+            years = np.atleast_1d(np.asarray(tenors, dtype=float))
+        except ValueError:
+            years = np.array([tenor_to_years(t) if isinstance(t, str) else float(t)
+                              for t in np.atleast_1d(np.asarray(tenors, dtype=object))])
+        return surface.vols_at(years, np.atleast_1d(np.asarray(strikes, dtype=float)))
+
+    def surface(self, pair: str, pair_data: Dict[str, Any]) -> SmileSurface:
+        """Cached surface for one pair, rebuilt first if its quotes changed.
+
+        Raises KeyError if pair_data has no skew_matrix and nothing is cached.
+        """
+        self.update({pair: pair_data})
+        return self._surfaces[pair]
+
+
+def build_surfaces(stale: List[Tuple[str, Dict[str, Any], Tuple]]) -> Dict[str, SmileSurface]:
+    """Build smiles for several pairs at once by stacking all their tenor rows"""
+    tenors, years, forwards, quotes, offsets = [], [], [], [], [0]
+    for pair, pair_data, _ in stale:
+        forward = float(pair_data.get('forward', DEFAULT_FORWARD))
+        for row in pair_data['skew_matrix']:
+            tenors.append(row['TENOR'])
+            years.append(tenor_to_years(row['TENOR']))
+            forwards.append(forward)
+            quotes.append([np.nan if row.get(s) is None else row[s] for s in STRATEGIES])
+        offsets.append(len(tenors))
+
+    quotes = np.asarray(quotes, dtype=float).reshape(-1, len(STRATEGIES))
+    years = np.asarray(years, dtype=float)
+    vols = pillar_vols(quotes)
+    strikes = delta_to_strike(vols, years, np.asarray(forwards, dtype=float))
+
+    surfaces = {}
+    for index, (pair, pair_data, fingerprint) in enumerate(stale):
+        rows = slice(offsets[index], offsets[index + 1])
+        surfaces[pair] = SmileSurface(
+            pair=pair,
+            tenors=tenors[rows],
+            years=years[rows],
+            forward=float(pair_data.get('forward', DEFAULT_FORWARD)),
+            strikes=strikes[rows],
+            vols=vols[rows],
+            fingerprint=fingerprint,
+        )
+    return surfaces
@@ -1,13 +1,20 @@
 # websocket_handler.py
 import asyncio
-from typing import List, Dict, Any
+import os
+from typing import Callable, List, Dict, Any
 from dash import Dash
+from models import Alert
 from server_connector import AlertServerConnector
+from traffic_capture import TrafficRecorder
 
 class WebSocketHandler:
-    def __init__(self, app: Dash):
+    def __init__(self, app: Dash, on_alerts: Callable[[List[Dict[str, Any]]], None]):
         self.app = app
-        self.connector = AlertServerConnector("ws://alert-server:8000/ws")
+        self.on_alerts = on_alerts
+        # Optional capture of raw upstream traffic for offline replay (traffic_capture.py)
+        capture_path = os.getenv("ALERT_CAPTURE_PATH")
+        recorder = TrafficRecorder(capture_path) if capture_path else None
+        self.connector = AlertServerConnector("ws://alert-server:8000/ws", recorder=recorder)
         
     async def start(self):
         """Start the WebSocket connection"""
@@ -15,18 +22,8 @@ class WebSocketHandler:
         self.connector.register_callback(self.handle_new_alerts)
         asyncio.create_task(self.connector.listen_for_alerts())
         
-    def handle_new_alerts(self, alerts: List[Dict[str, Any]]):
-        """Handle incoming alerts and update the Dash app"""
+    def handle_new_alerts(self, alerts: List[Alert]):
+        """Hand incoming alerts to the app's ingest path (render coalescer)"""
         if not alerts:
             return
-            
-        @self.app.callback(
-            Output("alert-store", "data"),
-            Input("dummy-websocket-input", "value"),
-            State("alert-store", "data")
-        )
-        def update_alerts(_, current_data):
-            # Merge new alerts with existing ones
-            current_ids = {alert["id"] for alert in current_data}
-            new_alerts = [alert.dict() for alert in alerts if alert.id not in current_ids]
-            return new_alerts + current_data
\ No newline at end of file
+        self.on_alerts([alert.dict() for alert in alerts])